@@ -0,0 +1,237 @@
+"""
+Measures hotkey-to-effect latency through the real control path.
+
+Runs main.on_mic_hotkey_press and main.on_camera_hotkey_press against a fake
+microphone backend, an OSDDisplay without a Tk window and a real camera pipeline
+feeding a fake sink, injects thousands of toggles and reports latency
+percentiles for each path: the handlers themselves, OSDDisplay.update, press to
+OSD redraw queued, press to first black frame at the sink and the camera loop's
+per-frame state check. Also checks that turning the camera off keeps a disabled
+mode set at runtime.
+
+Usage: python benchmarks/bench_control_path.py [--toggles 2000] [--mic-delay-ms 0] [--check]
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+import types
+from queue import Queue
+
+import numpy as np
+
+import fakes
+from state import is_camera_live
+
+# Budgets (ms) for --check, applied to p99. Generous enough for shared CI runners,
+# tight enough to catch a handler that starts blocking on I/O or a lock.
+P99_BUDGETS_MS = {
+    "on_mic_hotkey_press": 5.0,
+    "on_camera_hotkey_press": 5.0,
+    "OSDDisplay.update": 1.0,
+    "press -> OSD queued": 5.0,
+    "press -> black frame": 50.0,
+    "camera loop state check": 0.1,
+}
+
+
+def install_fake_microphone(delay):
+    """Registers a stand-in for the pycaw-backed microphone module before main imports it."""
+    module = types.ModuleType("microphone")
+    module.muted = False
+
+    def set_mic_mute(mute):
+        if delay:
+            time.sleep(delay)
+        module.muted = mute
+        return True
+
+    def get_mic_status():
+        return not module.muted
+
+    class PushToTalkController:
+        def __init__(self, *args, **kwargs):
+            raise RuntimeError("Push-to-talk is not available in the benchmark")
+
+    module.set_mic_mute = set_mic_mute
+    module.get_mic_status = get_mic_status
+    module.PushToTalkController = PushToTalkController
+    sys.modules["microphone"] = module
+    return module
+
+
+class TimedQueue(Queue):
+    """OSD update queue that timestamps every queued redraw."""
+
+    def __init__(self):
+        super().__init__()
+        self.last_put_at = None
+
+    def put(self, item, block=True, timeout=None):
+        self.last_put_at = time.perf_counter()
+        super().put(item, block, timeout)
+
+
+class BlackFrameSink(fakes.FakeSink):
+    """FakeSink that signals when the first black frame after a toggle arrives."""
+
+    def __init__(self, width, height, fps):
+        super().__init__(width, height, fps)
+        self.expect_black = True
+        self.observed_at = None
+        self.observed = threading.Event()
+
+    def send_frame(self, frame):
+        super().send_frame(frame)
+        if self.observed.is_set():
+            return
+        # Black frames are exactly zero; live fake frames are random noise
+        if (not frame.any()) == self.expect_black:
+            self.observed_at = time.perf_counter()
+            self.observed.set()
+
+    def arm(self, expect_black):
+        self.expect_black = expect_black
+        self.observed_at = None
+        self.observed.clear()
+
+
+def time_call(fn):
+    started_at = time.perf_counter()
+    fn()
+    return time.perf_counter() - started_at
+
+
+def wait_for_frame(sink, started_at, timeout=2.0):
+    if not sink.observed.wait(timeout):
+        return float("nan")
+    return sink.observed_at - started_at
+
+
+def summarize(name, samples):
+    samples = np.asarray(samples) * 1000
+    samples = samples[~np.isnan(samples)]
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    print(
+        f"{name:<26}{len(samples):>7}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}{samples.max():>10.3f}"
+    )
+    return p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--toggles", type=int, default=2000)
+    parser.add_argument("--fps", type=int, default=1000, help="camera loop rate")
+    parser.add_argument(
+        "--mic-delay-ms",
+        type=float,
+        default=0.0,
+        help="simulated latency of the OS mute call",
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="exit non-zero if any p99 exceeds its budget or a check fails"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    install_fake_microphone(args.mic_delay_ms / 1000)
+    import main as vcm
+    from camera import CameraPipelineGroup
+    from osd import OSDDisplay
+
+    config = fakes.FakeConfig(
+        camera_width=320,
+        camera_height=180,
+        camera_fps=args.fps,
+        camera_keep_open_when_muted=True,
+    )
+    vcm.config = config
+
+    osd = OSDDisplay(config)
+    osd.update_queue = TimedQueue()
+    osd.running = True  # Accept updates without a Tk window
+    config.state.subscribe(osd._on_state_change)
+    vcm.osd_manager = osd
+
+    sinks = []
+
+    def sink_factory(width, height, fps):
+        sink = BlackFrameSink(width, height, fps)
+        sinks.append(sink)
+        return sink
+
+    group = CameraPipelineGroup(
+        config,
+        capture_factory=fakes.capture_factory(320, 180),
+        sink_factory=sink_factory,
+    )
+    vcm.camera_manager = group
+    group.start()
+    deadline = time.monotonic() + 5
+    while not (sinks and sinks[0].frames_sent) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if not sinks:
+        print("Camera pipeline did not start")
+        return 1
+    sink = sinks[0]
+
+    results = {name: [] for name in P99_BUDGETS_MS}
+
+    for _ in range(args.toggles):
+        started_at = time.perf_counter()
+        results["on_mic_hotkey_press"].append(time_call(vcm.on_mic_hotkey_press))
+        results["press -> OSD queued"].append(osd.update_queue.last_put_at - started_at)
+        results["OSDDisplay.update"].append(time_call(osd.update))
+        while not osd.update_queue.empty():
+            osd.update_queue.get_nowait()
+
+    for _ in range(args.toggles):
+        turning_off = config.camera_active
+        sink.arm(expect_black=turning_off)
+        started_at = time.perf_counter()
+        results["on_camera_hotkey_press"].append(time_call(vcm.on_camera_hotkey_press))
+        latency = wait_for_frame(sink, started_at)
+        if turning_off:
+            results["press -> black frame"].append(latency)
+        while not osd.update_queue.empty():
+            osd.update_queue.get_nowait()
+
+    # A disabled mode set at runtime must survive the hotkey turning the camera off
+    config.camera_active = True
+    config.camera_disabled_mode = "blur"
+    vcm.on_camera_hotkey_press()
+    mode_kept = not config.camera_active and config.camera_disabled_mode == "blur"
+
+    group.stop()
+
+    name = config.cameras[0]["name"]
+    for _ in range(args.toggles * 10):
+        results["camera loop state check"].append(
+            time_call(lambda: is_camera_live(config.state.snapshot()[1], name))
+        )
+
+    print(
+        f"{args.toggles} toggles per path, camera loop at {args.fps} fps, "
+        f"mic backend delay {args.mic_delay_ms:g} ms"
+    )
+    print(f"{'path':<26}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    over_budget = []
+    for path, samples in results.items():
+        p99 = summarize(path, samples)
+        if p99 > P99_BUDGETS_MS[path]:
+            over_budget.append(f"{path}: p99 {p99:.3f} ms > {P99_BUDGETS_MS[path]} ms")
+
+    print(f"blur mode kept after turning the camera off: {'yes' if mode_kept else 'NO'}")
+    if not mode_kept:
+        over_budget.append("the camera hotkey reset a disabled mode set at runtime")
+
+    if args.check and over_budget:
+        print("FAIL:\n  " + "\n  ".join(over_budget))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
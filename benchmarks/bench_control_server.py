@@ -0,0 +1,89 @@
+"""
+Measures control API command round-trip time and state push fan-out latency.
+
+Starts the real ControlServer on an ephemeral localhost port with many idle
+subscribers attached, then times toggle commands from one client and the delay
+until every subscriber has received the resulting state line.
+
+Usage: python benchmarks/bench_control_server.py [--subscribers 50] [--commands 2000]
+"""
+
+import argparse
+import logging
+import socket
+import time
+
+import numpy as np
+
+import fakes
+from control_server import ControlServer
+
+
+TOKEN = "bench"
+
+
+def connect(address):
+    sock = socket.create_connection(address)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    reader = sock.makefile("rb")
+    sock.sendall(f"auth {TOKEN}\n".encode())
+    assert reader.readline().startswith(b"ok")
+    return sock, reader
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, default=50)
+    parser.add_argument("--commands", type=int, default=2000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    config = fakes.FakeConfig()
+    setters = {
+        "camera": lambda value: setattr(config, "camera_active", value),
+        "mic": lambda value: setattr(config, "mic_active", value),
+    }
+    server = ControlServer(config, setters, token=TOKEN, port=0)
+    server.start()
+
+    subscribers = [connect(server.address) for _ in range(args.subscribers)]
+    for sock, reader in subscribers:
+        sock.sendall(b"subscribe\n")
+        reader.readline()
+
+    commander, commander_reader = connect(server.address)
+    round_trips = np.empty(args.commands)
+    fan_out = np.empty(args.commands)
+    for index in range(args.commands):
+        started_at = time.perf_counter()
+        commander.sendall(b"toggle mic\n")
+        reply = commander_reader.readline()
+        round_trips[index] = time.perf_counter() - started_at
+        assert reply.startswith(b"ok"), reply
+        for _, reader in subscribers:
+            reader.readline()
+        fan_out[index] = time.perf_counter() - started_at
+
+    for ms, label in (
+        (round_trips * 1000, "command round trip"),
+        (fan_out * 1000, f"push to {args.subscribers} subscribers"),
+    ):
+        print(
+            f"{label:<28} p50 {np.percentile(ms, 50):7.3f} ms  "
+            f"p95 {np.percentile(ms, 95):7.3f} ms  p99 {np.percentile(ms, 99):7.3f} ms"
+        )
+
+    # A malformed command, here an unknown mode, closes the connection
+    commander.sendall(b"mode bogus\n")
+    reply = commander_reader.readline()
+    closed = commander_reader.readline() == b""
+    print(f"unknown mode: {reply.decode().strip()!r}, connection closed: {closed}")
+
+    commander.close()
+    for sock, _ in subscribers:
+        sock.close()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measures the per-frame cost of feeding scaled outputs from one camera pipeline.
+
+Times FanOutSink.send_frame for a full-size frame with several scaled outputs,
+comparing the pyramid (each size from a smaller frame already computed) with
+resizing every output from the full frame, and with no consumers attached. Then
+runs a pipeline briefly to check each output receives frames at its own rate.
+
+Usage: python benchmarks/bench_fan_out.py [--width 1920] [--height 1080]
+"""
+
+import argparse
+import logging
+import time
+
+import cv2
+import numpy as np
+
+import fakes
+from camera import CameraPipelineGroup, FanOutSink, ScaledOutput
+
+SCALED_SIZES = ((1280, 720), (960, 540), (640, 360), (320, 180))
+
+
+def make_fan_out(width, height, connected=True):
+    primary = fakes.FakeSink(width, height, 30)
+    outputs = [
+        ScaledOutput(fakes.FakeSink(w, h, 30, connected=connected), w, h, 30)
+        for w, h in SCALED_SIZES
+    ]
+    return FanOutSink(primary, outputs, 30)
+
+
+def send_naive(fan_out, frame):
+    """Resizes every output from the full frame, as separate pipelines would."""
+    fan_out.primary.send_frame(frame)
+    for output in fan_out.scaled_outputs:
+        size = (output.width, output.height)
+        buffer = fan_out._buffers.get(size)
+        if buffer is None:
+            buffer = fan_out._buffers[size] = np.empty(
+                (output.height, output.width, 3), dtype=np.uint8
+            )
+        scaled = cv2.resize(frame, size, dst=buffer, interpolation=cv2.INTER_AREA)
+        output.sink.send_frame(scaled)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    frame = fakes.FakeCapture(args.width, args.height).frame
+    sizes = ", ".join(f"{w}x{h}" for w, h in SCALED_SIZES)
+    print(f"{args.width}x{args.height} primary + scaled outputs {sizes}")
+
+    cases = []
+    fan_out = make_fan_out(args.width, args.height)
+    fan_out._tolerance = float("inf")  # Every output due on every frame
+    cases.append(("pyramid", fan_out.send_frame))
+    naive = make_fan_out(args.width, args.height)
+    cases.append(("each from full frame", lambda f: send_naive(naive, f)))
+    idle = make_fan_out(args.width, args.height, connected=False)
+    cases.append(("no scaled consumers", idle.send_frame))
+    for label, fn in cases:
+        timings = fakes.measure(fn, (frame,), args.iterations)
+        print(
+            f"{label:<22} mean {timings.mean():7.3f} ms  "
+            f"p99 {np.percentile(timings, 99):7.3f} ms"
+        )
+
+    sinks = fakes.SinkRecorder()
+    config = fakes.FakeConfig(
+        camera_width=1280,
+        camera_height=720,
+        camera_fps=30,
+        camera_scaled_outputs=[
+            {"width": 640, "height": 360, "fps": 15},
+            {"width": 320, "height": 180, "fps": 5},
+        ],
+    )
+    group = CameraPipelineGroup(
+        config, capture_factory=fakes.capture_factory(1280, 720), sink_factory=sinks
+    )
+    group.start()
+    time.sleep(1.0)
+    counts = [sink.frames_sent for sink in sinks.sinks]
+    time.sleep(3.0)
+    group.stop()
+    for sink, count in zip(sinks.sinks, counts):
+        rate = (sink.frames_sent - count) / 3.0
+        print(
+            f"pipeline output {sink.width}x{sink.height}: "
+            f"{rate:5.1f} fps (asked {sink.fps:g})"
+        )
+
+
+if __name__ == "__main__":
+    main()
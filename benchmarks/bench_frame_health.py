@@ -0,0 +1,110 @@
+"""
+Measures the per-frame cost of the frozen/blank frame check and its detection delay.
+
+Times FrameHealthMonitor.check on live, frozen and black frames, then runs a
+camera pipeline against a device that freezes after a while and reports how many
+frames it took to release and reopen it.
+
+Usage: python benchmarks/bench_frame_health.py [--width 1920] [--height 1080] [--stride 16]
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+import fakes
+from camera import CameraPipelineGroup
+from frame_health import FrameHealthMonitor
+
+
+class FreezingCapture(fakes.FakeCapture):
+    """FakeCapture whose picture stops changing after freeze_after reads."""
+
+    def __init__(self, width, height, freeze_after):
+        super().__init__(width, height)
+        self.freeze_after = freeze_after
+
+    def read(self):
+        if self.reads >= self.freeze_after:
+            self.reads += 1
+            return True, self.frame
+        return True, self.next_frame()
+
+
+class freezing_capture_factory:
+    def __init__(self, width, height, freeze_after):
+        self.width = width
+        self.height = height
+        self.freeze_after = freeze_after
+        self.captures = []
+
+    def __call__(self, *capture_args):
+        capture = FreezingCapture(self.width, self.height, self.freeze_after)
+        self.captures.append(capture)
+        return capture
+
+
+def report(label, timings_us):
+    print(
+        f"{label:<14} mean {timings_us.mean():6.2f} us  "
+        f"p50 {np.percentile(timings_us, 50):6.2f} us  "
+        f"p99 {np.percentile(timings_us, 99):6.2f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--stride", type=int, default=16)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    rng = np.random.default_rng(0)
+    shape = (args.height, args.width, 3)
+    live = [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(2)]
+    black = np.zeros(shape, dtype=np.uint8)
+
+    print(f"{args.width}x{args.height}, stride {args.stride}")
+    # Huge windows so no fault resets the counters mid-measurement
+    windows = dict(stride=args.stride, frozen_frames=10**9, blank_frames=10**9)
+    for label, frames in (
+        ("live frames", live),
+        ("frozen frame", live[:1]),
+        ("black frame", [black]),
+    ):
+        check = FrameHealthMonitor(**windows).check
+        report(label, fakes.measure(check, frames, args.iterations) * 1000)
+
+    freeze_after = 100
+    factory = freezing_capture_factory(640, 360, freeze_after)
+    config = fakes.FakeConfig(
+        camera_width=640,
+        camera_height=360,
+        camera_fps=120,
+        camera_health_stride=args.stride,
+        camera_frozen_frames=60,
+    )
+    group = CameraPipelineGroup(
+        config, capture_factory=factory, sink_factory=fakes.SinkRecorder()
+    )
+    group.start()
+    deadline = time.monotonic() + 10
+    while len(factory.captures) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    group.stop()
+    if len(factory.captures) < 2:
+        print("Frozen camera was not reopened")
+        return
+    frozen_reads = factory.captures[0].reads - freeze_after
+    print(
+        f"Frozen camera released and reopened after {frozen_reads} identical frames "
+        f"(camera_frozen_frames: 60)"
+    )
+
+
+if __name__ == "__main__":
+    main()
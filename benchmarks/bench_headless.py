@@ -0,0 +1,147 @@
+"""
+Measures startup time, memory and threads of VCM in headless mode.
+
+Starts main.main(["--headless"]) in a fresh interpreter with a fake microphone
+backend and a fake camera and sink, and reports the time from process start to
+the first frame at the sink, RSS and the thread count once running, and the time
+to shut down on SIGTERM. A second fresh interpreter imports the GUI modules that
+headless mode skips (the OSD with tkinter and Pillow, pystray, pynput) to show
+what they would add.
+
+Usage: python benchmarks/bench_headless.py [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEADLESS_CHILD = r"""
+import functools, json, os, signal, sys, threading, time
+sys.path.insert(0, {bench_dir!r})
+import fakes
+from bench_control_path import install_fake_microphone
+from memory import current_rss
+
+install_fake_microphone(0)
+import main as vcm
+from camera import CameraPipelineGroup
+
+sinks = fakes.SinkRecorder()
+vcm.CameraPipelineGroup = functools.partial(
+    CameraPipelineGroup,
+    capture_factory=fakes.capture_factory(1280, 720),
+    sink_factory=sinks,
+)
+vcm.configure_logging = lambda: None
+vcm.log_dir = {log_dir!r}
+result = {{}}
+
+
+def watch():
+    while sinks.frames_sent == 0:
+        time.sleep(0.001)
+    result["first_frame"] = time.time() - {started_at!r}
+    time.sleep(1.0)  # Let the pipeline settle before measuring
+    result["rss"] = current_rss()
+    result["threads"] = sorted(t.name for t in threading.enumerate())
+    result["gui_modules"] = sorted(
+        name for name in ("tkinter", "PIL", "osd", "pystray", "pynput") if name in sys.modules
+    )
+    result["stop_requested"] = time.perf_counter()
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+threading.Thread(target=watch, daemon=True).start()
+vcm.main(["--headless"])
+result["shutdown"] = time.perf_counter() - result["stop_requested"]
+print(json.dumps(result))
+"""
+
+GUI_IMPORTS_CHILD = r"""
+import importlib, json, sys, time
+sys.path.insert(0, {bench_dir!r})
+import fakes
+from bench_control_path import install_fake_microphone
+from memory import current_rss
+
+install_fake_microphone(0)
+import main
+result = {{"modules": {{}}}}
+before = current_rss()
+started_at = time.perf_counter()
+for name in ("osd", "pystray", "pynput.keyboard"):
+    module_started_at = time.perf_counter()
+    try:
+        importlib.import_module(name)
+    except Exception as e:
+        result["modules"][name] = f"unavailable ({{type(e).__name__}})"
+        continue
+    result["modules"][name] = time.perf_counter() - module_started_at
+result["import_time"] = time.perf_counter() - started_at
+result["rss_added"] = current_rss() - before
+print(json.dumps(result))
+"""
+
+
+def run_child(source, config_path):
+    env = dict(os.environ, VCM_CONFIG_PATH=config_path)
+    completed = subprocess.run(
+        [sys.executable, "-c", source],
+        cwd=BENCH_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        config_path = os.path.join(work_dir, "config.yml")
+        with open(config_path, "w", encoding="utf-8") as f:
+            f.write("camera_width: 1280\ncamera_height: 720\ntelemetry_enabled: false\n")
+
+        runs = []
+        for _ in range(args.runs):
+            source = HEADLESS_CHILD.format(
+                bench_dir=BENCH_DIR, log_dir=work_dir, started_at=time.time()
+            )
+            runs.append(run_child(source, config_path))
+        gui = run_child(GUI_IMPORTS_CHILD.format(bench_dir=BENCH_DIR), config_path)
+
+    first_frame = np.array([run["first_frame"] for run in runs]) * 1000
+    rss = np.array([run["rss"] for run in runs]) / 2**20
+    shutdown = np.array([run["shutdown"] for run in runs]) * 1000
+    print(f"headless, {args.runs} runs")
+    print(f"  process start -> first frame  median {np.median(first_frame):7.1f} ms")
+    print(f"  RSS while running             median {np.median(rss):7.1f} MiB")
+    print(f"  SIGTERM -> main() returned    median {np.median(shutdown):7.1f} ms")
+    print(f"  threads ({len(runs[0]['threads'])}): {', '.join(runs[0]['threads'])}")
+    print(f"  GUI modules loaded: {', '.join(runs[0]['gui_modules']) or 'none'}")
+    print("skipped GUI imports")
+    for name, cost in gui["modules"].items():
+        cost = f"{cost * 1000:7.1f} ms" if isinstance(cost, float) else cost
+        print(f"  {name:<16} {cost}")
+    print(
+        f"  total {gui['import_time'] * 1000:.1f} ms, "
+        f"+{gui['rss_added'] / 2**20:.1f} MiB RSS (before the Tk window and tray start)"
+    )
+
+
+if __name__ == "__main__":
+    main()
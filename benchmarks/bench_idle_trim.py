@@ -0,0 +1,190 @@
+"""
+Measures the memory freed while no app uses the virtual camera, and what it costs to reconnect.
+
+Runs a 1080p pipeline with a fade, the mute badge, the privacy blur and two
+scaled outputs, disconnects its consumer until the idle trim has run, and
+reports private memory before and after the trim against the bytes held in
+frame buffers. It then reconnects and compares the time from the pipeline
+seeing the consumer to its first frame with a pipeline that keeps its buffers
+(the 100 ms connection poll is left out, as both pay it). With --check, exits
+non-zero if private memory drops by less than half the buffer bytes or
+reconnecting takes more than --budget-ms longer.
+
+Usage: python benchmarks/bench_idle_trim.py [--rounds 3] [--budget-ms 20] [--check]
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+
+import fakes
+from camera import CameraManager
+from memory import current_private_bytes
+
+WIDTH, HEIGHT = 1920, 1080
+SCALED_OUTPUTS = [{"width": 1280, "height": 720}, {"width": 640, "height": 360}]
+
+
+def buffer_bytes(manager):
+    """Bytes of the NumPy arrays held by the manager's frame buffers and caches."""
+    seen = set()
+    total = 0
+
+    def visit(value, depth):
+        nonlocal total
+        if isinstance(value, np.ndarray):
+            base = value if value.base is None else value.base
+            if isinstance(base, np.ndarray) and id(base) not in seen:
+                seen.add(id(base))
+                total += base.nbytes
+        elif depth < 2 and isinstance(value, dict):
+            for item in value.values():
+                visit(item, depth + 1)
+        elif depth < 2 and hasattr(value, "__dict__"):
+            for item in vars(value).values():
+                visit(item, depth + 1)
+
+    for name in (
+        "black_frame",
+        "_privacy_blur",
+        "_framing",
+        "_fade",
+        "_slate_frame",
+        "_mute_badge",
+        "_last_sent_frame",
+        "virtual_cam_softcam",
+    ):
+        visit(getattr(manager, name), 0)
+    return total
+
+
+class ConnectSink(fakes.FakeSink):
+    """Records when the pipeline first sees the consumer after a reconnect."""
+
+    def __init__(self, width, height, fps):
+        super().__init__(width, height, fps)
+        self.noticed_at = None
+
+    def is_connected(self):
+        if self.connected and self.noticed_at is None:
+            self.noticed_at = time.perf_counter()
+        return self.connected
+
+
+class connect_sink_recorder(fakes.SinkRecorder):
+    def __call__(self, width, height, fps):
+        sink = ConnectSink(width, height, fps)
+        self.sinks.append(sink)
+        return sink
+
+
+def set_connected(sinks, connected):
+    for sink in sinks.sinks:
+        sink.connected = connected
+        sink.noticed_at = None
+        if not connected:
+            sink.last_frame = None  # The fake keeps the last frame alive
+
+
+def run(trim_after, rounds):
+    sinks = connect_sink_recorder()
+    config = fakes.FakeConfig(
+        camera_width=WIDTH,
+        camera_height=HEIGHT,
+        camera_fps=30,
+        camera_fade_frames=8,
+        camera_mute_badge=True,
+        camera_scaled_outputs=SCALED_OUTPUTS,
+        camera_idle_trim_after=trim_after,
+        camera_health_check=False,
+    )
+    manager = CameraManager(
+        config,
+        capture_factory=fakes.capture_factory(WIDTH, HEIGHT),
+        sink_factory=sinks,
+    )
+    manager.start()
+    results = []
+    try:
+        fakes.wait_until(lambda: sinks.frames_sent > 30, 10)
+        config.camera_disabled_mode = "blur"
+        for _ in range(rounds):
+            # Touch every path that allocates (blur, fade and badge), so the
+            # buffers counted below are resident
+            config.camera_active = False
+            config.mic_active = False
+            time.sleep(0.5)
+            config.camera_active = True
+            config.mic_active = True
+            time.sleep(0.5)
+            held = buffer_bytes(manager)
+            trims = manager.idle_trims
+            set_connected(sinks, False)
+            if trim_after > 0:
+                trimmed = fakes.wait_until(
+                    lambda: manager.idle_trims > trims, trim_after + 10
+                )
+            else:
+                trimmed = False
+                time.sleep(3.0)  # The device release pauses for two seconds
+            private_before, private_after = (
+                manager.last_idle_trim if trimmed else (None, None)
+            )
+            primary = sinks.sinks[0]
+            frames = primary.frames_sent
+            set_connected(sinks, True)
+            fakes.wait_until(lambda: primary.frames_sent > frames, 10)
+            reconnect = time.perf_counter() - primary.noticed_at
+            results.append(
+                (held, private_before, private_after, reconnect, manager.last_rebuild_time)
+            )
+    finally:
+        manager.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=20.0)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    if current_private_bytes() is None:
+        print("Private memory is not readable on this platform")
+        sys.exit(1 if args.check else 0)
+
+    sizes = ", ".join(f"{output['width']}x{output['height']}" for output in SCALED_OUTPUTS)
+    print(f"{WIDTH}x{HEIGHT} with fade, badge, blur and scaled outputs {sizes}")
+    baseline = run(0, args.rounds)
+    trimmed = run(1, args.rounds)
+
+    failed = False
+    baseline_ms = np.median([result[3] for result in baseline]) * 1000
+    for index, (held, before, after, reconnect, rebuild) in enumerate(trimmed):
+        freed = before - after
+        extra_ms = reconnect * 1000 - baseline_ms
+        print(
+            f"round {index + 1}: buffers {held / 2**20:5.1f} MiB  "
+            f"private {before / 2**20:6.1f} -> {after / 2**20:6.1f} MiB "
+            f"(-{freed / 2**20:5.1f})  reconnect {reconnect * 1000:6.1f} ms "
+            f"(+{extra_ms:5.1f} vs kept, rebuild {rebuild * 1000:.1f} ms)"
+        )
+        if freed < held / 2 or extra_ms > args.budget_ms:
+            failed = True
+    print(f"reconnect with buffers kept: {baseline_ms:.1f} ms (median)")
+
+    if args.check and failed:
+        print(
+            f"FAIL: private memory dropped by less than half the buffer bytes or reconnecting "
+            f"took more than {args.budget_ms:g} ms longer"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Measures the toggle latency of muting every microphone at once.
+
+Runs MicrophoneGroup against fake capture endpoints where every COM call
+(mute, enumeration, activation) takes --call-ms, and compares it with muting the
+endpoints one after another and with re-enumerating and re-opening them on every
+toggle. Then unplugs and replugs a device, plugs in a new one while muted and
+makes one fail, and reports enumerations and per-device results.
+
+Usage: python benchmarks/bench_mic_endpoints.py [--devices 4] [--call-ms 4] [--toggles 200]
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+import fakes
+from mic_endpoints import MicrophoneGroup
+
+
+def sequential(backend, mute):
+    for volume in list(backend.volumes.values()):
+        volume.SetMute(1 if mute else 0, None)
+
+
+def enumerate_each_toggle(backend, mute):
+    for endpoint in backend.enumerate():
+        backend.open(endpoint.id).SetMute(1 if mute else 0, None)
+
+
+def report(label, timings):
+    print(
+        f"{label:<26} p50 {np.percentile(timings, 50):6.2f} ms  "
+        f"p99 {np.percentile(timings, 99):6.2f} ms"
+    )
+
+
+def describe(group):
+    return ", ".join(
+        f"{result.endpoint.name}: {'ok' if result.error is None else 'FAILED'}"
+        for result in group.last_results
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--call-ms", type=float, default=4.0)
+    parser.add_argument("--toggles", type=int, default=200)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    names = ["Headset Mic", "Webcam Mic", "Laptop Array", "USB Interface", "Dock Mic"]
+    names += [f"Mic {index}" for index in range(len(names), args.devices)]
+    backend = fakes.FakeAudioBackend(names[: args.devices], args.call_ms / 1000)
+    print(f"{args.devices} microphones, {args.call_ms:g} ms per mute call")
+
+    report(
+        "one after another",
+        fakes.measure(lambda m: sequential(backend, m), (True, False), args.toggles),
+    )
+    report(
+        "re-enumerate every toggle",
+        fakes.measure(
+            lambda m: enumerate_each_toggle(backend, m), (True, False), args.toggles
+        ),
+    )
+
+    group = MicrophoneGroup(backend)
+    group.start()
+    try:
+        enumerations = backend.enumerations
+        report(
+            "MicrophoneGroup",
+            fakes.measure(group.set_mute, (True, False), args.toggles),
+        )
+        print(
+            f"enumerations during {args.toggles} toggles: "
+            f"{backend.enumerations - enumerations}"
+        )
+
+        backend.unplug(names[1])
+        group.set_mute(True)
+        print(f"after unplugging {names[1]}: {describe(group)}")
+        backend.plug(names[1])
+        group.set_mute(False)
+        print(f"after replugging it: {describe(group)}")
+
+        # A device plugged in while muted must come up muted, without a toggle
+        new_name = "Plugged Mic"
+        group.set_mute(True)
+        started_at = time.perf_counter()
+        backend.plug(new_name)
+        muted = fakes.wait_until(lambda: backend.volumes[new_name].muted == 1, 2.0)
+        print(
+            f"{new_name} plugged in while muted: "
+            + (
+                f"muted after {(time.perf_counter() - started_at) * 1000:.1f} ms"
+                if muted
+                else "NOT MUTED"
+            )
+        )
+        backend.unplug(new_name)
+
+        backend.volumes[names[0]].fail = True
+        ok = group.set_mute(True)
+        print(f"with {names[0]} failing: success={ok}; {describe(group)}")
+        backend.volumes[names[0]].fail = False
+        ok = group.set_mute(True)
+        print(f"after it recovers: success={ok}; {describe(group)}")
+        print(f"total enumerations: {backend.enumerations}")
+    finally:
+        group.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Measures the per-frame cost of drawing the mic-muted badge into outgoing frames.
+
+Times MuteBadge.apply (blending only the badge rectangle in place) against a
+full-frame alpha blend of an overlay the size of the frame, then runs a pipeline
+and reports how many frames it takes for the badge to appear after muting the
+microphone and disappear after unmuting it.
+
+Usage: python benchmarks/bench_mute_badge.py [--width 1920] [--height 1080] [--size 0.1]
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+import fakes
+from camera import CameraManager
+from effects import MuteBadge
+
+
+def full_frame_blend(badge, width, height):
+    """Blends a frame-sized overlay and alpha mask, as a naive overlay would."""
+    alpha = np.zeros((height, width, 1), dtype=np.float32)
+    overlay = np.zeros((height, width, 3), dtype=np.float32)
+    inverse = badge._inverse_alpha[..., :1].astype(np.float32)
+    alpha[badge._rows, badge._cols] = (255 - inverse) / 255
+    overlay[badge._rows, badge._cols] = badge._premultiplied / np.maximum(
+        255 - inverse, 1
+    )
+
+    def blend(frame):
+        blended = frame * (1 - alpha) + overlay * alpha
+        np.copyto(frame, blended, casting="unsafe")
+
+    return blend
+
+
+def frames_until(sink, predicate, timeout=5.0):
+    started = sink.frames_sent
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        frame = sink.last_frame
+        if frame is not None and predicate(frame):
+            return sink.frames_sent - started
+        time.sleep(0.002)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--size", type=float, default=0.1)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    frame = fakes.FakeCapture(args.width, args.height).frame
+    badge = MuteBadge(args.width, args.height, size=args.size)
+    diameter = badge._rows.stop - badge._rows.start
+    print(f"{args.width}x{args.height}, badge {diameter}x{diameter}")
+    for label, fn, iterations in (
+        ("badge region", badge.apply, args.iterations),
+        ("static frame (cached)", badge.apply_static, args.iterations),
+        (
+            "full-frame blend",
+            full_frame_blend(badge, args.width, args.height),
+            max(1, args.iterations // 20),
+        ),
+    ):
+        timings = fakes.measure(fn, (frame,), iterations)
+        print(
+            f"{label:<22} mean {timings.mean():7.3f} ms  "
+            f"p99 {np.percentile(timings, 99):7.3f} ms"
+        )
+
+    sinks = fakes.SinkRecorder()
+    config = fakes.FakeConfig(
+        camera_width=1280, camera_height=720, camera_fps=30, camera_mute_badge=True
+    )
+    manager = CameraManager(
+        config, capture_factory=fakes.capture_factory(1280, 720), sink_factory=sinks
+    )
+    manager.start()
+    try:
+        time.sleep(1.0)
+        probe = manager._mute_badge
+        diameter = probe._rows.stop - probe._rows.start
+        # A patch of the red disc left of the microphone; the fake camera is noise
+        row = (probe._rows.start + probe._rows.stop) // 2
+        col = probe._cols.start + diameter // 8
+        patch = (slice(row - 2, row + 2), slice(col, col + 4))
+
+        def badged(f):
+            region = f[patch]
+            return bool((region[..., 2] > 150).all() and (region[..., 0] < 100).all())
+
+        sink = sinks.sinks[0]
+        config.mic_active = False
+        shown = frames_until(sink, badged)
+        config.mic_active = True
+        hidden = frames_until(sink, lambda f: not badged(f))
+        print(f"pipeline: badge shown within {shown} frames, hidden within {hidden}")
+    finally:
+        manager.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measures the per-frame cost of the privacy blur against the frame budget.
+
+Compares the downscale-blur-upscale fast path used by CameraManager with a naive
+full-resolution GaussianBlur of similar visual strength.
+
+Usage: python benchmarks/bench_privacy_blur.py [--width 1920] [--height 1080] [--fps 30]
+"""
+
+import argparse
+
+import cv2
+import numpy as np
+
+import fakes
+from effects import PrivacyBlur
+
+
+def report(label, timings_ms, budget_ms):
+    mean = timings_ms.mean()
+    print(
+        f"{label:<28} mean {mean:7.3f} ms  p50 {np.percentile(timings_ms, 50):7.3f} ms  "
+        f"p99 {np.percentile(timings_ms, 99):7.3f} ms  max {timings_ms.max():7.3f} ms  "
+        f"({100.0 * mean / budget_ms:5.1f}% of budget)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    frame = fakes.FakeCapture(args.width, args.height).frame
+    budget_ms = 1000.0 / args.fps
+    blur = PrivacyBlur(args.width, args.height)
+    # Kernel scaled up to roughly match the fast path's effective blur radius
+    naive_kernel = (blur.kernel_size * args.width // blur.internal_width) | 1
+
+    print(
+        f"{args.width}x{args.height} @ {args.fps} fps, frame budget {budget_ms:.2f} ms"
+    )
+    report(
+        f"fast path ({blur.internal_width}px, k={blur.kernel_size})",
+        fakes.measure(blur.apply, (frame,), args.iterations, warmup=10),
+        budget_ms,
+    )
+    report(
+        f"naive full-res (k={naive_kernel})",
+        fakes.measure(
+            lambda f: cv2.GaussianBlur(f, (naive_kernel, naive_kernel), 0),
+            (frame,),
+            max(5, args.iterations // 20),
+            warmup=10,
+        ),
+        budget_ms,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Measures how long a camera toggle-off takes to reach the sink while capture is stalled.
+
+Turns the camera off while the pipeline thread is blocked in a slow read, in
+camera warmup, in the pause after releasing the device and with fades enabled,
+and reports the time from the toggle to the first disabled frame at the sink,
+any live frame sent after the toggle, and the longest gap between frames while
+disabled. With --check,
+exits non-zero if any toggle takes longer than one frame interval or a live frame
+follows a toggle.
+
+Usage: python benchmarks/bench_privacy_preempt.py [--fps 30] [--stall-ms 500] [--rounds 20] [--check]
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+
+import numpy as np
+
+import fakes
+from camera import CameraManager
+
+# Releasing the device pauses the pipeline for two seconds per toggle
+REOPEN_ROUNDS = 4
+FADE_FRAMES = 8
+
+
+class StallingCapture(fakes.FakeCapture):
+    """FakeCapture whose reads block for a scriptable time."""
+
+    def __init__(self, width, height, stall, warmup_stall, warmup_reads):
+        super().__init__(width, height, read_delay=0.005)
+        self.stall = stall
+        self.warmup_stall = warmup_stall
+        self.warmup_reads = warmup_reads
+
+    def read(self):
+        if self.reads < self.warmup_reads:
+            time.sleep(self.warmup_stall)
+        elif self.stall.is_set():
+            time.sleep(self.stall.duration)
+        return super().read()
+
+
+class stalling_capture_factory:
+    def __init__(self, width, height, stall, warmup_stall=0.0, warmup_reads=0):
+        self.width = width
+        self.height = height
+        self.stall = stall
+        self.warmup_stall = warmup_stall
+        self.warmup_reads = warmup_reads
+
+    def __call__(self, *capture_args):
+        return StallingCapture(
+            self.width, self.height, self.stall, self.warmup_stall, self.warmup_reads
+        )
+
+
+class Stall(threading.Event):
+    def __init__(self, duration):
+        super().__init__()
+        self.duration = duration
+
+
+class ToggleSink(fakes.FakeSink):
+    """Records when frames arrive and whether they carry the live picture."""
+
+    def __init__(self, width, height, fps):
+        super().__init__(width, height, fps)
+        self.sends = []
+
+    def send_frame(self, frame):
+        # The fake capture fills frames with noise; disabled frames are black
+        self.sends.append((time.perf_counter(), bool(frame[:8, :8].any())))
+        super().send_frame(frame)
+
+    def since(self, started_at):
+        return [send for send in list(self.sends) if send[0] >= started_at]
+
+
+class single_sink:
+    def __init__(self):
+        self.sink = None
+
+    def __call__(self, width, height, fps):
+        self.sink = ToggleSink(width, height, fps)
+        return self.sink
+
+
+def toggle_off(config, sink, observe):
+    """Turns the camera off and returns (latency, live frames after, max gap)."""
+    toggled_at = time.perf_counter()
+    config.camera_active = False
+    time.sleep(observe)
+    sends = sink.since(toggled_at)
+    black = [sent_at for sent_at, live in sends if not live]
+    latency = black[0] - toggled_at if black else float("inf")
+    leaked = sum(1 for _, live in sends if live)
+    times = [toggled_at] + [sent_at for sent_at, _ in sends]
+    gap = max(np.diff(times)) if len(times) > 1 else observe
+    return latency, leaked, gap
+
+
+def run_scenario(label, args, stall, factory, before_toggle, config_data):
+    sinks = single_sink()
+    config = fakes.FakeConfig(
+        camera_width=640, camera_height=360, camera_fps=args.fps, **config_data
+    )
+    manager = CameraManager(config, capture_factory=factory, sink_factory=sinks)
+    manager.start()
+    results = []
+    try:
+        fakes.wait_until(
+            lambda: sinks.sink is not None and sinks.sink.frames_sent > 5, 10
+        )
+        for _ in range(args.rounds):
+            config.camera_active = True
+            if before_toggle is not in_warmup and not fakes.wait_until(
+                lambda: sinks.sink.sends[-1][1], 10
+            ):
+                print(f"{label}: camera never went live")
+                break
+            before_toggle(stall)
+            results.append(toggle_off(config, sinks.sink, args.observe))
+            stall.clear()
+    finally:
+        config.camera_active = False
+        manager.stop()
+    return results, manager.privacy_preemptions
+
+
+def in_warmup(stall):
+    # The device is reopened on enable; toggle off while it is still warming up
+    time.sleep(stall.duration / 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--stall-ms", type=float, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--observe", type=float, default=0.6)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    frame_interval = 1.0 / args.fps
+    stall_seconds = args.stall_ms / 1000
+    rng = np.random.default_rng(0)
+
+    def stall_read(stall):
+        stall.set()
+        # Toggle at a random point inside the blocked read
+        time.sleep(frame_interval + rng.uniform(0, stall.duration / 2))
+
+    def no_stall(stall):
+        time.sleep(rng.uniform(0, frame_interval))
+
+    def after_fade_in(stall):
+        # Let the fade into live video finish, so the toggle leaves a live frame
+        time.sleep((FADE_FRAMES + 2) * frame_interval + rng.uniform(0, frame_interval))
+
+    scenarios = (
+        ("no stall", no_stall, {"camera_keep_open_when_muted": True}, {}),
+        ("stalled read", stall_read, {"camera_keep_open_when_muted": True}, {}),
+        # Fades must never show the live picture after the toggle
+        (
+            "fade",
+            after_fade_in,
+            {"camera_keep_open_when_muted": True, "camera_fade_frames": FADE_FRAMES},
+            {},
+        ),
+        # The device is released on every toggle-off, with its settle pause
+        ("release pause", no_stall, {}, {}),
+        (
+            "warmup",
+            in_warmup,
+            {"camera_warmup_timeout": 5.0},
+            {"warmup_stall": stall_seconds, "warmup_reads": 3},
+        ),
+    )
+
+    print(
+        f"{args.fps} fps (frame interval {frame_interval * 1000:.1f} ms), "
+        f"stalls {args.stall_ms:g} ms, {args.rounds} toggles per case "
+        f"({REOPEN_ROUNDS} where the device is reopened each time)"
+    )
+    failed = False
+    for label, before_toggle, config_data, factory_args in scenarios:
+        stall = Stall(stall_seconds)
+        factory = stalling_capture_factory(640, 360, stall, **factory_args)
+        rounds = args.rounds if label not in ("release pause", "warmup") else REOPEN_ROUNDS
+        results, preemptions = run_scenario(
+            label,
+            argparse.Namespace(**{**vars(args), "rounds": rounds}),
+            stall,
+            factory,
+            before_toggle,
+            config_data,
+        )
+        if not results:
+            failed = True
+            continue
+        latencies = np.array([latency for latency, _, _ in results]) * 1000
+        leaked = sum(leaks for _, leaks, _ in results)
+        gap = max(gap for _, _, gap in results) * 1000
+        print(
+            f"{label:<14} toggle->black p50 {np.percentile(latencies, 50):6.1f} ms  "
+            f"max {latencies.max():6.1f} ms  live after toggle {leaked}  "
+            f"max gap {gap:6.1f} ms  guard sends {preemptions}"
+        )
+        if latencies.max() > frame_interval * 1000 or leaked:
+            failed = True
+
+    if args.check and failed:
+        print("FAIL: toggle-off exceeded one frame interval or leaked live frames")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
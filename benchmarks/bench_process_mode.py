@@ -0,0 +1,143 @@
+"""
+Compares frame jitter and toggle latency with the camera pipeline in-process and in a child process.
+
+Both modes publish into the shared memory sink, whose per-frame timestamps are
+taken by the writer, so they are not skewed by the reader. Busy Python threads
+in the parent stand in for the OSD, tray, hotkey listener and COM calls that
+share the GIL with an in-process pipeline.
+
+Usage: python benchmarks/bench_process_mode.py [--duration 5] [--load-threads 2]
+"""
+
+import argparse
+import logging
+import threading
+import time
+
+import numpy as np
+
+import fakes
+from camera import CameraPipelineGroup
+from camera_process import CameraProcessSupervisor
+from shm_sink import SharedMemoryFrameReader
+
+
+def busy_python(stop_event):
+    while not stop_event.is_set():
+        sum(range(2000))
+
+
+def attach_reader(name, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return SharedMemoryFrameReader(name)
+        except (FileNotFoundError, ValueError):
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+
+def is_black(frame):
+    return not frame[::64, ::64].any()
+
+
+def run(mode, duration, load_threads, toggle_interval):
+    config = fakes.FakeConfig(
+        camera_fps=30,
+        camera_outputs=["shm"],
+        camera_shm_name=f"vcm_bench_{mode}",
+        camera_shm_slots=8,
+        # Keep the device open so toggles measure the control path, not a reopen
+        camera_keep_open_when_muted=True,
+    )
+    capture = fakes.capture_factory(1920, 1080)
+    if mode == "process":
+        manager = CameraProcessSupervisor(config, capture_factory=capture)
+    else:
+        manager = CameraPipelineGroup(config, capture_factory=capture)
+    manager.start()
+    reader = attach_reader(f"vcm_bench_{mode}")
+
+    stop_event = threading.Event()
+    loaders = [
+        threading.Thread(target=busy_python, args=(stop_event,), daemon=True)
+        for _ in range(load_threads)
+    ]
+    for loader in loaders:
+        loader.start()
+
+    # Wait for live frames before measuring
+    sequence = 0
+    while True:
+        result = reader.wait_for_frame(sequence, timeout=10.0)
+        sequence, timestamp, frame = result
+        if not is_black(frame):
+            break
+
+    intervals = []
+    toggle_latencies = []
+    handler_latencies = []
+    pending_toggle = None
+    next_toggle = time.monotonic() + toggle_interval
+    previous = (sequence, timestamp)
+    ends_at = time.monotonic() + duration
+
+    while time.monotonic() < ends_at:
+        now = time.monotonic()
+        if pending_toggle is None and now >= next_toggle:
+            config.camera_active = not config.camera_active
+            handler_latencies.append(time.monotonic() - now)
+            pending_toggle = (now, config.camera_active)
+
+        result = reader.wait_for_frame(sequence, timeout=1.0, poll_interval=0.001)
+        if result is None:
+            continue
+        sequence, timestamp, frame = result
+        if sequence == previous[0] + 1:
+            intervals.append(timestamp - previous[1])
+        previous = (sequence, timestamp)
+
+        if pending_toggle is not None:
+            toggled_at, expect_live = pending_toggle
+            if timestamp >= toggled_at and is_black(frame) != expect_live:
+                toggle_latencies.append(timestamp - toggled_at)
+                pending_toggle = None
+                next_toggle = time.monotonic() + toggle_interval
+
+    stop_event.set()
+    reader.close()
+    manager.stop()
+    return (
+        np.array(intervals) * 1000.0,
+        np.array(toggle_latencies) * 1000.0,
+        np.array(handler_latencies) * 1000.0,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--load-threads", type=int, default=2)
+    parser.add_argument("--toggle-interval", type=float, default=0.25)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    print(
+        f"{'mode':<8} {'frame interval ms (mean/std/p99)':>34} "
+        f"{'toggle->frame ms (p50/p95)':>28} {'handler ms (p50/max)':>22}"
+    )
+    for mode in ("thread", "process"):
+        intervals, toggles, handlers = run(
+            mode, args.duration, args.load_threads, args.toggle_interval
+        )
+        print(
+            f"{mode:<8} {intervals.mean():>14.2f} / {intervals.std():6.2f} / "
+            f"{np.percentile(intervals, 99):7.2f} "
+            f"{np.percentile(toggles, 50):>15.2f} / {np.percentile(toggles, 95):7.2f} "
+            f"{np.percentile(handlers, 50):>11.3f} / {handlers.max():7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
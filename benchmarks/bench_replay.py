@@ -0,0 +1,127 @@
+"""
+Records a synthetic camera session and replays it through a camera pipeline.
+
+Records reads from a FakeCapture (with a stall and failed reads mixed in) into
+a recording file, then replays it through CameraPipelineGroup as fast as
+possible to measure replay throughput, and in real time to compare the replayed
+read intervals with the recorded ones.
+
+Usage: python benchmarks/bench_replay.py [--frames 600] [--width 1280] [--height 720]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import fakes
+import recording
+from camera import CameraPipelineGroup
+
+
+class FlakyCapture(fakes.FakeCapture):
+    """FakeCapture that stalls once and fails a few reads, like a misbehaving webcam."""
+
+    def __init__(self, width, height, fps):
+        super().__init__(width, height)
+        self.frame_interval = 1.0 / fps
+
+    def read(self):
+        time.sleep(0.25 if self.reads == 60 else self.frame_interval)
+        frame = self.next_frame()
+        if self.reads % 97 == 0:
+            return False, None
+        return True, frame
+
+
+def record_session(path, frames, width, height, fps):
+    max_bytes = (frames + 1) * (width * height * 3 + 128)
+    recorder = recording.FrameRecorder(path, max_bytes=max_bytes)
+    capture = recording.RecordingCapture(FlakyCapture(width, height, fps), recorder)
+    capture.get(fakes.cv2.CAP_PROP_FRAME_WIDTH)
+    capture.get(fakes.cv2.CAP_PROP_FRAME_HEIGHT)
+    capture.get(fakes.cv2.CAP_PROP_FPS)
+    for _ in range(frames):
+        capture.read()
+    recorder.close()
+
+
+def replay_intervals(path, realtime):
+    factory = recording.ReplayCaptureFactory(path, realtime=realtime)
+    capture = factory()
+    stamps = []
+    started_at = time.perf_counter()
+    while capture.isOpened():
+        capture.read()
+        stamps.append(time.perf_counter())
+    elapsed = time.perf_counter() - started_at
+    factory.close()
+    return np.diff(stamps), elapsed
+
+
+def replay_through_pipeline(path, width, height):
+    config = fakes.FakeConfig(
+        camera_width=width,
+        camera_height=height,
+        camera_fps=100000,  # Frame pacing off: measure raw pipeline throughput
+        camera_replay_path=path,
+        camera_replay_realtime=False,
+        camera_replay_loop=True,
+        camera_read_failure_threshold=1000,
+    )
+    sinks = fakes.SinkRecorder()
+    group = CameraPipelineGroup(config, sink_factory=sinks)
+    group.start()
+    time.sleep(0.5)
+    start_frames = sinks.frames_sent
+    time.sleep(2.0)
+    fps = (sinks.frames_sent - start_frames) / 2.0
+    group.stop()
+    return fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=int, default=30)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.vcmraw")
+        record_session(path, args.frames, args.width, args.height, args.fps)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        source = recording.FrameRecording(path)
+        recorded = np.diff([source.read_times(i)[1] for i in range(len(source))])
+        failed = sum(not source.read(i)[0] for i in range(len(source)))
+        source.close()
+
+        fast_intervals, fast_elapsed = replay_intervals(path, realtime=False)
+        realtime_intervals, _ = replay_intervals(path, realtime=True)
+        pipeline_fps = replay_through_pipeline(path, args.width, args.height)
+
+    errors = np.abs(realtime_intervals - recorded) * 1000
+    print(
+        f"Recorded {args.frames} reads at {args.width}x{args.height} "
+        f"({size_mb:.0f} MB, {failed} failed reads, longest stall {recorded.max() * 1000:.0f} ms)"
+    )
+    print(
+        f"Fast replay:      {args.frames / fast_elapsed:,.0f} reads/s "
+        f"({fast_intervals.mean() * 1e6:.1f} us per read)"
+    )
+    print(
+        f"Real-time replay: interval error p50 {np.percentile(errors, 50):.3f} ms, "
+        f"p99 {np.percentile(errors, 99):.3f} ms, stall replayed as "
+        f"{realtime_intervals.max() * 1000:.0f} ms"
+    )
+    print(f"Pipeline replay:  {pipeline_fps:,.0f} fps through CameraManager")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Soak-tests a camera pipeline for memory leaks, thread leaks and frame-time drift.
+
+Runs CameraManager at an accelerated frame rate against a small synthetic
+camera and sink until --frames frames have been produced, while a chaos thread
+keeps toggling the camera, disabled mode and mic, disconnecting and reconnecting
+the consumer (long enough for idle trims), failing reads and dropping the device
+so it is reopened. Every --window seconds it samples RSS, traced Python memory,
+the thread count and the mean frame processing time and frame interval. After
+the warmup windows, each series is fitted with a line; a rise over the run
+beyond its tolerance is reported as a trend, along with the allocation sites
+that grew most. With --check, exits non-zero if any series trends upward or
+any thread dies with an exception.
+
+Usage: python benchmarks/bench_soak.py [--frames 1000000] [--fps 2000] [--window 2] [--seed 0] [--check]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+import fakes
+from camera import CameraManager
+from memory import current_rss
+
+WIDTH, HEIGHT = 320, 180
+EVENTS = ("toggle", "mode", "mic", "disconnect", "read_failures", "reopen")
+
+
+class SoakCapture(fakes.FakeCapture):
+    """FakeCapture that can fail a number of reads or report itself closed."""
+
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        self.fail_reads = 0
+
+    def read(self):
+        if self.fail_reads > 0:
+            self.fail_reads -= 1
+            if self.fail_reads % 2:
+                raise RuntimeError("injected read failure")
+            return False, None
+        return super().read()
+
+
+class soak_capture_factory:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.current = None
+
+    def __call__(self, *capture_args):
+        self.current = SoakCapture(self.width, self.height)
+        return self.current
+
+
+class Chaos:
+    """Fires a random fault or state change every --event-ms on average."""
+
+    def __init__(self, config, captures, sinks, rng, event_interval, threshold):
+        self.config = config
+        self.captures = captures
+        self.sinks = sinks
+        self.rng = rng
+        self.event_interval = event_interval
+        self.threshold = threshold
+        self.counts = dict.fromkeys(EVENTS, 0)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="SoakChaos", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        self._set_connected(True)
+
+    def _set_connected(self, connected):
+        for sink in self.sinks.sinks:
+            sink.connected = connected
+
+    def _run(self):
+        while not self._stop_event.wait(self.rng.exponential(self.event_interval)):
+            event = EVENTS[self.rng.integers(len(EVENTS))]
+            self.counts[event] += 1
+            if event == "toggle":
+                self.config.camera_active = not self.config.camera_active
+            elif event == "mode":
+                modes = fakes.FakeConfig.DISABLED_OUTPUT_MODES
+                self.config.camera_disabled_mode = modes[self.rng.integers(len(modes))]
+            elif event == "mic":
+                self.config.mic_active = not self.config.mic_active
+            elif event == "disconnect":
+                self._set_connected(False)
+                # Up to twice camera_idle_trim_after, so about half of them trim
+                self._stop_event.wait(self.rng.uniform(0.0, 0.2))
+                self._set_connected(True)
+            elif event == "read_failures" and self.captures.current:
+                # Sometimes below the release threshold, sometimes past it
+                self.captures.current.fail_reads = int(
+                    self.rng.integers(1, self.threshold + 2)
+                )
+            elif event == "reopen" and self.captures.current:
+                self.captures.current.opened = False
+
+
+class ThreadFailures(list):
+    """threading.excepthook that keeps every uncaught thread exception."""
+
+    def __call__(self, args):
+        self.append(f"{args.thread.name}: {args.exc_type.__name__}: {args.exc_value}")
+        threading.__excepthook__(args)
+
+
+def sample(manager, window_started_at):
+    row = manager.stats.drain()
+    elapsed = time.perf_counter() - window_started_at
+    return {
+        "frames": row["frames"],
+        "rss_mib": current_rss() / 2**20,
+        "traced_mib": tracemalloc.get_traced_memory()[0] / 2**20,
+        "threads": threading.active_count(),
+        "frame_ms": row["frame_ms_mean"] or 0.0,
+        "interval_ms": elapsed / row["frames"] * 1000 if row["frames"] else 0.0,
+    }
+
+
+def fitted_rise(values):
+    """Rise of the least-squares line from the first to the last window."""
+    if len(values) < 2:
+        return 0.0
+    slope = np.polyfit(np.arange(len(values)), values, 1)[0]
+    return slope * (len(values) - 1)
+
+
+def top_growth(before, after, limit=10):
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ]
+    stats = after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "lineno"
+    )
+    return [stat for stat in stats if stat.size_diff > 0][:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=1_000_000)
+    parser.add_argument("--fps", type=int, default=2000)
+    parser.add_argument("--window", type=float, default=2.0)
+    parser.add_argument("--warmup-windows", type=int, default=5)
+    parser.add_argument("--event-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rss-mib", type=float, default=4.0)
+    parser.add_argument("--traced-mib", type=float, default=1.0)
+    parser.add_argument("--threads", type=float, default=0.5)
+    parser.add_argument("--drift", type=float, default=0.25)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    if current_rss() is None:
+        print("RSS is not readable on this platform")
+        sys.exit(1 if args.check else 0)
+
+    rng = np.random.default_rng(args.seed)
+    threshold = 3
+    thread_failures = ThreadFailures()
+    threading.excepthook = thread_failures
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as directory:
+        slate_path = os.path.join(directory, "slate.png")
+        cv2.imwrite(slate_path, np.full((90, 160, 3), 128, dtype=np.uint8))
+        config = fakes.FakeConfig(
+            camera_width=WIDTH,
+            camera_height=HEIGHT,
+            camera_fps=args.fps,
+            camera_fade_frames=8,
+            camera_mute_badge=True,
+            camera_slate_image=slate_path,
+            camera_scaled_outputs=[{"width": WIDTH // 2, "height": HEIGHT // 2}],
+            camera_idle_trim_after=0.1,
+            camera_release_settle=0.0,
+            camera_setup_retry_interval=0.01,
+            camera_read_failure_threshold=threshold,
+            camera_health_check=False,
+        )
+        captures = soak_capture_factory(WIDTH, HEIGHT)
+        sinks = fakes.SinkRecorder()
+        manager = CameraManager(config, capture_factory=captures, sink_factory=sinks)
+        chaos = Chaos(config, captures, sinks, rng, args.event_ms / 1000, threshold)
+
+        print(
+            f"{WIDTH}x{HEIGHT} at {args.fps} fps target, {args.frames:,} frames, "
+            f"an event every {args.event_ms:g} ms, {args.window:g}s windows"
+        )
+        manager.start()
+        chaos.start()
+        windows = []
+        baseline_snapshot = None
+        frames = 0
+        started_at = time.perf_counter()
+        try:
+            while frames < args.frames:
+                window_started_at = time.perf_counter()
+                manager.stats.drain()
+                time.sleep(args.window)
+                row = sample(manager, window_started_at)
+                windows.append(row)
+                frames += row["frames"]
+                if len(windows) == args.warmup_windows:
+                    baseline_snapshot = tracemalloc.take_snapshot()
+                if len(windows) % 10 == 0:
+                    print(
+                        f"{frames:>10,} frames  RSS {row['rss_mib']:6.1f} MiB  "
+                        f"traced {row['traced_mib']:5.2f} MiB  threads {row['threads']}  "
+                        f"frame {row['frame_ms']:.3f} ms  interval {row['interval_ms']:.3f} ms"
+                    )
+        finally:
+            chaos.stop()
+            final_snapshot = tracemalloc.take_snapshot()
+            manager.stop()
+    tracemalloc.stop()
+
+    seconds = time.perf_counter() - started_at
+    print(
+        f"{frames:,} frames in {seconds:.0f}s ({frames / seconds:.0f} fps); events: "
+        + ", ".join(f"{name} {count}" for name, count in chaos.counts.items())
+        + f"; idle trims {manager.idle_trims}"
+    )
+    measured = windows[args.warmup_windows :]
+    if len(measured) < 3:
+        print("Too few windows after warmup to fit a trend; raise --frames.")
+        sys.exit(1 if args.check else 0)
+
+    failed = bool(thread_failures)
+    for failure in thread_failures:
+        print(f"thread died: {failure}")
+    print(f"{'series':<12} {'first':>9} {'last':>9} {'fitted rise':>12} {'allowed':>9}")
+    for name in ("rss_mib", "traced_mib", "threads", "frame_ms", "interval_ms"):
+        values = np.array([row[name] for row in measured], dtype=float)
+        if name == "rss_mib":
+            allowed = args.rss_mib
+        elif name == "traced_mib":
+            allowed = args.traced_mib
+        elif name == "threads":
+            allowed = args.threads
+        else:
+            allowed = args.drift * float(np.median(values))
+        rise = fitted_rise(values)
+        trending = rise > allowed
+        failed = failed or trending
+        print(
+            f"{name:<12} {values[0]:9.3f} {values[-1]:9.3f} {rise:12.3f} {allowed:9.3f}"
+            + ("  TRENDING UP" if trending else "")
+        )
+
+    if baseline_snapshot is not None:
+        print("allocation sites that grew most since warmup:")
+        for stat in top_growth(baseline_snapshot, final_snapshot):
+            frame = stat.traceback[0]
+            print(
+                f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} blocks  "
+                f"{os.path.basename(frame.filename)}:{frame.lineno}"
+            )
+
+    if args.check and failed:
+        print("FAIL: a series trended upward or a thread died during the soak")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
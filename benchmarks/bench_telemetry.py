@@ -0,0 +1,158 @@
+"""
+Smoke check of the telemetry write path and the command line summary.
+
+Records a minute of camera and microphone activity into StatsWindow counters,
+runs a TelemetryRecorder against a temporary database and stops it, which
+collects the partial minute and flushes it. The minute is then read back
+through `telemetry.py trend`, and written again to check that a repeated
+minute replaces its row (INSERT OR REPLACE) instead of failing the flush.
+With --check, exits non-zero if any value read back differs from what was
+recorded.
+
+Usage: python benchmarks/bench_telemetry.py [--frames 1800] [--check]
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import sys
+import tempfile
+import time
+
+import fakes
+import telemetry
+from telemetry import StatsWindow, TelemetryRecorder
+
+
+def record_activity(camera_stats, mic_stats, frames, budget):
+    """Fills the windows; every tenth frame is over budget and fails to read."""
+    for index in range(frames):
+        camera_stats.record_frame(budget * (1.5 if index % 10 == 0 else 0.5), budget)
+        if index % 10 == 0:
+            camera_stats.count("read_failures")
+    camera_stats.count("opens")
+    camera_stats.observe("open", 0.25)
+    for _ in range(4):
+        mic_stats.count("toggles")
+        mic_stats.observe("toggle", 0.002)
+    return {
+        "frames": frames,
+        "overruns": (frames + 9) // 10,
+        "read fails": (frames + 9) // 10,
+        "opens": 1,
+        "mic toggles": 4,
+    }
+
+
+def query_trend(db_path, source):
+    """Runs `telemetry.py trend` and returns {header: value} of its single row."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        telemetry.main(["--db", db_path, "trend", "--by", "day", "--source", source])
+    lines = output.getvalue().splitlines()
+    if len(lines) != 2:
+        return None
+    # Row: day, source, then one value per summary column (none contain spaces)
+    values = lines[1].split()[2:]
+    return dict(zip(telemetry._SUMMARY_HEADERS, values))
+
+
+def compare(label, row, expected):
+    if row is None:
+        print(f"{label}: NO ROW")
+        return [f"{label}: no row read back"]
+    mismatches = [
+        f"{label}: {header} {row.get(header)} != {value}"
+        for header, value in expected.items()
+        if row.get(header) != str(value)
+    ]
+    print(
+        f"{label}: "
+        + ", ".join(f"{header} {row.get(header)}" for header in expected)
+        + ("" if not mismatches else "  MISMATCH")
+    )
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=1800)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit non-zero if the minute read back differs from what was recorded",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    camera_stats = StatsWindow()
+    mic_stats = StatsWindow()
+    sources = [
+        lambda: {"camera:smoke": camera_stats.drain()},
+        lambda: {"mic": mic_stats.drain()},
+    ]
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = telemetry.default_db_path(directory)
+        recorder = TelemetryRecorder(db_path, sources, settings={"camera_fps": 30})
+        window_started_at = recorder._window_started_at
+        recorder.start()
+        if not fakes.wait_until(lambda: recorder.session_id is not None, 5):
+            print("FAIL: telemetry session was not created")
+            sys.exit(1)
+        expected = record_activity(camera_stats, mic_stats, args.frames, 1 / 30)
+
+        started_at = time.perf_counter()
+        recorder.stop()
+        stop_ms = (time.perf_counter() - started_at) * 1000
+        print(f"stop (collect, flush, end session): {stop_ms:.1f} ms")
+        print(f"rows written: {recorder.rows_written}")
+        if recorder.rows_written != 2:
+            failures.append(f"{recorder.rows_written} rows written, expected 2")
+
+        started_at = time.perf_counter()
+        camera_row = query_trend(db_path, "camera:smoke")
+        query_ms = (time.perf_counter() - started_at) * 1000
+        print(f"trend query: {query_ms:.1f} ms")
+        camera_keys = ("frames", "overruns", "read fails", "opens")
+        failures += compare(
+            "camera:smoke", camera_row, {key: expected[key] for key in camera_keys}
+        )
+        failures += compare(
+            "mic", query_trend(db_path, "mic"), {"mic toggles": expected["mic toggles"]}
+        )
+
+        # The same session and minute again: the newer window replaces the row
+        repeat = TelemetryRecorder(db_path, sources[:1])
+        repeat.session_id = recorder.session_id
+        repeat._window_started_at = window_started_at
+        record_activity(camera_stats, StatsWindow(), args.frames // 2, 1 / 30)
+        repeat._collect()
+        connection = telemetry.open_database(db_path)
+        try:
+            repeat._flush(connection)
+            rows = connection.execute(
+                "SELECT COUNT(*) FROM minute_stats WHERE source = 'camera:smoke'"
+            ).fetchone()[0]
+        finally:
+            connection.close()
+        print(f"rows for camera:smoke after repeating the minute: {rows}")
+        if repeat.rows_written != 1:
+            failures.append("flushing a repeated minute failed")
+        if rows != 1:
+            failures.append(f"repeated minute left {rows} rows, expected 1")
+        failures += compare(
+            "camera:smoke repeated",
+            query_trend(db_path, "camera:smoke"),
+            {"frames": args.frames // 2},
+        )
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Synthetic capture devices, virtual camera sinks and config objects used by the
+benchmarks. They stand in for cv2.VideoCapture, softcam.camera and ConfigReader
+so the real pipelines can run headless on any OS. Also holds the timing and
+polling helpers the benchmarks share.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# The application modules live in src/ and import each other by bare name
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+from state import StateStore, is_camera_live, state_property, toggle_state  # noqa: E402
+
+
+def measure(fn, inputs, iterations, warmup=0):
+    """
+    Times single calls of fn, cycling through inputs.
+    Args:
+        fn (callable): Called as fn(inputs[index % len(inputs)]).
+        inputs (sequence): Arguments to pass, e.g. (frame,) or (True, False).
+        iterations (int): Timed calls.
+        warmup (int): Untimed calls made first, to warm caches and thread pools.
+    Returns:
+        numpy.ndarray: Duration of each timed call in milliseconds.
+    """
+    for index in range(warmup):
+        fn(inputs[index % len(inputs)])
+    timings = np.empty(iterations)
+    for index in range(iterations):
+        argument = inputs[index % len(inputs)]
+        started_at = time.perf_counter()
+        fn(argument)
+        timings[index] = time.perf_counter() - started_at
+    return timings * 1000
+
+
+def wait_until(predicate, timeout, interval=0.002):
+    """Polls predicate until it is true. Returns False if timeout seconds pass first."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+
+def wait_for(predicate, timeout):
+    """Like wait_until, but returns the seconds it took, or None on timeout."""
+    started_at = time.perf_counter()
+    if not wait_until(predicate, timeout, interval=0.001):
+        return None
+    return time.perf_counter() - started_at
+
+
+class FakeConfig:
+    """Minimal ConfigReader stand-in holding plain attributes, a data dict and a StateStore."""
+
+    DISABLED_OUTPUT_MODES = ("black", "blur", "slate")
+
+    camera_active = state_property("camera_active")
+    camera_states = state_property("camera_states")
+    camera_disabled_mode = state_property("camera_disabled_mode")
+    mic_active = state_property("mic_active")
+
+    def __init__(self, cameras=None, **config_data):
+        self.config_data = config_data
+        self.camera_hotkey = config_data.get("camera_hotkey", "<cmd>+<shift>+a")
+        self.mic_hotkey = config_data.get("mic_hotkey", "<cmd>+<shift>+o")
+        self.camera_id = config_data.get("camera_id", 0)
+        self.camera_width = config_data.get("camera_width", 1280)
+        self.camera_height = config_data.get("camera_height", 720)
+        self.camera_fps = config_data.get("camera_fps", 30)
+        self.cameras = cameras or [
+            {
+                "name": "default",
+                "id": self.camera_id,
+                "width": self.camera_width,
+                "height": self.camera_height,
+                "fps": self.camera_fps,
+            }
+        ]
+        self.state = StateStore(
+            camera_active=True,
+            camera_states={entry["name"]: True for entry in self.cameras},
+            camera_disabled_mode=config_data.get("camera_disabled_mode", "black"),
+            mic_active=True,
+        )
+
+    def get(self, key, default=None):
+        return self.config_data.get(key, default)
+
+    def snapshot(self):
+        snapshot = {key: value for key, value in self.__dict__.items() if key != "state"}
+        snapshot["config_data"] = dict(self.config_data)
+        snapshot.update(toggle_state(self.state.snapshot()[1]))
+        return snapshot
+
+    def default_disabled_mode(self):
+        return self.config_data.get("camera_disabled_mode", "black")
+
+    def is_camera_active(self, name=None):
+        return is_camera_live(self.state.snapshot()[1], name)
+
+    def set_camera_state(self, name, active):
+        self.state.modify(
+            lambda state: {"camera_states": {**state["camera_states"], name: active}}
+        )
+
+
+class FakeCapture:
+    """
+    cv2.VideoCapture stand-in that returns a fixed frame at the native size, with
+    one pixel changed per read.
+    read_delay simulates the time a real device blocks in read().
+    """
+
+    def __init__(self, width=1920, height=1080, read_delay=0.0, seed=0):
+        rng = np.random.default_rng(seed)
+        self.frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        self.properties = {
+            cv2.CAP_PROP_FRAME_WIDTH: width,
+            cv2.CAP_PROP_FRAME_HEIGHT: height,
+            cv2.CAP_PROP_FPS: 30,
+        }
+        self.read_delay = read_delay
+        self.opened = True
+        self.reads = 0
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, property_id, value):
+        return False
+
+    def get(self, property_id):
+        return self.properties.get(property_id, 0)
+
+    def read(self):
+        if self.read_delay:
+            time.sleep(self.read_delay)
+        return True, self.next_frame()
+
+    def next_frame(self):
+        self.reads += 1
+        # Vary a sampled pixel so frame health checks see a live sensor
+        self.frame[0, 0, 0] = self.reads & 0xFF
+        return self.frame
+
+    def release(self):
+        self.opened = False
+
+
+class FakeSink:
+    """softcam.camera stand-in that counts frames and records send timestamps."""
+
+    def __init__(self, width, height, fps, connected=True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.connected = connected
+        self.frames_sent = 0
+        self.last_frame = None
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def is_connected(self):
+        return self.connected
+
+    def wait_for_connection(self, timeout=None):
+        return self.connected
+
+    def send_frame(self, frame):
+        with self._lock:
+            self.frames_sent += 1
+            self.last_frame = frame
+
+    def close(self):
+        self.closed = True
+
+
+class capture_factory:
+    """
+    capture_factory for CameraManager producing FakeCapture devices.
+    A class rather than a closure so it can be pickled into a camera process.
+    """
+
+    def __init__(self, width=1920, height=1080, read_delay=0.0):
+        self.width = width
+        self.height = height
+        self.read_delay = read_delay
+
+    def __call__(self, *capture_args):
+        return FakeCapture(self.width, self.height, self.read_delay)
+
+
+class SinkRecorder:
+    """sink_factory for CameraManager that keeps every sink it creates."""
+
+    def __init__(self, connected=True):
+        self.connected = connected
+        self.sinks = []
+
+    def __call__(self, width, height, fps):
+        sink = FakeSink(width, height, fps, connected=self.connected)
+        self.sinks.append(sink)
+        return sink
+
+    @property
+    def frames_sent(self):
+        return sum(sink.frames_sent for sink in self.sinks)
+
+
+class FakeCameraEnumerator:
+    """
+    devices.CameraDeviceRegistry enumerator with a scriptable device list.
+    plug() and unplug() simulate hotplug; indexes follow list order, like
+    DirectShow, so plugging devices in a different order shuffles them.
+    """
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.enumerations = 0
+        self._lock = threading.Lock()
+
+    def plug(self, name, position=None):
+        with self._lock:
+            self.names.insert(len(self.names) if position is None else position, name)
+
+    def unplug(self, name):
+        with self._lock:
+            self.names.remove(name)
+
+    def enumerate(self):
+        from devices import CameraDevice
+
+        with self._lock:
+            self.enumerations += 1
+            return [
+                CameraDevice(index, name, f"fake://{name}")
+                for index, name in enumerate(self.names)
+            ]
+
+
+class FakeVolume:
+    """IAudioEndpointVolume stand-in; call_delay simulates the COM round trip."""
+
+    def __init__(self, call_delay):
+        self.call_delay = call_delay
+        self.muted = 0
+        self.fail = False
+
+    def GetMute(self):
+        time.sleep(self.call_delay)
+        return self.muted
+
+    def SetMute(self, mute, event_context):
+        time.sleep(self.call_delay)
+        if self.fail:
+            raise OSError("AUDCLNT_E_DEVICE_INVALIDATED")
+        self.muted = mute
+
+
+class FakeAudioBackend:
+    """
+    mic_endpoints backend with scriptable capture endpoints.
+    Enumerating (per device) and opening an endpoint cost one call_delay each, like
+    the COM round trips they stand in for. plug() and unplug() simulate hotplug
+    and fire the device change callback.
+    """
+
+    def __init__(self, names=(), call_delay=0.004):
+        self.call_delay = call_delay
+        self.volumes = {name: FakeVolume(call_delay) for name in names}
+        self.enumerations = 0
+        self._callback = None
+        self._lock = threading.Lock()
+
+    def thread_init(self, multithreaded=False):
+        return False
+
+    def thread_exit(self):
+        pass
+
+    def enumerate(self):
+        from mic_endpoints import CaptureEndpoint
+
+        with self._lock:
+            self.enumerations += 1
+            names = list(self.volumes)
+        time.sleep(self.call_delay * len(names))
+        return [CaptureEndpoint(f"fake:{name}", name) for name in names]
+
+    def open(self, endpoint_id):
+        time.sleep(self.call_delay)
+        with self._lock:
+            volume = self.volumes.get(endpoint_id.split(":", 1)[1])
+        if volume is None:
+            raise OSError("Element not found")
+        return volume
+
+    def watch(self, callback):
+        self._callback = callback
+
+        def unwatch():
+            self._callback = None
+
+        return unwatch
+
+    def plug(self, name):
+        with self._lock:
+            self.volumes[name] = FakeVolume(self.call_delay)
+        if self._callback:
+            self._callback()
+
+    def unplug(self, name):
+        with self._lock:
+            del self.volumes[name]
+        if self._callback:
+            self._callback()
@@ -3,28 +3,57 @@ import numpy as np
 import time
 import threading
 import logging
+import gc
 
-from softcam import softcam
+from effects import (
+    FadeTransition,
+    LiveFraming,
+    LowLightEnhancer,
+    MuteBadge,
+    PrivacyBlur,
+    build_slate_frame,
+)
+import frame_trace
+from devices import CameraDeviceRegistry, default_enumerator, device_identity
+from frame_health import FrameHealthMonitor
+from memory import current_private_bytes, release_free_memory
+import recording
+from shm_sink import SharedMemoryFrameSink, default_shm_name
+from state import is_camera_live
+from telemetry import StatsWindow
 
 
 class CameraManager:
-    def __init__(self, config_reader):
-        self.logger = logging.getLogger(__name__)
+    def __init__(
+        self,
+        config_reader,
+        camera_settings=None,
+        capture_factory=None,
+        sink_factory=None,
+        trace_dir=None,
+        device_registry=None,
+    ):
         self.config = config_reader
+        # Per-camera entry from config.cameras; None means the top-level camera_* keys
+        self.camera_settings = camera_settings or {}
+        self.name = str(self.camera_settings.get("name", "default"))
+        self.logger = logging.getLogger(f"{__name__}.{self.name}")
         self.running = False
         self.thread = None
         self.physical_cam_cv2 = None  # OpenCV VideoCapture instance
         self.virtual_cam_softcam = None  # Softcam instance
+        # Factories are swappable so pipelines can run against synthetic devices
+        self._capture_factory = capture_factory or cv2.VideoCapture
+        self._sink_factory = sink_factory
 
         # Desired properties from config
-        self.cam_id = self.config.camera_id
-        self.target_width = self.config.camera_width
-        self.target_height = self.config.camera_height
-        self.target_fps = self.config.camera_fps
-
-        self.black_frame = np.zeros(
-            (self.target_height, self.target_width, 3), dtype=np.uint8
+        self.cam_id = self.camera_settings.get("id", self.config.camera_id)
+        self.target_width = self.camera_settings.get("width", self.config.camera_width)
+        self.target_height = self.camera_settings.get(
+            "height", self.config.camera_height
         )
+        self.target_fps = self.camera_settings.get("fps", self.config.camera_fps)
+
         self.last_connection_status = False
         self._setup_retry_interval = self._config_value(
             "camera_setup_retry_interval", 3.0
@@ -32,23 +61,400 @@ class CameraManager:
         self._last_setup_attempt_time = -self._setup_retry_interval
         self._camera_warmup_timeout = self._config_value("camera_warmup_timeout", 2.0)
         self._camera_warmup_sleep = 0.1
+        # Pause after releasing the device so the driver can fully free it
+        self._release_settle_time = self._config_value("camera_release_settle", 2.0)
         self._read_failure_count = 0
         self._read_failure_release_threshold = self._config_value(
             "camera_read_failure_threshold", 3
         )
+        self._frame_health = None
+        if self._config_value("camera_health_check", True):
+            self._frame_health = FrameHealthMonitor(
+                stride=self._config_value("camera_health_stride", 16),
+                frozen_frames=self._config_value("camera_frozen_frames", 60),
+                blank_frames=self._config_value("camera_blank_frames", 90),
+                blank_range=self._config_value("camera_blank_range", 4),
+            )
+        # Applied in place to the framed live frame, which this pipeline owns
+        self._low_light = None
+        if self._config_value("camera_low_light", False):
+            self._low_light = LowLightEnhancer(
+                target=self._config_value("camera_low_light_target", 0.4),
+                max_gain=self._config_value("camera_low_light_max_gain", 3.0),
+                interval=self._config_value("camera_low_light_interval", 15),
+            )
         self._keep_camera_open_when_muted = bool(
             self._config_value("camera_keep_open_when_muted", False)
         )
         self._camera_unavailable_log_interval = 5.0
         self._last_unavailable_log_time = -self._camera_unavailable_log_interval
-        self._last_camera_active = self.config.camera_active
+        self._last_camera_active = is_camera_live(
+            self.config.state.snapshot()[1], self.name
+        )
+        self._build_frame_buffers()
+        # Seconds without a consumer before the frame buffers are released
+        self._idle_trim_after = self._config_value("camera_idle_trim_after", 60)
+        self.idle_trims = 0
+        self.last_idle_trim = None  # (private bytes before, after the trim)
+        self.last_rebuild_time = None
+        # Guards every send to the sink. The privacy guard waits on it for the
+        # loop to show a disabled state, and sends one itself if the loop is stuck
+        self._output_cond = threading.Condition()
+        self._output_version = -1
+        self._last_send_time = 0.0
+        self.frame_interval = (
+            1.0 / self.target_fps if self.target_fps > 0 else (1.0 / 30.0)
+        )  # Default to 30fps if target_fps is 0
+        self._privacy_guard_thread = None
+        self.privacy_preemptions = 0
+        # [frames, total seconds, max seconds, overruns] while a fade is running
+        self._transition_stats = None
+        self.last_transition_stats = None
+        self.trace = frame_trace.FrameTraceRecorder(
+            self.name, capacity=self._config_value("camera_trace_capacity", 2048)
+        )
+        self._trace_dir = trace_dir
+        self._trace_dumped_on_error = False
+        self.stats = StatsWindow()
+        self._replay = None
+        self._recorder = None
+        self._setup_session_files()
+        # Device discovery: select by name, skip opens while the device is absent
+        self._devices = device_registry if self._replay is None else None
+        self._device_selector = self._config_value("camera_device", None)
+        self._open_device = None
+        self._device_arrived = False
+        self._device_removed = False
+        self._waiting_for_device = False
+
+    def _build_frame_buffers(self):
+        """Allocates every output-resolution buffer and cache the loop renders into."""
+        self.black_frame = np.zeros(
+            (self.target_height, self.target_width, 3), dtype=np.uint8
+        )
+        self._privacy_blur = PrivacyBlur(
+            self.target_width,
+            self.target_height,
+            internal_width=self._config_value("camera_blur_internal_width", 96),
+            kernel_size=self._config_value("camera_blur_kernel_size", 7),
+        )
+        self._framing = LiveFraming(
+            self.target_width,
+            self.target_height,
+            mode=self._config_value("camera_framing", "stretch"),
+            zoom=self._config_value("camera_zoom", 1.0),
+            center=self._config_value("camera_zoom_center", (0.5, 0.5)),
+        )
+        self._slate_frame = None
+        self._slate_key = None
+        self._fade = FadeTransition(
+            self.target_width,
+            self.target_height,
+            self._config_value("camera_fade_frames", 0),
+        )
+        self._last_output_state = None
+        self._last_sent_frame = None
+        self._mute_badge = None
+        if self._config_value("camera_mute_badge", False):
+            self._mute_badge = MuteBadge(
+                self.target_width,
+                self.target_height,
+                position=self._config_value("camera_mute_badge_position", "top-right"),
+                size=self._config_value("camera_mute_badge_size", 0.1),
+                image_path=self._config_value("camera_mute_badge_image", None),
+            )
+        self._buffers_trimmed = False
+
+    def _trim_idle_memory(self):
+        """
+        Releases the frame buffers and caches while no consumer is connected.
+        They are rebuilt by _rebuild_frame_buffers when one connects.
+        """
+        private_before = current_private_bytes()
+        with self._output_cond:
+            self.black_frame = None
+            self._privacy_blur = None
+            self._framing = None
+            self._fade = None
+            self._slate_frame = None
+            self._slate_key = None
+            self._mute_badge = None
+            self._last_sent_frame = None
+            self._last_output_state = None
+            self._buffers_trimmed = True
+            trim_sink = getattr(self.virtual_cam_softcam, "trim", None)
+            if trim_sink:
+                trim_sink()
+        gc.collect()
+        release_free_memory()
+        private_after = current_private_bytes()
+        self.idle_trims += 1
+        self.last_idle_trim = (private_before, private_after)
+        if private_before is not None and private_after is not None:
+            self.logger.info(
+                f"No consumer for {self._idle_trim_after:g}s. Released frame buffers: "
+                f"private memory {private_before / 2**20:.1f} MiB -> "
+                f"{private_after / 2**20:.1f} MiB."
+            )
+        else:
+            self.logger.info(
+                f"No consumer for {self._idle_trim_after:g}s. Released frame buffers."
+            )
+
+    def _rebuild_frame_buffers(self):
+        started_at = time.perf_counter()
+        with self._output_cond:
+            self._build_frame_buffers()
+        self.last_rebuild_time = time.perf_counter() - started_at
+        self.logger.info(
+            f"Consumer connected. Frame buffers rebuilt in "
+            f"{self.last_rebuild_time * 1000:.1f} ms."
+        )
 
     def _config_value(self, key, default):
+        # Camera entries may override any camera_* key, with or without the prefix
+        for entry_key in (key, key.removeprefix("camera_")):
+            if entry_key in self.camera_settings:
+                return self.camera_settings[entry_key]
         getter = getattr(self.config, "get", None)
         if callable(getter):
             return getter(key, getattr(self.config, key, default))
         return getattr(self.config, key, default)
 
+    def _setup_session_files(self):
+        """
+        Swaps in a replay source for camera_replay_path and wraps the capture
+        factory with a recorder for camera_record_path.
+        """
+        replay_path = self._config_value("camera_replay_path", None)
+        if replay_path:
+            try:
+                self._replay = recording.ReplayCaptureFactory(
+                    recording.session_file_path(replay_path, self.name),
+                    realtime=bool(self._config_value("camera_replay_realtime", True)),
+                    loop=bool(self._config_value("camera_replay_loop", False)),
+                )
+                self._capture_factory = self._replay
+            except Exception as e:
+                self.logger.error(
+                    f"Could not open camera replay '{replay_path}': {e}. "
+                    "Using the physical camera.",
+                    exc_info=True,
+                )
+
+        record_path = self._config_value("camera_record_path", None)
+        if record_path:
+            try:
+                self._recorder = recording.FrameRecorder(
+                    recording.session_file_path(record_path, self.name),
+                    max_bytes=int(self._config_value("camera_record_max_mb", 4096))
+                    * 1024
+                    * 1024,
+                )
+                self._capture_factory = recording.RecordingCaptureFactory(
+                    self._capture_factory, self._recorder
+                )
+            except Exception as e:
+                self.logger.error(
+                    f"Could not start camera recording '{record_path}': {e}",
+                    exc_info=True,
+                )
+
+    def _on_devices_changed(self, added, removed):
+        # Runs on the device watcher thread: only flag work for the camera loop
+        open_device = self._open_device
+        if open_device is not None:
+            identity = device_identity(open_device)
+            if any(device_identity(device) == identity for device in removed):
+                moved = next(
+                    (
+                        device
+                        for device in self._devices.devices
+                        if device_identity(device) == identity
+                    ),
+                    None,
+                )
+                if moved is None:
+                    self._device_removed = True
+                else:
+                    # Only its index shifted; the open capture keeps working
+                    self._open_device = moved
+        if self._waiting_for_device and self._lookup_device() is not None:
+            self._device_arrived = True
+
+    def _lookup_device(self):
+        """
+        Finds the configured camera among the connected devices, by camera_device
+        name if set, otherwise by camera ID.
+        Returns:
+            devices.CameraDevice or None: The device, or None if it is not connected.
+        """
+        selector = self._device_selector
+        if selector is None:
+            selector = self.camera_settings.get("id", self.config.camera_id)
+        return self._devices.find(selector)
+
+    def _resolve_camera_id(self):
+        """
+        Returns:
+            The ID to open, or None if the device is known to be disconnected.
+        """
+        configured_id = self.camera_settings.get("id", self.config.camera_id)
+        if self._devices is None or not self._devices.available:
+            return configured_id
+        if self._device_selector is None and not isinstance(configured_id, int):
+            return configured_id  # A file or stream URL, not a device
+        self._open_device = self._lookup_device()
+        return self._open_device.index if self._open_device else None
+
+    def _disabled_frame(self, disabled_mode):
+        """Returns the static frame to send while the camera is disabled."""
+        if disabled_mode != "slate":
+            return self.black_frame
+        slate_key = (
+            self._config_value("camera_slate_image", None),
+            self.target_width,
+            self.target_height,
+        )
+        if slate_key != self._slate_key:
+            # Rebuilt only when the image path or resolution changes. The frame is
+            # stored before the key: the privacy guard may read both meanwhile
+            self._slate_frame = self._build_slate_frame(slate_key[0])
+            self._slate_key = slate_key
+        return self._slate_frame
+
+    def _build_slate_frame(self, image_path):
+        if not image_path:
+            self.logger.warning(
+                "camera_disabled_mode is 'slate' but camera_slate_image is not set. "
+                "Sending black frame."
+            )
+            return self.black_frame
+        slate = build_slate_frame(
+            image_path,
+            self.target_width,
+            self.target_height,
+            background=tuple(self._config_value("camera_slate_background", (0, 0, 0))),
+        )
+        if slate is None:
+            self.logger.warning("Slate image unavailable. Sending black frame.")
+            return self.black_frame
+        return slate
+
+    def _begin_output_transition(self, output_state):
+        if output_state == self._last_output_state:
+            return
+        previous_state = self._last_output_state
+        self._last_output_state = output_state
+        if previous_state == "live":
+            # Cut away from live video: fading out would keep showing it for a while
+            self._fade.cancel()
+            return
+        if previous_state is not None and self._fade.begin(self._last_sent_frame):
+            self.logger.debug(
+                f"Fading from {previous_state} to {output_state} over {self._fade.frames} frames."
+            )
+            self._transition_stats = [0, 0.0, 0.0, 0]
+
+    def _record_transition_frame(self, processing_time, target_frame_duration):
+        stats = self._transition_stats
+        stats[0] += 1
+        stats[1] += processing_time
+        stats[2] = max(stats[2], processing_time)
+        if processing_time > target_frame_duration:
+            stats[3] += 1
+        if self._fade.active:
+            return
+
+        self._transition_stats = None
+        self.last_transition_stats = {
+            "frames": stats[0],
+            "mean_ms": 1000.0 * stats[1] / stats[0],
+            "max_ms": 1000.0 * stats[2],
+            "budget_ms": 1000.0 * target_frame_duration,
+            "overruns": stats[3],
+        }
+        self.logger.info(
+            f"Fade finished: {stats[0]} frames, mean {self.last_transition_stats['mean_ms']:.2f} ms, "
+            f"max {self.last_transition_stats['max_ms']:.2f} ms of "
+            f"{self.last_transition_stats['budget_ms']:.2f} ms budget, {stats[3]} overrun(s)."
+        )
+
+    def _create_virtual_camera(self):
+        primary = self._create_sink(
+            self._config_value("camera_outputs", ["softcam"]),
+            self.target_width,
+            self.target_height,
+            self.target_fps,
+            self._config_value("camera_shm_name", default_shm_name(self.name)),
+        )
+        scaled_outputs = self._create_scaled_outputs()
+        if not scaled_outputs:
+            return primary
+        return FanOutSink(primary, scaled_outputs, self.target_fps)
+
+    def _create_sink(self, outputs, width, height, fps, shm_name):
+        if self._sink_factory is not None:
+            return self._sink_factory(width, height, fps)
+
+        sinks = []
+        for output in outputs:
+            if output == "softcam":
+                # Imported lazily: the softcam driver only exists on Windows builds
+                from softcam import softcam
+
+                sinks.append(softcam.camera(width, height, fps))
+            elif output == "shm":
+                sinks.append(
+                    SharedMemoryFrameSink(
+                        shm_name,
+                        width,
+                        height,
+                        fps,
+                        slots=self._config_value("camera_shm_slots", 4),
+                    )
+                )
+            else:
+                self.logger.warning(f"Ignoring unknown camera output '{output}'.")
+
+        if not sinks:
+            raise ValueError("No valid camera_outputs configured.")
+        return sinks[0] if len(sinks) == 1 else CombinedSink(sinks)
+
+    def _create_scaled_outputs(self):
+        """
+        Creates the extra, smaller outputs from camera_scaled_outputs. They are fed
+        from this pipeline's frames, so they share the physical camera and all
+        processing with the main output.
+        """
+        scaled_outputs = []
+        for entry in self._config_value("camera_scaled_outputs", None) or []:
+            try:
+                width = int(entry["width"])
+                height = int(entry["height"])
+                if not (
+                    0 < width <= self.target_width and 0 < height <= self.target_height
+                ):
+                    raise ValueError(
+                        f"size must be within {self.target_width}x{self.target_height}"
+                    )
+                fps = min(float(entry.get("fps", self.target_fps)), self.target_fps)
+                sink = self._create_sink(
+                    entry.get("outputs", ["shm"]),
+                    width,
+                    height,
+                    fps,
+                    entry.get(
+                        "shm_name", f"{default_shm_name(self.name)}_{width}x{height}"
+                    ),
+                )
+            except Exception as e:
+                self.logger.error(f"Skipping scaled output {entry}: {e}", exc_info=True)
+                continue
+            scaled_outputs.append(ScaledOutput(sink, width, height, fps))
+            self.logger.info(f"Scaled output added: {width}x{height} @ {fps:g} FPS")
+        return scaled_outputs
+
     def _setup_physical_camera(self):
         self.logger.info(
             f"Attempting to open physical camera (ID: {self.cam_id}) "
@@ -62,7 +468,7 @@ class CameraManager:
                 self.logger.debug(
                     f"Opening physical camera with {backend_name} backend."
                 )
-                vc = cv2.VideoCapture(*capture_args)
+                vc = self._capture_factory(*capture_args)
             except Exception as e:
                 last_failure = f"{backend_name} open exception: {e}"
                 self.logger.warning(
@@ -243,6 +649,7 @@ class CameraManager:
             ret, frame = self.physical_cam_cv2.read()
         except Exception as e:
             self._read_failure_count += 1
+            self.stats.count("read_failures")
             self.logger.warning(
                 f"Exception reading frame from physical camera "
                 f"({self._read_failure_count}/{self._read_failure_release_threshold}): {e}",
@@ -251,6 +658,15 @@ class CameraManager:
             return None
 
         if ret and frame is not None:
+            fault = self._frame_health.check(frame) if self._frame_health else None
+            if fault:
+                # The device keeps "succeeding"; go straight to release-and-reopen
+                self.logger.warning(
+                    f"Physical camera is returning {fault} frames. Treating it as failed."
+                )
+                self._read_failure_count = self._read_failure_release_threshold
+                self.stats.count("read_failures")
+                return None
             if self._read_failure_count:
                 self.logger.info(
                     f"Physical camera recovered after {self._read_failure_count} failed reads."
@@ -259,6 +675,7 @@ class CameraManager:
             return frame
 
         self._read_failure_count += 1
+        self.stats.count("read_failures")
         self.logger.warning(
             f"Failed to read frame from physical camera "
             f"({self._read_failure_count}/{self._read_failure_release_threshold}). "
@@ -266,7 +683,79 @@ class CameraManager:
         )
         return None
 
-    def _release_physical_camera(self):
+    def _read_live_frame(self):
+        """
+        Opens the physical camera if needed (respecting the retry interval) and
+        reads its next raw frame.
+        Returns:
+            numpy.ndarray or None: The raw frame, or None if no frame is available.
+        """
+        if self._device_removed:
+            self._device_removed = False
+            if self.physical_cam_cv2 is not None:
+                self.logger.warning("Physical camera was disconnected. Releasing it.")
+                self._release_physical_camera(settle=False)
+            # Check right away whether it is still enumerated
+            self._last_setup_attempt_time = -self._setup_retry_interval
+
+        if not self.physical_cam_cv2 or not self._is_capture_opened(
+            self.physical_cam_cv2, "active"
+        ):
+            if self.physical_cam_cv2 is not None:
+                self._release_physical_camera()
+            now = time.perf_counter()
+            if self._device_arrived:
+                self._device_arrived = False
+                self._last_setup_attempt_time = -self._setup_retry_interval
+            if now - self._last_setup_attempt_time >= self._setup_retry_interval:
+                self._last_setup_attempt_time = now
+                camera_id = self._resolve_camera_id()
+                if camera_id is None:
+                    if not self._waiting_for_device:
+                        self.logger.warning(
+                            f"Camera '{self._device_selector or self.cam_id}' is not "
+                            "connected. Waiting for it to be plugged in."
+                        )
+                        self._waiting_for_device = True
+                    return None
+                self._waiting_for_device = False
+                self.cam_id = camera_id
+                self.physical_cam_cv2 = self._setup_physical_camera()
+                if self.physical_cam_cv2:
+                    self.stats.count("opens")
+                    self.stats.observe("open", time.perf_counter() - now)
+                else:
+                    self.stats.count("open_failures")
+            # else: still in cooldown, caller will send a black frame
+
+        if not self.physical_cam_cv2:  # Physical camera setup failed
+            if not self._waiting_for_device:
+                self._log_camera_unavailable()
+            return None
+
+        self.trace.mark(frame_trace.CAPTURE_START)
+        frame = self._read_frame_from_physical_camera()
+        self.trace.mark(frame_trace.CAPTURE_END)
+        if (
+            frame is None
+            and self._read_failure_count >= self._read_failure_release_threshold
+        ):
+            self.logger.warning(
+                "Releasing physical camera after consecutive read failures."
+            )
+            self._release_physical_camera()
+        return frame
+
+    def _prepare_live_frame(self, frame):
+        # Framing copies into our own buffer, so replayed (read-only) frames are never modified
+        frame = self._framing.apply(frame)
+        if self._low_light is not None:
+            started_at = time.perf_counter()
+            self._low_light.apply(frame)
+            self.stats.observe("enhance", time.perf_counter() - started_at)
+        return frame
+
+    def _release_physical_camera(self, settle=True):
         if self.physical_cam_cv2 is not None:
             self.logger.info("Releasing physical camera.")
             try:
@@ -276,17 +765,105 @@ class CameraManager:
                     f"Error releasing physical camera: {e}", exc_info=True
                 )
             self.physical_cam_cv2 = None
-            time.sleep(2)  # Give the OS/DirectShow time to fully free the device
+            if self._frame_health:
+                self._frame_health.reset()
+            if settle and self._release_settle_time > 0:
+                # Give the OS/DirectShow time to fully free the device
+                time.sleep(self._release_settle_time)
+
+    def _send_output_frame(self, frame_to_send, from_live):
+        """
+        Sends a frame from the camera loop. A live frame is never sent once the
+        camera has been disabled, even if it was captured before the toggle.
+        """
+        with self._output_cond:
+            version, state = self.config.state.snapshot()
+            if from_live and not is_camera_live(state, self.name):
+                # Toggled off while this frame was being captured
+                frame_to_send = self._privacy_frame(state["camera_disabled_mode"])
+                self._last_output_state = state["camera_disabled_mode"]
+                self._fade.cancel()
+            elif self._fade.active:
+                frame_to_send = self._fade.blend(frame_to_send)
+            frame_to_send = self._badge_frame(frame_to_send, state)
+            self.trace.mark(frame_trace.TRANSFORM_END)
+            self.virtual_cam_softcam.send_frame(frame_to_send)
+            self.trace.mark(frame_trace.SEND_END)
+            self._last_sent_frame = frame_to_send
+            self._output_version = version
+            self._last_send_time = time.perf_counter()
+            self._output_cond.notify_all()
+
+    def _badge_frame(self, frame, state):
+        """Draws the mic-muted badge while the microphone is muted."""
+        if self._mute_badge is None or state["mic_active"]:
+            return frame
+        if frame is self.black_frame or frame is self._slate_frame:
+            return self._mute_badge.apply_static(frame)
+        # Every other frame is a per-pipeline buffer rewritten each frame
+        return self._mute_badge.apply(frame)
+
+    def _privacy_frame(self, disabled_mode):
+        # Blur needs a fresh capture; black stands in until the loop provides one
+        if disabled_mode == "blur":
+            return self.black_frame
+        return self._disabled_frame(disabled_mode)
+
+    def _output_caught_up(self, version):
+        return (
+            self._output_version >= version
+            and time.perf_counter() - self._last_send_time < self.frame_interval
+        )
+
+    def _privacy_guard_loop(self):
+        """
+        Bounds the time from disabling the camera to a disabled frame at the sink.
+        The loop gets half a frame interval to send one itself (so fades still
+        run); if it is stuck in a slow read, warmup or the release pause, the
+        guard sends it and keeps repeating it every frame interval until the
+        loop resumes.
+        """
+        grace = self.frame_interval / 2
+        version, state = self.config.state.snapshot()
+        while self.running:
+            live = is_camera_live(state, self.name)
+            version, state = self.config.state.wait_for_change(
+                version, timeout=0.5 if live else self.frame_interval
+            )
+            if is_camera_live(state, self.name):
+                continue
+            with self._output_cond:
+                # The loop closes the sink under this lock after running drops
+                sink = self.virtual_cam_softcam
+                if not self.running or sink is None or not sink.is_connected():
+                    continue
+                if self._output_cond.wait_for(
+                    lambda: not self.running or self._output_caught_up(version), grace
+                ):
+                    continue
+                # The wait released the lock; the consumer may have left meanwhile
+                if not sink.is_connected() or self._buffers_trimmed:
+                    continue  # Idle; the loop rebuilds the buffers before sending
+                version, state = self.config.state.snapshot()
+                if is_camera_live(state, self.name):
+                    continue
+                frame = self._badge_frame(
+                    self._privacy_frame(state["camera_disabled_mode"]), state
+                )
+                self._fade.cancel()
+                sink.send_frame(frame)
+                self._last_sent_frame = frame
+                self._last_output_state = state["camera_disabled_mode"]
+                self._output_version = version
+                self._last_send_time = time.perf_counter()
+                self.privacy_preemptions += 1
+            self.logger.debug("Camera loop busy; privacy guard sent the disabled frame.")
 
     def _camera_feed_loop(self):
         self.logger.info("Camera feed loop thread started.")
 
         try:
-            self.virtual_cam_softcam = softcam.camera(
-                self.target_width,
-                self.target_height,
-                self.target_fps,
-            )
+            self.virtual_cam_softcam = self._create_virtual_camera()
             self.logger.info(
                 f"Virtual camera initialized: {self.target_width}x{self.target_height} @ {self.target_fps} FPS"
             )
@@ -297,12 +874,11 @@ class CameraManager:
             self.running = False  # Stop if virtual cam fails critically
             return
 
-        target_frame_duration = (
-            1.0 / self.target_fps if self.target_fps > 0 else (1.0 / 30.0)
-        )  # Default to 30fps if target_fps is 0
+        target_frame_duration = self.frame_interval
 
         while self.running:
             loop_start_time = time.perf_counter()
+            self.trace.begin_frame()
             try:
                 is_connected_now = self.virtual_cam_softcam.is_connected()
 
@@ -324,8 +900,16 @@ class CameraManager:
                     # softcam's wait_for_connection might be blocking.
                     # We need to ensure self.running is checked.
                     wait_iter_start = time.perf_counter()
+                    disconnected_since = wait_iter_start
                     while self.running and not self.virtual_cam_softcam.is_connected():
                         time.sleep(0.1)  # Poll running flag
+                        if (
+                            self._idle_trim_after > 0
+                            and not self._buffers_trimmed
+                            and time.perf_counter() - disconnected_since
+                            >= self._idle_trim_after
+                        ):
+                            self._trim_idle_memory()
                         if (
                             time.perf_counter() - wait_iter_start > 0.5
                         ):  # Call underlying wait every 0.5s
@@ -337,61 +921,42 @@ class CameraManager:
                         continue  # Still not connected, loop again
 
                 # --- Virtual camera IS connected ---
-                camera_active_now = self.config.camera_active
+                if self._buffers_trimmed:
+                    self._rebuild_frame_buffers()
+                # One consistent view of the toggles per frame, without locking
+                _, state = self.config.state.snapshot()
+                camera_active_now = is_camera_live(state, self.name)
+                disabled_mode = state["camera_disabled_mode"]
                 if camera_active_now != self._last_camera_active:
                     self.logger.info(
-                        f"VCM camera feed state changed: {'enabled' if camera_active_now else 'disabled'}."
+                        f"VCM camera feed state changed: {'enabled' if camera_active_now else f'disabled ({disabled_mode})'}."
                     )
-                    if camera_active_now:
+                    if camera_active_now or disabled_mode == "blur":
                         self._last_setup_attempt_time = -self._setup_retry_interval
                         self._last_unavailable_log_time = (
                             -self._camera_unavailable_log_interval
                         )
                     self._last_camera_active = camera_active_now
+                self._begin_output_transition(
+                    "live" if camera_active_now else disabled_mode
+                )
 
                 if camera_active_now:  # Check VCM's camera enable state
-                    if (
-                        not self.physical_cam_cv2
-                        or not self._is_capture_opened(
-                            self.physical_cam_cv2, "active"
-                        )
-                    ):
-                        if self.physical_cam_cv2 is not None:
-                            self._release_physical_camera()
-                        now = time.perf_counter()
-                        if now - self._last_setup_attempt_time >= self._setup_retry_interval:
-                            self._last_setup_attempt_time = now
-                            self.physical_cam_cv2 = self._setup_physical_camera()
-                        # else: still in cooldown, will send black frame below
-
-                    if self.physical_cam_cv2:
-                        frame = self._read_frame_from_physical_camera()
-                        if frame is not None:
-                            if (
-                                frame.shape[0] != self.target_height
-                                or frame.shape[1] != self.target_width
-                            ):
-                                frame = cv2.resize(
-                                    frame,
-                                    (self.target_width, self.target_height),
-                                    interpolation=cv2.INTER_LINEAR,
-                            )
-                            frame_to_send = cv2.flip(frame, 1)  # Horizontal flip
-                        else:
-                            frame_to_send = self.black_frame
-                            if (
-                                self._read_failure_count
-                                >= self._read_failure_release_threshold
-                            ):
-                                self.logger.warning(
-                                    "Releasing physical camera after consecutive read failures."
-                                )
-                                self._release_physical_camera()
-                    else:  # Physical camera setup failed
-                        self._log_camera_unavailable()
+                    frame = self._read_live_frame()
+                    if frame is not None:
+                        frame_to_send = self._prepare_live_frame(frame)
+                    else:
+                        frame_to_send = self.black_frame
+                elif disabled_mode == "blur":  # Disabled, but send a blurred feed
+                    frame = self._read_live_frame()
+                    if frame is not None:
+                        frame_to_send = self._privacy_blur.apply(frame)
+                    else:
                         frame_to_send = self.black_frame
                 else:  # VCM's camera is disabled by user
-                    if self.physical_cam_cv2:  # Release physical cam if it was active
+                    # Release physical cam if it was active; wait for a fade-out
+                    # to finish so the release pause does not stall it
+                    if self.physical_cam_cv2 and not self._fade.active:
                         if self._keep_camera_open_when_muted and self._is_capture_opened(
                             self.physical_cam_cv2, "muted"
                         ):
@@ -404,14 +969,18 @@ class CameraManager:
                             )
                             self._release_physical_camera()
                     self._read_failure_count = 0
-                    frame_to_send = self.black_frame
+                    frame_to_send = self._disabled_frame(disabled_mode)
                     # self.logger.debug("Camera disabled, sending black frame.")
 
                 if frame_to_send is not None:
-                    self.virtual_cam_softcam.send_frame(frame_to_send)
+                    self._send_output_frame(frame_to_send, from_live=camera_active_now)
 
             except Exception as e:
                 self.logger.error(f"Error in camera feed loop: {e}", exc_info=True)
+                if not self._trace_dumped_on_error:
+                    # Keep the timeline leading up to the first failure
+                    self._trace_dumped_on_error = True
+                    self.dump_trace(reason=f"error-{self.name}")
                 if (
                     self.virtual_cam_softcam and self.virtual_cam_softcam.is_connected()
                 ):  # Try to send black frame if error
@@ -425,43 +994,330 @@ class CameraManager:
 
             # Frame rate control
             processing_time = time.perf_counter() - loop_start_time
+            self.stats.record_frame(processing_time, target_frame_duration)
+            if self._transition_stats is not None:
+                self._record_transition_frame(processing_time, target_frame_duration)
             sleep_time = target_frame_duration - processing_time
             if sleep_time > 0:
                 time.sleep(sleep_time)
+            self.trace.mark(frame_trace.SLEEP_END)
             # else:
             #     if is_connected_now: # Only log if we are actively trying to send frames
             #         self.logger.warning(f"Frame processing too long: {processing_time:.4f}s, desired: {target_frame_duration:.4f}s")
 
         # --- Loop finished (self.running is False) ---
-        self._release_physical_camera()
+        # Nothing reopens the device after this, so skip the settle pause
+        self._release_physical_camera(settle=False)
+        if self._recorder:
+            self._recorder.close()
+        if self._replay:
+            self._replay.close()
         if self.virtual_cam_softcam:
             self.logger.info("Closing virtual camera.")
             try:
                 if hasattr(
                     self.virtual_cam_softcam, "close"
                 ):  # Check if softcam object has a close method
-                    self.virtual_cam_softcam.close()
+                    with self._output_cond:  # No privacy guard send after this
+                        self.virtual_cam_softcam.close()
             except Exception as e:
                 self.logger.error(f"Error closing virtual camera: {e}", exc_info=True)
         self.logger.info("Camera feed loop thread finished.")
 
+    def dump_trace(self, directory=None, reason="manual"):
+        """
+        Writes this pipeline's recent frame timeline to a Chrome trace JSON file.
+        Returns:
+            str or None: The file path, or None if no directory is configured or writing failed.
+        """
+        directory = directory or self._trace_dir
+        if not directory:
+            return None
+        path = frame_trace.trace_file_path(directory, reason)
+        return path if frame_trace.write_chrome_trace([self.trace], path) else None
+
     def start(self):
         if self.running:
             self.logger.warning("CameraManager start called but already running.")
             return
         self.running = True
+        if self._devices is not None:
+            self._devices.subscribe(self._on_devices_changed)
         self.thread = threading.Thread(
-            target=self._camera_feed_loop, name="CameraFeedThread", daemon=True
+            target=self._camera_feed_loop,
+            name=f"CameraFeedThread-{self.name}",
+            daemon=True,
         )
         self.thread.start()
+        self._privacy_guard_thread = threading.Thread(
+            target=self._privacy_guard_loop,
+            name=f"CameraPrivacyGuard-{self.name}",
+            daemon=True,
+        )
+        self._privacy_guard_thread.start()
         self.logger.info("CameraManager started.")
 
     def stop(self):
         self.logger.info("CameraManager stop called.")
         self.running = False  # Signal the loop to stop
+        if self._devices is not None:
+            self._devices.unsubscribe(self._on_devices_changed)
         if self.thread and self.thread.is_alive():
             self.logger.debug("Waiting for camera feed thread to join...")
             self.thread.join(timeout=3.0)  # Wait for a few seconds
             if self.thread.is_alive():
                 self.logger.error("Camera feed thread did not terminate in time!")
+        # The privacy guard is a daemon that stops sending once running is False
+        # and exits at its next wake-up, so it is not joined
         self.logger.info("CameraManager stopped.")
+
+
+class CombinedSink:
+    """
+    Presents several output sinks (softcam, shared memory) as one. It counts as
+    connected while any sink has a consumer, and frames only go to sinks that
+    currently have one.
+    """
+
+    def __init__(self, sinks):
+        self.sinks = sinks
+
+    def is_connected(self):
+        return any(sink.is_connected() for sink in self.sinks)
+
+    def wait_for_connection(self, timeout=None):
+        # timeout is in milliseconds, matching softcam
+        deadline = time.perf_counter() + (timeout or 0) / 1000.0
+        while not self.is_connected():
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def send_frame(self, frame):
+        for sink in self.sinks:
+            if sink.is_connected():
+                sink.send_frame(frame)
+
+    def close(self):
+        for sink in self.sinks:
+            if hasattr(sink, "close"):
+                sink.close()
+
+
+class ScaledOutput:
+    """An extra output sink fed downscaled frames at its own frame rate."""
+
+    def __init__(self, sink, width, height, fps):
+        self.sink = sink
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_interval = 1.0 / fps if fps > 0 else 0.0
+        self._next_due = 0.0
+
+    def due(self, now, tolerance):
+        """Returns True (and schedules the next frame) if a frame should be sent at now."""
+        if now < self._next_due - tolerance:
+            return False
+        # Stay on the original schedule unless a whole interval was missed
+        if now - self._next_due < self.frame_interval:
+            self._next_due += self.frame_interval
+        else:
+            self._next_due = now + self.frame_interval
+        return True
+
+
+class FanOutSink(CombinedSink):
+    """
+    Feeds one pipeline's frames to its primary sink and to scaled outputs with
+    their own sizes and rates. Outputs without a consumer, or not due at their
+    rate, cost nothing. Each needed size is computed once per frame, pyramid
+    style: from a frame already produced this frame rather than the full-size
+    one where possible (e.g. 1280x720 -> 640x360 -> 320x180), and shared by
+    outputs of the same size.
+    """
+
+    def __init__(self, primary, scaled_outputs, fps):
+        super().__init__([primary] + [output.sink for output in scaled_outputs])
+        self.primary = primary
+        # Largest first, so every size can be derived from one already computed
+        self.scaled_outputs = sorted(
+            scaled_outputs,
+            key=lambda output: output.width * output.height,
+            reverse=True,
+        )
+        self._tolerance = 0.5 / fps if fps > 0 else 0.0
+        self._buffers = {}  # (width, height) -> resize target, allocated on first use
+        self.resizes = 0
+
+    def trim(self):
+        """Drops the resize buffers while no output has a consumer."""
+        self._buffers.clear()
+
+    @staticmethod
+    def _pick_source(sources, size):
+        """
+        Chooses the frame to downscale from and how. OpenCV's INTER_AREA is fast
+        only for integer ratios (a 2x step costs a fraction of 1.5x), so the
+        smallest source with an integer ratio wins; otherwise the smallest
+        covering source is scaled with INTER_LINEAR, which does not alias below 2x.
+        """
+        width, height = size
+        covering = [
+            candidate
+            for candidate in reversed(sources)  # Smallest first
+            if candidate.shape[1] >= width and candidate.shape[0] >= height
+        ]
+        for candidate in covering:
+            if candidate.shape[1] % width == 0 and candidate.shape[0] % height == 0:
+                return candidate, cv2.INTER_AREA
+        source = covering[0]
+        if source.shape[1] < 2 * width:
+            return source, cv2.INTER_LINEAR
+        return source, cv2.INTER_AREA
+
+    def send_frame(self, frame):
+        if self.primary.is_connected():
+            self.primary.send_frame(frame)
+
+        now = time.perf_counter()
+        produced = {}
+        sources = [frame]
+        for output in self.scaled_outputs:
+            if not output.sink.is_connected() or not output.due(now, self._tolerance):
+                continue
+            size = (output.width, output.height)
+            scaled = produced.get(size)
+            if scaled is None:
+                source, interpolation = self._pick_source(sources, size)
+                buffer = self._buffers.get(size)
+                if buffer is None:
+                    buffer = self._buffers[size] = np.empty(
+                        (output.height, output.width, 3), dtype=np.uint8
+                    )
+                scaled = cv2.resize(
+                    source, size, dst=buffer, interpolation=interpolation
+                )
+                self.resizes += 1
+                produced[size] = scaled
+                sources.append(scaled)
+            output.sink.send_frame(scaled)
+
+
+class CameraPipelineGroup:
+    """
+    Runs one independent CameraManager pipeline per entry in config.cameras.
+    Each pipeline owns its thread, physical camera and virtual camera, so a slow
+    device only stalls its own loop. OpenCV releases the GIL while reading,
+    resizing and flipping, which lets the pipelines run on separate cores.
+    """
+
+    def __init__(
+        self,
+        config_reader,
+        capture_factory=None,
+        sink_factory=None,
+        trace_dir=None,
+        device_registry=None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.config = config_reader
+        self.trace_dir = trace_dir
+        # One device watcher shared by all pipelines; synthetic captures need none
+        if (
+            device_registry is None
+            and capture_factory is None
+            and config_reader.get("camera_device_discovery", True)
+        ):
+            device_registry = CameraDeviceRegistry(
+                default_enumerator(),
+                poll_interval=config_reader.get("camera_device_poll_interval", 2.0),
+            )
+        self.device_registry = device_registry
+        # None: a config without camera entries, run one pipeline from camera_* keys.
+        # An empty list means every configured entry was invalid: no pipelines
+        entries = getattr(config_reader, "cameras", None)
+        if entries is None:
+            entries = [None]
+        elif len(entries) > 1:
+            entries = [self._separate_record_path(entry) for entry in entries]
+        self.managers = [
+            CameraManager(
+                config_reader,
+                camera_settings=entry,
+                capture_factory=capture_factory,
+                sink_factory=sink_factory,
+                trace_dir=trace_dir,
+                device_registry=device_registry,
+            )
+            for entry in entries
+        ]
+
+    def _separate_record_path(self, entry):
+        """
+        Gives a camera entry whose recording path has no {name} placeholder a
+        per-camera path, so pipelines do not overwrite each other's recording.
+        """
+        for key in ("camera_record_path", "record_path"):
+            if key in entry:
+                path = entry[key]
+                break
+        else:
+            path = self.config.get("camera_record_path", None)
+        if not path or "{name}" in str(path):
+            return entry
+        separate_path = recording.per_camera_path(path)
+        self.logger.warning(
+            f"camera_record_path '{path}' has no {{name}} placeholder and "
+            f"{len(self.config.cameras)} cameras are configured. Camera "
+            f"'{entry['name']}' records to "
+            f"'{recording.session_file_path(separate_path, entry['name'])}'."
+        )
+        return dict(entry, camera_record_path=separate_path)
+
+    def get(self, name):
+        for manager in self.managers:
+            if manager.name == name:
+                return manager
+        return None
+
+    def dump_trace(self, directory=None, reason="manual"):
+        """
+        Writes the recent frame timeline of every pipeline, one track each, to a
+        single Chrome trace / Perfetto JSON file.
+        Returns:
+            str or None: The file path, or None if no directory is configured or writing failed.
+        """
+        directory = directory or self.trace_dir
+        if not directory:
+            self.logger.warning("No trace directory configured. Frame trace not saved.")
+            return None
+        path = frame_trace.trace_file_path(directory, reason)
+        recorders = [manager.trace for manager in self.managers]
+        return path if frame_trace.write_chrome_trace(recorders, path) else None
+
+    def collect_stats(self):
+        """Drains every pipeline's telemetry counters, keyed "camera:<name>"."""
+        return {
+            f"camera:{manager.name}": manager.stats.drain() for manager in self.managers
+        }
+
+    def start(self):
+        if not self.managers:
+            self.logger.warning("No camera pipelines to start.")
+            return
+        self.logger.info(f"Starting {len(self.managers)} camera pipeline(s).")
+        if self.device_registry is not None:
+            self.device_registry.start()
+        for manager in self.managers:
+            manager.start()
+
+    def stop(self):
+        # Signal every loop first so the joins below overlap their shutdown work
+        for manager in self.managers:
+            manager.running = False
+        for manager in self.managers:
+            manager.stop()
+        if self.device_registry is not None:
+            self.device_registry.stop()
@@ -0,0 +1,274 @@
+import logging
+import logging.handlers
+import multiprocessing
+import threading
+import time
+
+from camera import CameraPipelineGroup
+from profiler import SamplingProfiler
+from state import STATE_KEYS, StateStore, state_property, toggle_state
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigSnapshot:
+    """
+    Stand-in for ConfigReader inside the camera process.
+    Built from ConfigReader.snapshot(); toggle changes from the parent are
+    applied to its own StateStore, so the child never touches the microphone or
+    the YAML file.
+    """
+
+    camera_active = state_property("camera_active")
+    camera_states = state_property("camera_states")
+    camera_disabled_mode = state_property("camera_disabled_mode")
+    mic_active = state_property("mic_active")
+
+    def __init__(self, snapshot):
+        self.state = StateStore(**{key: snapshot[key] for key in STATE_KEYS})
+        self.__dict__.update(
+            {key: value for key, value in snapshot.items() if key not in STATE_KEYS}
+        )
+
+    def get(self, key, default=None):
+        return self.config_data.get(key, default)
+
+
+def _configure_child_logging(log_queue, log_level):
+    # Records are handled by the parent's handlers, so both processes share one log file
+    root_logger = logging.getLogger()
+    root_logger.handlers.clear()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(log_level)
+
+
+def run_camera_process(
+    conn, snapshot, log_queue, log_level, trace_dir, capture_factory=None
+):
+    """
+    Entry point of the camera child process.
+    Runs the camera pipelines and applies control messages from the parent
+    until told to stop or the control pipe closes.
+    """
+    _configure_child_logging(log_queue, log_level)
+    config = ConfigSnapshot(snapshot)
+    group = CameraPipelineGroup(
+        config, capture_factory=capture_factory, trace_dir=trace_dir
+    )
+    group.start()
+    profiler = None
+    logger.info("Camera process started.")
+
+    try:
+        while True:
+            try:
+                message, payload = conn.recv()
+            except (EOFError, OSError):
+                logger.warning("Camera process control channel closed. Stopping.")
+                break
+
+            if message == "state":
+                config.state.update(**payload)
+            elif message == "dump_trace":
+                group.dump_trace(reason=payload)
+            elif message == "start_profiler":
+                if trace_dir and (profiler is None or not profiler.running):
+                    profiler = SamplingProfiler(
+                        trace_dir, label="camera-process", **payload
+                    )
+                    profiler.start()
+            elif message == "collect_stats":
+                conn.send(("stats", group.collect_stats()))
+            elif message == "stop":
+                break
+            else:
+                logger.warning(f"Camera process ignoring unknown message '{message}'.")
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        group.stop()
+        logger.info("Camera process finished.")
+
+
+class CameraProcessSupervisor:
+    """
+    Runs the camera pipelines in a child process, away from the GIL shared with
+    the OSD, tray, hotkey listener and COM calls.
+    Toggle state changes are pushed over a pipe as the StateStore reports them. The child is
+    restarted with exponential backoff if it exits unexpectedly. Exposes the
+    same start/stop/dump_trace/collect_stats interface as CameraPipelineGroup, plus
+    start_profiler, since the parent's profiler cannot see the child's threads.
+    """
+
+    def __init__(
+        self,
+        config_reader,
+        trace_dir=None,
+        capture_factory=None,
+        restart_backoff_max=30.0,
+    ):
+        self.config = config_reader
+        self.trace_dir = trace_dir
+        self.running = False
+        self.process = None
+        self.restart_count = 0
+        self._capture_factory = capture_factory
+        self._restart_backoff_max = restart_backoff_max
+        # spawn everywhere: forking a process that already runs threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._log_queue = self._context.Queue()
+        self._log_listener = None
+        self._monitor_thread = None
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        # Install the pipe before taking the snapshot: a toggle in between is then
+        # sent over it (and buffered until the child reads) instead of being lost
+        with self._conn_lock:
+            previous_conn, self._conn = self._conn, parent_conn
+        if previous_conn is not None:
+            previous_conn.close()
+        process = self._context.Process(
+            target=run_camera_process,
+            args=(
+                child_conn,
+                self.config.snapshot(),
+                self._log_queue,
+                logging.getLogger().level,
+                self.trace_dir,
+                self._capture_factory,
+            ),
+            name="CameraProcess",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.process = process
+        logger.info(f"Camera process spawned (PID {process.pid}).")
+
+    def _send(self, message, payload=None):
+        with self._conn_lock:
+            if self._conn is None:
+                return False
+            try:
+                self._conn.send((message, payload))
+                return True
+            except (BrokenPipeError, EOFError, OSError) as e:
+                logger.warning(f"Could not send '{message}' to camera process: {e}")
+                return False
+
+    def _monitor_loop(self):
+        backoff = 1.0
+        while self.running:
+            started_at = time.perf_counter()
+            self.process.join()
+            if not self.running:
+                break
+
+            logger.error(
+                f"Camera process exited unexpectedly (exit code {self.process.exitcode}). "
+                f"Restarting in {backoff:.0f}s."
+            )
+            if time.perf_counter() - started_at > 60.0:
+                backoff = 1.0  # It ran fine for a while; not a crash loop
+            deadline = time.perf_counter() + backoff
+            while self.running and time.perf_counter() < deadline:
+                time.sleep(0.1)
+            if not self.running:
+                break
+            backoff = min(backoff * 2, self._restart_backoff_max)
+            self.restart_count += 1
+            self._spawn()
+
+    def _on_state_change(self, version, state):
+        """Pushes every toggle change to the camera process."""
+        self._send("state", toggle_state(state))
+
+    def collect_stats(self, timeout=2.0):
+        """
+        Fetches and resets the camera process's telemetry counters.
+        Returns:
+            dict: {"camera:<name>": row}, or {} if the process did not answer in time.
+        """
+        # Only the send takes the pipe lock, so toggles are not held up while the
+        # child answers; _stats_lock keeps one request in flight at a time
+        with self._stats_lock:
+            with self._conn_lock:
+                conn = self._conn
+            if conn is None:
+                return {}
+            try:
+                while conn.poll(0):
+                    conn.recv()  # A late reply to a request that timed out
+                if not self._send("collect_stats"):
+                    return {}
+                if not conn.poll(timeout):
+                    logger.warning("Camera process did not return telemetry in time.")
+                    return {}
+                message, payload = conn.recv()
+            except (BrokenPipeError, EOFError, OSError) as e:
+                logger.warning(f"Could not collect telemetry from camera process: {e}")
+                return {}
+        return payload if message == "stats" else {}
+
+    def dump_trace(self, directory=None, reason="manual"):
+        """
+        Asks the camera process to write its frame trace to its trace directory.
+        Returns None because the file is written asynchronously by the child.
+        """
+        self._send("dump_trace", reason)
+        return None
+
+    def start_profiler(self, duration, interval, fmt):
+        """
+        Asks the camera process to profile its own threads. It writes a separate
+        profile to its trace directory.
+        """
+        self._send(
+            "start_profiler", {"duration": duration, "interval": interval, "fmt": fmt}
+        )
+
+    def start(self):
+        if self.running:
+            logger.warning("CameraProcessSupervisor start called but already running.")
+            return
+        self.running = True
+        self._log_listener = logging.handlers.QueueListener(
+            self._log_queue, *logging.getLogger().handlers, respect_handler_level=True
+        )
+        self._log_listener.start()
+        # Subscribe before the snapshot in _spawn, so no toggle falls in between;
+        # _send drops changes until the pipe is installed
+        self.config.state.subscribe(self._on_state_change)
+        self._spawn()
+        self._monitor_thread = threading.Thread(
+            target=self._monitor_loop, name="CameraProcessMonitor", daemon=True
+        )
+        self._monitor_thread.start()
+        logger.info("CameraProcessSupervisor started.")
+
+    def stop(self):
+        logger.info("CameraProcessSupervisor stop called.")
+        self.running = False
+        self.config.state.unsubscribe(self._on_state_change)
+        self._send("stop")
+        if self.process is not None:
+            self.process.join(timeout=5.0)
+            if self.process.is_alive():
+                logger.error("Camera process did not stop in time. Terminating.")
+                self.process.terminate()
+                self.process.join(timeout=2.0)
+        if self._monitor_thread and self._monitor_thread.is_alive():
+            self._monitor_thread.join(timeout=1.0)
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        if self._log_listener is not None:
+            self._log_listener.stop()
+            self._log_listener = None
+        logger.info("CameraProcessSupervisor stopped.")
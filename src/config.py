@@ -4,6 +4,7 @@ import yaml
 import os
 
 from microphone import get_mic_status
+from state import StateStore, is_camera_live, state_property, toggle_state
 
 
 logger = logging.getLogger(__name__)
@@ -11,8 +12,16 @@ logger = logging.getLogger(__name__)
 
 class ConfigReader:
     _instance = None
+    # What the virtual camera shows while the camera feed is disabled
+    DISABLED_OUTPUT_MODES = ("black", "blur", "slate")
     _config_file_name = "config.yml"  # Default config file name
 
+    # Runtime toggles live in self.state; these attributes read and write it
+    camera_active = state_property("camera_active")
+    camera_states = state_property("camera_states")
+    camera_disabled_mode = state_property("camera_disabled_mode")
+    mic_active = state_property("mic_active")
+
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super(ConfigReader, cls).__new__(cls)
@@ -34,14 +43,25 @@ class ConfigReader:
 
         self.config_data = {}
         self._load_config()
+        self.state = StateStore(
+            camera_active=True,
+            camera_states={},
+            camera_disabled_mode="black",
+            mic_active=False,
+        )
 
         # Set attributes directly for easier access
         self.camera_hotkey = self.get("camera_hotkey", "<cmd>+<shift>+a")
         self.mic_hotkey = self.get("mic_hotkey", "<cmd>+<shift>+o")
+        self.camera_blur_hotkey = self.get("camera_blur_hotkey")
+        self.mic_ptt_hotkey = self.get("mic_ptt_hotkey")
         self.camera_id = self.get("camera_id", 0)
         self.camera_width = self.get("camera_width", 1280)
         self.camera_height = self.get("camera_height", 720)
         self.camera_fps = self.get("camera_fps", 30)
+        self.camera_disabled_mode = self.default_disabled_mode()
+        self.cameras = self._load_camera_entries()
+        self.camera_states = {entry["name"]: True for entry in self.cameras}
         self.camera_status = False
 
         logger.info("Attempting to get initial microphone status for config...")
@@ -85,6 +105,110 @@ class ConfigReader:
         """
         return self.config_data.get(key, default)
 
+    @property
+    def config_dir(self):
+        """Directory of the config file, for per-install files such as the control token."""
+        return os.path.dirname(os.path.abspath(self._config_file_path))
+
+    def _load_camera_entries(self):
+        """
+        Builds the list of camera pipeline entries from the `cameras` key.
+        Falls back to a single entry built from the top-level camera_* keys
+        when the key is absent. A `cameras` list without any valid entry yields
+        an empty list, which disables the camera feed.
+        Returns:
+            list[dict]: One dict per camera with at least name, id, width, height and fps.
+        """
+        raw_entries = self.get("cameras")
+        if raw_entries is None:
+            return [
+                {
+                    "name": "default",
+                    "id": self.camera_id,
+                    "width": self.camera_width,
+                    "height": self.camera_height,
+                    "fps": self.camera_fps,
+                }
+            ]
+
+        if not isinstance(raw_entries, list):
+            logger.error(
+                f"Invalid cameras setting {raw_entries!r}: expected a list. "
+                "Camera feed disabled."
+            )
+            return []
+
+        entries = []
+        for index, raw_entry in enumerate(raw_entries):
+            if not isinstance(raw_entry, dict):
+                logger.warning(f"Ignoring invalid camera entry #{index}: {raw_entry!r}")
+                continue
+            entry = dict(raw_entry)
+            entry["name"] = str(entry.get("name", f"camera{index}"))
+            entry.setdefault("id", index)
+            entry.setdefault("width", self.camera_width)
+            entry.setdefault("height", self.camera_height)
+            entry.setdefault("fps", self.camera_fps)
+            if any(existing["name"] == entry["name"] for existing in entries):
+                logger.warning(
+                    f"Ignoring camera entry #{index}: duplicate name '{entry['name']}'."
+                )
+                continue
+            entries.append(entry)
+
+        if not entries:
+            logger.error("No valid camera entries configured. Camera feed disabled.")
+        return entries
+
+    def default_disabled_mode(self):
+        """
+        Returns the configured camera_disabled_mode, falling back to "black" if invalid.
+        """
+        mode = str(self.get("camera_disabled_mode", "black")).lower()
+        if mode not in self.DISABLED_OUTPUT_MODES:
+            logger.warning(
+                f"Unknown camera_disabled_mode '{mode}'. Expected one of "
+                f"{', '.join(self.DISABLED_OUTPUT_MODES)}. Using 'black'."
+            )
+            return "black"
+        return mode
+
+    def is_camera_active(self, name=None):
+        """
+        Checks whether a camera feed should be live.
+        Args:
+            name (str, optional): Camera entry name. When omitted, checks that every camera is live.
+        Returns:
+            bool: True if the global camera toggle and the per-camera toggle are both on.
+        """
+        return is_camera_live(self.state.snapshot()[1], name)
+
+    def set_camera_state(self, name, active):
+        """Toggles a single camera pipeline without touching the others."""
+        self.state.modify(
+            lambda state: {"camera_states": {**state["camera_states"], name: active}}
+        )
+
+    def snapshot(self):
+        """
+        Returns the settings and runtime toggle state as a plain, picklable dict.
+        Used to hand the configuration to a camera pipeline in another process.
+        """
+        snapshot = {
+            "config_data": dict(self.config_data),
+            "camera_hotkey": self.camera_hotkey,
+            "mic_hotkey": self.mic_hotkey,
+            "camera_blur_hotkey": self.camera_blur_hotkey,
+            "mic_ptt_hotkey": self.mic_ptt_hotkey,
+            "camera_id": self.camera_id,
+            "camera_width": self.camera_width,
+            "camera_height": self.camera_height,
+            "camera_fps": self.camera_fps,
+            "cameras": [dict(entry) for entry in self.cameras],
+        }
+        snapshot.update(toggle_state(self.state.snapshot()[1]))
+        return snapshot
+
     def reload_config(self, config_file_path=None):
         """
         Reloads the configuration from the YAML file.
@@ -96,10 +220,19 @@ class ConfigReader:
         self._load_config()
         self.camera_hotkey = self.get("camera_hotkey", "<cmd>+<shift>+a")
         self.mic_hotkey = self.get("mic_hotkey", "<cmd>+<shift>+o")
+        self.camera_blur_hotkey = self.get("camera_blur_hotkey")
+        self.mic_ptt_hotkey = self.get("mic_ptt_hotkey")
         self.camera_id = self.get("camera_id", 0)
         self.camera_width = self.get("camera_width", 1280)
         self.camera_height = self.get("camera_height", 720)
         self.camera_fps = self.get("camera_fps", 30)
+        self.camera_disabled_mode = self.default_disabled_mode()
+        self.cameras = self._load_camera_entries()
+        # Keep per-camera toggle state for cameras that survived the reload
+        self.camera_states = {
+            entry["name"]: self.camera_states.get(entry["name"], True)
+            for entry in self.cameras
+        }
         # Or re-run the dynamic attribute setting if you chose that path
 
     def __str__(self):
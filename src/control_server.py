@@ -0,0 +1,481 @@
+import hmac
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import selectors
+import socket
+import threading
+from collections import deque
+
+from state import toggle_state
+
+
+logger = logging.getLogger(__name__)
+
+_MAX_LINE_BYTES = 1024
+_MAX_PENDING_OUTPUT_BYTES = 64 * 1024
+# "POST / HTTP/1.1" and friends: a browser page talking to the port cross-site
+_HTTP_REQUEST_LINE = re.compile(r"^[A-Z]+ \S+ HTTP/\d")
+
+TOKEN_FILE_NAME = "control_token"
+
+HELP_TEXT = (
+    "commands: auth <token> | get | subscribe | unsubscribe | ping | "
+    "toggle <camera|mic|camera:NAME> | set <camera|mic|camera:NAME> <on|off> | "
+    "mode <black|blur|slate>"
+)
+
+
+def load_or_create_token(directory):
+    """
+    Reads the control API token from directory, creating a random one on first use.
+    Args:
+        directory (str): Directory holding the token file (the config directory).
+    Returns:
+        str or None: The token, or None if it could not be read or created.
+    """
+    path = os.path.join(directory, TOKEN_FILE_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            token = f.read().strip()
+        if token:
+            return token
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.error(f"Could not read control token '{path}': {e}")
+        return None
+
+    token = secrets.token_urlsafe(32)
+    try:
+        # Readable by the current user only where the OS supports it
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(token + "\n")
+    except OSError as e:
+        logger.error(f"Could not create control token '{path}': {e}")
+        return None
+    logger.info(f"Created control token '{path}'.")
+    return token
+
+
+class _Client:
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()
+        self.subscribed = False
+        self.authenticated = False
+        self.pending = False  # A command is running on the worker thread
+        self.closing = False  # Close once the queued replies are sent
+
+
+class ControlServer:
+    """
+    Local control API for scripts, Stream Deck buttons and meeting launchers.
+    Listens on localhost TCP (or a Unix socket) and speaks a line-delimited
+    text protocol. Every request line gets exactly one reply line:
+
+        auth <token>             -> ok 2
+        get                      -> state {"version": 3, "camera_active": true, ...}
+        toggle mic               -> ok 4
+        set camera:face off      -> ok 5
+        mode blur                -> ok 6
+        subscribe                -> state {...}, then one state line per change
+
+    A client must send the per-install token with auth before anything else.
+    The connection is closed on the first line that is not a valid command and
+    on any HTTP request line, so a web page cannot smuggle commands in a request.
+
+    All clients are served by one selector-based thread with non-blocking
+    sockets, so slow or idle clients never block each other or the camera loop.
+    toggle and set run on a worker thread, as muting a microphone can block;
+    the client gets its reply when the change is done. State changes are
+    coalesced: subscribers always receive the newest state.
+    """
+
+    def __init__(
+        self,
+        config_reader,
+        setters,
+        token,
+        toggles=None,
+        host="127.0.0.1",
+        port=48777,
+        unix_path=None,
+    ):
+        """
+        Args:
+            config_reader: ConfigReader (or compatible) holding the StateStore.
+            setters (dict): "camera" and "mic" callables taking the desired bool state.
+            token (str): Secret clients must send with auth before other commands.
+            toggles (dict, optional): "camera" and "mic" callables that flip the state
+                atomically. Without one, toggle reads the state and calls the setter.
+            host (str): TCP address to bind; keep it on loopback.
+            port (int): TCP port.
+            unix_path (str, optional): Listen on this Unix socket path instead of TCP.
+        """
+        self.config = config_reader
+        self.setters = setters
+        self.toggles = toggles or {}
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self._token = token.encode("utf-8")
+        self.running = False
+        self.thread = None
+        self._worker = None
+        self._jobs = queue.Queue()
+        self._finished = deque()
+        self.address = None
+        self._selector = None
+        self._listener = None
+        self._wake_reader = None
+        self._wake_writer = None
+        self._clients = {}
+        self._published_version = -1
+
+    def _state_line(self):
+        version, state = self.config.state.snapshot()
+        payload = {"version": version}
+        payload.update(toggle_state(state))
+        return f"state {json.dumps(payload, separators=(',', ':'))}\n", version
+
+    def _target_value(self, target):
+        _, state = self.config.state.snapshot()
+        if target == "camera":
+            return state["camera_active"]
+        if target == "mic":
+            return state["mic_active"]
+        if target.startswith("camera:"):
+            return state["camera_states"].get(target[len("camera:") :])
+        return None
+
+    def _apply(self, target, value):
+        if target in self.setters:
+            self.setters[target](value)
+            return None
+        if target.startswith("camera:"):
+            name = target[len("camera:") :]
+            if name not in self.config.camera_states:
+                return f"unknown camera '{name}'"
+            self.config.set_camera_state(name, value)
+            return None
+        return f"unknown target '{target}'"
+
+    def _toggle(self, target):
+        if target in self.toggles:
+            self.toggles[target]()
+            return None
+        if target.startswith("camera:"):
+            name = target[len("camera:") :]
+            if name not in self.config.camera_states:
+                return f"unknown camera '{name}'"
+            self.config.state.modify(
+                lambda state: {
+                    "camera_states": {
+                        **state["camera_states"],
+                        name: not state["camera_states"][name],
+                    }
+                }
+            )
+            return None
+        current = self._target_value(target)
+        if current is None:
+            return f"unknown target '{target}'"
+        return self._apply(target, not current)
+
+    def _reject(self, client, reply):
+        client.closing = True
+        return reply
+
+    def handle_command(self, client, line):
+        """
+        Executes one request line and returns the reply line, or None when the
+        command was handed to the worker thread, which replies when it is done.
+        Sets client.closing for lines that are not valid commands.
+        """
+        parts = line.split()
+        if not parts:
+            return self._reject(client, "error empty command\n")
+        command, args = parts[0].lower(), parts[1:]
+
+        if command == "auth" and len(args) == 1:
+            if not hmac.compare_digest(args[0].encode("utf-8"), self._token):
+                logger.warning(f"Control client {client.address} sent a wrong token.")
+                return self._reject(client, "error invalid token\n")
+            client.authenticated = True
+            return f"ok {self.config.state.version}\n"
+        if not client.authenticated:
+            return self._reject(client, "error authentication required\n")
+
+        if command in ("get", "query"):
+            return self._state_line()[0]
+        if command == "subscribe":
+            client.subscribed = True
+            return self._state_line()[0]
+        if command == "unsubscribe":
+            client.subscribed = False
+            return f"ok {self.config.state.version}\n"
+        if command == "ping":
+            return "pong\n"
+        if command == "help":
+            return f"ok {HELP_TEXT}\n"
+
+        if command == "toggle" and len(args) == 1:
+            target = args[0]
+            self._submit(client, lambda: self._toggle(target))
+            return None
+        if command == "set" and len(args) == 2:
+            if args[1].lower() not in ("on", "off"):
+                return self._reject(client, "error value must be on or off\n")
+            target, value = args[0], args[1].lower() == "on"
+            self._submit(client, lambda: self._apply(target, value))
+            return None
+        if command == "mode" and len(args) == 1:
+            mode = args[0].lower()
+            if mode not in self.config.DISABLED_OUTPUT_MODES:
+                return self._reject(client, f"error unknown mode '{mode}'\n")
+            self.config.camera_disabled_mode = mode
+            return f"ok {self.config.state.version}\n"
+        return self._reject(client, f"error {HELP_TEXT}\n")
+
+    def _submit(self, client, job):
+        # Further lines from this client wait, so its replies stay in order
+        client.pending = True
+        self._jobs.put((client, job))
+
+    def _run_jobs(self):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                return
+            client, job = item
+            try:
+                error = job()
+                reply = f"error {error}\n" if error else f"ok {self.config.state.version}\n"
+            except Exception as e:
+                logger.error(f"Error running control command: {e}", exc_info=True)
+                reply = f"error {e}\n"
+            self._finished.append((client, reply))
+            self._wake()
+
+    def _finish_jobs(self):
+        while self._finished:
+            client, reply = self._finished.popleft()
+            client.pending = False
+            if client.sock not in self._clients:
+                continue  # Disconnected while the command ran
+            self._queue_output(client, reply)
+            if client.sock in self._clients:
+                self._process_lines(client)
+
+    def _wake(self):
+        try:
+            self._wake_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # A wake-up is already pending
+
+    def _on_state_change(self, version, state):
+        # Called from the thread that changed the state; hand off to the server loop
+        self._wake()
+
+    def _open_listener(self):
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(self.unix_path)
+            self.address = self.unix_path
+        else:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((self.host, self.port))
+            self.address = listener.getsockname()
+        listener.listen(64)
+        listener.setblocking(False)
+        return listener
+
+    def _accept(self):
+        try:
+            sock, address = self._listener.accept()
+        except (BlockingIOError, OSError):
+            return
+        sock.setblocking(False)
+        if sock.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = _Client(sock, address)
+        self._clients[sock] = client
+        self._selector.register(sock, selectors.EVENT_READ, client)
+        logger.debug(f"Control client connected: {address}")
+
+    def _close_client(self, client):
+        self._clients.pop(client.sock, None)
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+        logger.debug(f"Control client disconnected: {client.address}")
+
+    def _queue_output(self, client, data):
+        client.outbuf += data.encode("utf-8")
+        if len(client.outbuf) > _MAX_PENDING_OUTPUT_BYTES:
+            logger.warning(f"Dropping control client {client.address}: not reading replies.")
+            self._close_client(client)
+            return
+        self._flush(client)
+
+    def _flush(self, client):
+        if client.outbuf:
+            try:
+                sent = client.sock.send(client.outbuf)
+                del client.outbuf[:sent]
+            except BlockingIOError:
+                pass
+            except OSError:
+                self._close_client(client)
+                return
+        if client.closing and not client.outbuf:
+            self._close_client(client)
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbuf else 0)
+        self._selector.modify(client.sock, events, client)
+
+    def _read(self, client):
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close_client(client)
+            return
+
+        if client.closing:
+            return  # Input after a rejected line is ignored until the close
+        client.inbuf += data
+        self._process_lines(client)
+
+    def _process_lines(self, client):
+        replies = []
+        while b"\n" in client.inbuf and not client.pending and not client.closing:
+            raw_line, _, rest = client.inbuf.partition(b"\n")
+            client.inbuf = bytearray(rest)
+            line = raw_line.decode("utf-8", errors="replace").strip()
+            if _HTTP_REQUEST_LINE.match(line):
+                logger.warning(f"Closing control client {client.address}: HTTP request.")
+                self._close_client(client)
+                return
+            try:
+                reply = self.handle_command(client, line)
+            except Exception as e:
+                logger.error(f"Error handling control command '{line}': {e}", exc_info=True)
+                reply = f"error {e}\n"
+            if reply:
+                replies.append(reply)
+        if client.closing:
+            client.inbuf.clear()
+        elif (
+            len(client.inbuf) - client.inbuf.rfind(b"\n") - 1 > _MAX_LINE_BYTES
+            or len(client.inbuf) > _MAX_PENDING_OUTPUT_BYTES
+        ):
+            replies.append("error line too long\n")
+            client.inbuf.clear()
+            client.closing = True
+        if replies:
+            self._queue_output(client, "".join(replies))
+        elif client.closing:
+            self._close_client(client)
+
+    def _drain_wakeups(self):
+        try:
+            while self._wake_reader.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _publish_state(self):
+        line, version = self._state_line()
+        if version == self._published_version:
+            return
+        self._published_version = version
+        for client in list(self._clients.values()):
+            if client.subscribed:
+                self._queue_output(client, line)
+
+    def _serve(self):
+        logger.info(f"Control server listening on {self.address}.")
+        try:
+            while self.running:
+                for key, events in self._selector.select(timeout=0.5):
+                    if key.fileobj is self._listener:
+                        self._accept()
+                    elif key.fileobj is self._wake_reader:
+                        self._drain_wakeups()
+                        self._finish_jobs()
+                        self._publish_state()
+                    else:
+                        client = key.data
+                        if client.sock not in self._clients:
+                            continue  # Closed earlier in this batch
+                        if events & selectors.EVENT_READ:
+                            self._read(client)
+                        if events & selectors.EVENT_WRITE and client.sock in self._clients:
+                            self._flush(client)
+        except Exception as e:
+            logger.error(f"Control server loop failed: {e}", exc_info=True)
+        finally:
+            for client in list(self._clients.values()):
+                self._close_client(client)
+            self._selector.close()
+            self._listener.close()
+            self._wake_reader.close()
+            self._wake_writer.close()
+            if self.unix_path and os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            logger.info("Control server stopped.")
+
+    def start(self):
+        if self.running:
+            logger.warning("Control server already running.")
+            return
+        try:
+            self._listener = self._open_listener()
+        except OSError as e:
+            logger.error(f"Could not start control server: {e}")
+            return
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wake_reader, selectors.EVENT_READ)
+        self._published_version = self.config.state.version
+        self.config.state.subscribe(self._on_state_change)
+        self.running = True
+        self._worker = threading.Thread(
+            target=self._run_jobs, name="ControlServerWorkerThread", daemon=True
+        )
+        self._worker.start()
+        self.thread = threading.Thread(
+            target=self._serve, name="ControlServerThread", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.config.state.unsubscribe(self._on_state_change)
+        self._jobs.put(None)
+        self._wake()  # Wake the loop so it notices the stop
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        if self._worker and self._worker.is_alive():
+            self._worker.join(timeout=2.0)
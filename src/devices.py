@@ -0,0 +1,304 @@
+import glob
+import logging
+import os
+import re
+import sys
+import threading
+from collections import namedtuple
+
+
+logger = logging.getLogger(__name__)
+
+# index is what cv2.VideoCapture expects; path is stable across reboots where the
+# platform provides one (DirectShow device path, V4L2 sysfs path)
+CameraDevice = namedtuple("CameraDevice", "index name path")
+
+
+def device_identity(device):
+    """
+    Returns what identifies a device across re-enumerations: its path, or its
+    name where the platform has no path. The index is left out, as it shifts
+    when another device is plugged in or removed.
+    """
+    return ("path", device.path) if device.path else ("name", device.name)
+
+
+class DirectShowEnumerator:
+    """
+    Lists video capture devices in DirectShow order, which is the index order
+    cv2.VideoCapture uses with CAP_DSHOW. Uses comtypes, which VCM already
+    depends on for the microphone.
+    """
+
+    def __init__(self):
+        # Imported here so the module stays importable where comtypes is missing
+        from ctypes import POINTER, byref, c_int, c_ulong, c_void_p
+
+        import comtypes
+        from comtypes import GUID, HRESULT, STDMETHOD, IUnknown
+        from comtypes.persist import IPropertyBag
+
+        class IMoniker(IUnknown):
+            _iid_ = GUID("{0000000F-0000-0000-C000-000000000046}")
+            # Only the methods up to BindToStorage are called; the rest of the
+            # vtable is never reached
+            _methods_ = [
+                STDMETHOD(HRESULT, "GetClassID", [c_void_p]),
+                STDMETHOD(HRESULT, "IsDirty", []),
+                STDMETHOD(HRESULT, "Load", [c_void_p]),
+                STDMETHOD(HRESULT, "Save", [c_void_p, c_int]),
+                STDMETHOD(HRESULT, "GetSizeMax", [c_void_p]),
+                STDMETHOD(
+                    HRESULT,
+                    "BindToObject",
+                    [c_void_p, c_void_p, POINTER(GUID), POINTER(c_void_p)],
+                ),
+                STDMETHOD(
+                    HRESULT,
+                    "BindToStorage",
+                    [
+                        c_void_p,
+                        c_void_p,
+                        POINTER(GUID),
+                        POINTER(POINTER(IPropertyBag)),
+                    ],
+                ),
+            ]
+
+        class IEnumMoniker(IUnknown):
+            _iid_ = GUID("{00000102-0000-0000-C000-000000000046}")
+            _methods_ = [
+                STDMETHOD(
+                    HRESULT,
+                    "Next",
+                    [c_ulong, POINTER(POINTER(IMoniker)), POINTER(c_ulong)],
+                ),
+                STDMETHOD(HRESULT, "Skip", [c_ulong]),
+                STDMETHOD(HRESULT, "Reset", []),
+                STDMETHOD(HRESULT, "Clone", [c_void_p]),
+            ]
+
+        class ICreateDevEnum(IUnknown):
+            _iid_ = GUID("{29840822-5B84-11D0-BD3B-00A0C911CE86}")
+            _methods_ = [
+                STDMETHOD(
+                    HRESULT,
+                    "CreateClassEnumerator",
+                    [POINTER(GUID), POINTER(POINTER(IEnumMoniker)), c_ulong],
+                ),
+            ]
+
+        self._comtypes = comtypes
+        self._byref = byref
+        self._c_ulong = c_ulong
+        self._POINTER = POINTER
+        self._IMoniker = IMoniker
+        self._IEnumMoniker = IEnumMoniker
+        self._ICreateDevEnum = ICreateDevEnum
+        self._IPropertyBag = IPropertyBag
+        self._system_device_enum = GUID("{62BE5D10-60EB-11D0-BD3B-00A0C911CE86}")
+        self._video_input_category = GUID("{860BB310-5D01-11D0-BD3B-00A0C911CE86}")
+
+    def enumerate(self):
+        byref = self._byref
+        com_initialized = False
+        try:
+            self._comtypes.CoInitialize()
+            com_initialized = True
+        except OSError:  # Already initialized in this thread with a different mode
+            pass
+        try:
+            dev_enum = self._comtypes.CoCreateInstance(
+                self._system_device_enum, interface=self._ICreateDevEnum
+            )
+            enum_monikers = self._POINTER(self._IEnumMoniker)()
+            dev_enum.CreateClassEnumerator(
+                byref(self._video_input_category), byref(enum_monikers), 0
+            )
+            devices = []
+            if not enum_monikers:  # S_FALSE: no devices in the category
+                return devices
+            moniker = self._POINTER(self._IMoniker)()
+            fetched = self._c_ulong()
+            while enum_monikers.Next(1, byref(moniker), byref(fetched)) == 0:
+                bag = self._POINTER(self._IPropertyBag)()
+                moniker.BindToStorage(
+                    None, None, byref(self._IPropertyBag._iid_), byref(bag)
+                )
+                name = bag.Read("FriendlyName", pErrorLog=None)
+                try:
+                    path = bag.Read("DevicePath", pErrorLog=None)
+                except Exception:
+                    path = None  # Virtual cameras often have no device path
+                devices.append(CameraDevice(len(devices), str(name), path))
+                moniker = self._POINTER(self._IMoniker)()
+            return devices
+        finally:
+            if com_initialized:
+                self._comtypes.CoUninitialize()
+
+
+class V4L2Enumerator:
+    """Lists /dev/videoN capture nodes with the names the kernel reports."""
+
+    def __init__(self, sysfs_root="/sys/class/video4linux"):
+        self.sysfs_root = sysfs_root
+
+    def enumerate(self):
+        if not os.path.isdir(self.sysfs_root):
+            raise OSError(f"{self.sysfs_root} not found")
+        devices = []
+        for node in glob.glob(os.path.join(self.sysfs_root, "video*")):
+            match = re.fullmatch(r"video(\d+)", os.path.basename(node))
+            if not match:
+                continue
+            try:
+                with open(os.path.join(node, "name"), encoding="utf-8") as f:
+                    name = f.read().strip()
+            except OSError:
+                continue
+            devices.append(
+                CameraDevice(int(match.group(1)), name, os.path.realpath(node))
+            )
+        return sorted(devices)
+
+
+def default_enumerator():
+    """
+    Returns the enumerator for this platform, or None if device discovery is
+    not supported here.
+    """
+    try:
+        if sys.platform == "win32":
+            return DirectShowEnumerator()
+        if sys.platform.startswith("linux"):
+            return V4L2Enumerator()
+    except Exception as e:
+        logger.warning(f"Camera device discovery unavailable: {e}")
+    return None
+
+
+class CameraDeviceRegistry:
+    """
+    Caches the connected camera devices and reports arrivals and removals.
+
+    Devices are enumerated once at start and again by a watcher thread every
+    poll_interval seconds (enumeration is cheap next to a failed camera
+    open). Subscribers are called as callback(added, removed) with lists of
+    CameraDevice from the watcher thread, so they should only set flags.
+
+    If the platform has no enumerator or enumeration fails, available is False
+    and callers should fall back to trying the configured index.
+    """
+
+    def __init__(self, enumerator, poll_interval=2.0):
+        self.enumerator = enumerator
+        self.poll_interval = poll_interval
+        self.available = False
+        self._devices = ()
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def devices(self):
+        return self._devices
+
+    def refresh(self):
+        """
+        Re-enumerates the devices and notifies subscribers of changes.
+        Returns:
+            tuple: (added, removed) lists of CameraDevice.
+        """
+        if self.enumerator is None:
+            return [], []
+        try:
+            devices = tuple(self.enumerator.enumerate())
+        except Exception as e:
+            if self.available:
+                logger.warning(f"Camera device enumeration failed: {e}")
+            else:
+                logger.warning(
+                    f"Camera device discovery unavailable: {e}. "
+                    "Using configured camera IDs.",
+                    exc_info=True,
+                )
+            return [], []
+
+        with self._lock:
+            previous = self._devices
+            self._devices = devices
+            first_enumeration = not self.available
+            self.available = True
+            subscribers = list(self._subscribers)
+
+        added = [device for device in devices if device not in previous]
+        removed = [device for device in previous if device not in devices]
+        if first_enumeration:
+            logger.info(
+                "Camera devices: "
+                + (", ".join(f"{d.index}: {d.name}" for d in devices) or "none")
+            )
+        elif added or removed:
+            for device in added:
+                logger.info(f"Camera device connected: {device.index}: {device.name}")
+            for device in removed:
+                logger.info(
+                    f"Camera device disconnected: {device.index}: {device.name}"
+                )
+            for callback in subscribers:
+                try:
+                    callback(added, removed)
+                except Exception as e:
+                    logger.error(f"Camera device subscriber failed: {e}", exc_info=True)
+        return added, removed
+
+    def find(self, selector):
+        """
+        Looks up a device by index or by name.
+        Names match case-insensitively, exactly first and then as a substring,
+        so "BRIO" selects "Logitech BRIO". The lowest index wins on ties.
+        Returns:
+            CameraDevice or None: The device, or None if it is not connected.
+        """
+        devices = self._devices
+        if isinstance(selector, int):
+            return next((d for d in devices if d.index == selector), None)
+        wanted = str(selector).casefold()
+        for matches in (
+            lambda name: name == wanted,
+            lambda name: wanted in name,
+        ):
+            found = [d for d in devices if matches(d.name.casefold())]
+            if found:
+                return min(found, key=lambda d: d.index)
+        return None
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _watch_loop(self):
+        while not self._stop_event.wait(self.poll_interval):
+            self.refresh()
+
+    def start(self):
+        self.refresh()
+        if self.enumerator is None or self.poll_interval <= 0:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._watch_loop, name="CameraDeviceWatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.poll_interval + 1.0)
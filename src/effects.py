@@ -0,0 +1,462 @@
+import cv2
+import numpy as np
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class PrivacyBlur:
+    """
+    Heavy blur for the privacy output mode.
+    Instead of a large-kernel GaussianBlur at full resolution, the frame is
+    downscaled to a small internal size, blurred there with a small kernel and
+    upscaled into a reused output buffer. The cost is dominated by the two
+    resizes, so it stays fixed regardless of how strong the blur looks.
+    """
+
+    def __init__(self, width, height, internal_width=96, kernel_size=7):
+        self.width = width
+        self.height = height
+        self.internal_width = max(8, min(int(internal_width), width))
+        self.internal_height = max(
+            8, round(self.internal_width * height / max(1, width))
+        )
+        # GaussianBlur needs an odd kernel size
+        self.kernel_size = max(1, int(kernel_size)) | 1
+
+        self._small = np.zeros(
+            (self.internal_height, self.internal_width, 3), dtype=np.uint8
+        )
+        self._small_blurred = np.zeros_like(self._small)
+        self._output = np.zeros((height, width, 3), dtype=np.uint8)
+        logger.debug(
+            f"Privacy blur prepared: {width}x{height} via "
+            f"{self.internal_width}x{self.internal_height}, kernel {self.kernel_size}."
+        )
+
+    def apply(self, frame):
+        """
+        Blurs and mirrors a raw camera frame of any size.
+        Returns:
+            numpy.ndarray: The reused output buffer at the target resolution.
+        """
+        cv2.resize(
+            frame,
+            (self.internal_width, self.internal_height),
+            dst=self._small,
+            interpolation=cv2.INTER_AREA,
+        )
+        cv2.GaussianBlur(
+            self._small,
+            (self.kernel_size, self.kernel_size),
+            0,
+            dst=self._small_blurred,
+        )
+        # Mirror at the small size, to match the live feed orientation for free
+        cv2.flip(self._small_blurred, 1, dst=self._small)
+        cv2.resize(
+            self._small,
+            (self.width, self.height),
+            dst=self._output,
+            interpolation=cv2.INTER_LINEAR,
+        )
+        return self._output
+
+
+def build_slate_frame(image_path, width, height, background=(0, 0, 0)):
+    """
+    Decodes a slate image once and letterboxes it to the output resolution.
+    Args:
+        image_path (str): Path to the image file.
+        width (int): Output width.
+        height (int): Output height.
+        background (tuple): BGR color of the letterbox bars.
+    Returns:
+        numpy.ndarray or None: The slate frame, or None if the image could not be loaded.
+    """
+    try:
+        # np.fromfile + imdecode handles non-ASCII paths that cv2.imread cannot on Windows
+        data = np.fromfile(image_path, dtype=np.uint8)
+        image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    except Exception as e:
+        logger.error(f"Failed to read slate image '{image_path}': {e}")
+        return None
+    if image is None:
+        logger.error(f"Failed to decode slate image '{image_path}'.")
+        return None
+
+    slate = np.empty((height, width, 3), dtype=np.uint8)
+    slate[:] = background
+    image_height, image_width = image.shape[:2]
+    scale = min(width / image_width, height / image_height)
+    fitted_width = max(1, round(image_width * scale))
+    fitted_height = max(1, round(image_height * scale))
+    x = (width - fitted_width) // 2
+    y = (height - fitted_height) // 2
+    cv2.resize(
+        image,
+        (fitted_width, fitted_height),
+        dst=slate[y : y + fitted_height, x : x + fitted_width],
+        interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR,
+    )
+    logger.info(
+        f"Slate image '{image_path}' ({image_width}x{image_height}) letterboxed "
+        f"to {width}x{height}."
+    )
+    return slate
+
+
+class FadeTransition:
+    """
+    Cross-fades from a snapshot of the last sent frame to the new output over a
+    fixed number of frames. Both buffers are allocated on the first fade (never
+    with frames=0) and reused, so a transition adds no per-frame allocation,
+    only a single addWeighted pass. Callers must
+    not fade from a live frame to a disabled state: the blend would keep
+    showing the live picture.
+    """
+
+    def __init__(self, width, height, frames):
+        self.frames = max(0, int(frames))
+        self.remaining = 0
+        self._shape = (height, width, 3)
+        self._from_frame = None
+        self._output = None
+
+    @property
+    def active(self):
+        return self.remaining > 0
+
+    def begin(self, from_frame):
+        """Snapshots from_frame as the fade start. Returns False if fading is disabled."""
+        if self.frames == 0 or from_frame is None:
+            return False
+        if from_frame.shape != self._shape:
+            return False
+        if self._from_frame is None:
+            self._from_frame = np.zeros(self._shape, dtype=np.uint8)
+            self._output = np.zeros(self._shape, dtype=np.uint8)
+        np.copyto(self._from_frame, from_frame)
+        self.remaining = self.frames
+        return True
+
+    def cancel(self):
+        self.remaining = 0
+
+    def blend(self, to_frame):
+        """
+        Returns the next fade step between the snapshot and to_frame.
+        Returns:
+            numpy.ndarray: The reused output buffer.
+        """
+        from_weight = self.remaining / (self.frames + 1)
+        cv2.addWeighted(
+            self._from_frame,
+            from_weight,
+            to_frame,
+            1.0 - from_weight,
+            0.0,
+            dst=self._output,
+        )
+        self.remaining -= 1
+        return self._output
+
+
+class LiveFraming:
+    """
+    Maps raw camera frames to the output resolution.
+    Modes:
+        stretch: scale the whole frame to the output size (may distort).
+        crop: fill the output, cropping the source to the output aspect ratio.
+        fit: letterbox the source inside the output with black bars.
+    zoom > 1 narrows the source region around center (normalized x, y) for
+    digital zoom and framing. The source region and destination rectangle are
+    computed once per source resolution; per frame the region is taken as a
+    NumPy view (no copy), resized once into a reused buffer and mirrored into
+    the reused output buffer.
+    """
+
+    MODES = ("stretch", "crop", "fit")
+
+    def __init__(self, width, height, mode="stretch", zoom=1.0, center=(0.5, 0.5)):
+        if mode not in self.MODES:
+            logger.warning(f"Unknown camera framing '{mode}'. Using 'stretch'.")
+            mode = "stretch"
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.zoom = max(1.0, float(zoom))
+        self.center = (float(center[0]), float(center[1]))
+        self._source_shape = None
+        self._source_rows = None
+        self._source_cols = None
+        self._scaled = np.zeros((height, width, 3), dtype=np.uint8)
+        self._scaled_view = self._scaled
+        self._output = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def _configure(self, source_height, source_width):
+        region_width = source_width / self.zoom
+        region_height = source_height / self.zoom
+        target_aspect = self.width / self.height
+        if self.mode == "crop":
+            if region_width / region_height > target_aspect:
+                region_width = region_height * target_aspect
+            else:
+                region_height = region_width / target_aspect
+        region_width = max(1, min(source_width, round(region_width)))
+        region_height = max(1, min(source_height, round(region_height)))
+
+        # Center the region on the requested point, clamped inside the frame
+        x = round(self.center[0] * source_width - region_width / 2)
+        y = round(self.center[1] * source_height - region_height / 2)
+        x = min(max(0, x), source_width - region_width)
+        y = min(max(0, y), source_height - region_height)
+        self._source_rows = slice(y, y + region_height)
+        self._source_cols = slice(x, x + region_width)
+
+        self._scaled.fill(0)
+        if self.mode == "fit":
+            scale = min(self.width / region_width, self.height / region_height)
+            fitted_width = max(1, min(self.width, round(region_width * scale)))
+            fitted_height = max(1, min(self.height, round(region_height * scale)))
+            dst_x = (self.width - fitted_width) // 2
+            dst_y = (self.height - fitted_height) // 2
+            self._scaled_view = self._scaled[
+                dst_y : dst_y + fitted_height, dst_x : dst_x + fitted_width
+            ]
+        else:
+            self._scaled_view = self._scaled
+        self._source_shape = (source_height, source_width)
+        logger.info(
+            f"Camera framing '{self.mode}' (zoom {self.zoom:.2f}): source region "
+            f"{region_width}x{region_height}+{x}+{y} of {source_width}x{source_height} -> "
+            f"{self._scaled_view.shape[1]}x{self._scaled_view.shape[0]} in {self.width}x{self.height}."
+        )
+
+    def apply(self, frame):
+        """
+        Frames and mirrors a raw camera frame.
+        Returns:
+            numpy.ndarray: The reused output buffer at the target resolution.
+        """
+        if frame.shape[:2] != self._source_shape:
+            self._configure(frame.shape[0], frame.shape[1])
+        region = frame[self._source_rows, self._source_cols]
+        view_height, view_width = self._scaled_view.shape[:2]
+        cv2.resize(
+            region,
+            (view_width, view_height),
+            dst=self._scaled_view,
+            interpolation=cv2.INTER_LINEAR,
+        )
+        cv2.flip(self._scaled, 1, dst=self._output)  # Horizontal flip
+        return self._output
+
+
+class LowLightEnhancer:
+    """
+    Automatic brightness and gamma correction for dim rooms.
+    Every interval frames, a luminance histogram of a subsample (every
+    sample_step-th pixel of every sample_step-th row) gives a white point and
+    the median brightness. A 256-entry lookup table is built from them that
+    stretches the levels (gain up to max_gain) and applies a gamma that lifts
+    the median towards target (0-1). Each frame then costs one cv2.LUT pass in
+    place. Updates are eased in so the picture does not pump, and frames that
+    are bright enough are left untouched.
+    """
+
+    def __init__(self, target=0.4, max_gain=3.0, interval=15, sample_step=8):
+        self.target = min(max(0.05, float(target)), 0.95)
+        self.max_gain = max(1.0, float(max_gain))
+        self.interval = max(1, int(interval))
+        self.sample_step = max(1, int(sample_step))
+        self.gain = 1.0
+        self.gamma = 1.0
+        self.updates = 0
+        self._frames_until_update = 0
+        self._identity = True
+        self._levels = np.arange(256, dtype=np.float32) / 255.0
+        self._lut = np.arange(256, dtype=np.uint8)
+
+    @property
+    def active(self):
+        """True while the lookup table changes the picture."""
+        return not self._identity
+
+    def _update(self, frame):
+        sample = frame[:: self.sample_step, :: self.sample_step].astype(np.uint16)
+        # BT.601 luma in fixed point: (29 B + 150 G + 77 R) / 256
+        luma = (
+            sample[..., 0] * 29 + sample[..., 1] * 150 + sample[..., 2] * 77
+        ) >> 8
+        cdf = np.cumsum(np.bincount(luma.ravel(), minlength=256))
+        total = cdf[-1]
+        # Percentiles rather than the extremes, so a lamp or a dead pixel does not decide
+        white = max(1, int(np.searchsorted(cdf, total * 0.99)))
+        median = int(np.searchsorted(cdf, total * 0.5))
+
+        gain = gamma = 1.0
+        if median < self.target * 255.0:  # Well-lit frames are left alone
+            gain = min(self.max_gain, 255.0 / white)
+            stretched = min(1.0, max(1.0 / 255.0, median * gain / 255.0))
+            if stretched < self.target:
+                # The gamma maps the stretched median onto the target
+                gamma = max(0.4, np.log(self.target) / np.log(stretched))
+
+        # Ease halfway towards the new values on each update
+        self.gain += (gain - self.gain) * 0.5
+        self.gamma += (gamma - self.gamma) * 0.5
+        self.updates += 1
+        if self.gain < 1.02 and self.gamma > 0.98:
+            self._identity = True
+            return
+        self._identity = False
+        curve = np.minimum(self._levels * self.gain, 1.0) ** self.gamma
+        np.copyto(self._lut, (curve * 255.0 + 0.5).astype(np.uint8))
+
+    def apply(self, frame):
+        """
+        Corrects the exposure of a frame in place. The frame must be a writable
+        buffer the caller owns.
+        Returns:
+            numpy.ndarray: frame.
+        """
+        if self._frames_until_update <= 0:
+            self._update(frame)
+            self._frames_until_update = self.interval
+        self._frames_until_update -= 1
+        if not self._identity:
+            cv2.LUT(frame, self._lut, dst=frame)
+        return frame
+
+
+class MuteBadge:
+    """
+    Mic-muted badge composited into outgoing frames.
+    The badge and its alpha mask are rendered once at the output resolution.
+    Per frame only the badge rectangle is blended, in place, with integer math
+    into a reused scratch buffer, so the cost depends on the badge size and not
+    the frame size.
+    Positions: "top-left", "top-right", "bottom-left" or "bottom-right".
+    """
+
+    POSITIONS = ("top-left", "top-right", "bottom-left", "bottom-right")
+    # Rendered larger and downscaled, for smooth edges
+    SUPERSAMPLE = 4
+
+    def __init__(
+        self, width, height, position="top-right", size=0.1, image_path=None
+    ):
+        if position not in self.POSITIONS:
+            logger.warning(f"Unknown mute badge position '{position}'. Using 'top-right'.")
+            position = "top-right"
+        diameter = max(8, min(width, height, round(height * float(size))))
+        margin = max(2, diameter // 4)
+        x = margin if position.endswith("left") else width - margin - diameter
+        y = margin if position.startswith("top") else height - margin - diameter
+        self._rows = slice(y, y + diameter)
+        self._cols = slice(x, x + diameter)
+
+        color, alpha = self._render(diameter, image_path)
+        alpha = alpha.astype(np.uint16)[..., None]
+        # out = (frame * (255 - a) + color * a) / 255, with color * a precomputed
+        self._inverse_alpha = np.broadcast_to(255 - alpha, color.shape).copy()
+        self._premultiplied = color.astype(np.uint16) * alpha
+        self._scratch = np.empty(color.shape, dtype=np.uint16)
+        self._static_frame = None
+        self._static_badged = None
+        logger.info(f"Mute badge prepared: {diameter}px {position} of {width}x{height}.")
+
+    def _render(self, diameter, image_path):
+        if image_path:
+            try:
+                data = np.fromfile(image_path, dtype=np.uint8)
+                image = cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+                if image is None or image.ndim != 3 or image.shape[2] != 4:
+                    raise ValueError("not a BGRA image")
+                image = cv2.resize(
+                    image, (diameter, diameter), interpolation=cv2.INTER_AREA
+                )
+                return np.ascontiguousarray(image[..., :3]), image[..., 3]
+            except Exception as e:
+                logger.warning(
+                    f"Failed to load mute badge image '{image_path}': {e}. "
+                    "Using the built-in badge."
+                )
+
+        size = diameter * self.SUPERSAMPLE
+        unit = size / 24
+        color = np.zeros((size, size, 3), dtype=np.uint8)
+        alpha = np.zeros((size, size), dtype=np.uint8)
+        center = (size // 2, size // 2)
+        cv2.circle(alpha, center, size // 2 - 1, 235, -1, cv2.LINE_AA)
+        color[:] = (40, 40, 210)  # Red disc
+        white = (255, 255, 255)
+        # Microphone capsule, cradle and stand
+        cv2.rectangle(
+            color,
+            (round(9.5 * unit), round(5 * unit)),
+            (round(14.5 * unit), round(13.5 * unit)),
+            white,
+            -1,
+        )
+        for cy in (5, 13.5):
+            cv2.circle(
+                color, (center[0], round(cy * unit)), round(2.5 * unit), white, -1
+            )
+        thickness = max(1, round(1.5 * unit))
+        cv2.ellipse(
+            color,
+            (center[0], round(12 * unit)),
+            (round(5 * unit), round(5 * unit)),
+            0,
+            0,
+            180,
+            white,
+            thickness,
+        )
+        cv2.line(
+            color,
+            (center[0], round(17 * unit)),
+            (center[0], round(19.5 * unit)),
+            white,
+            thickness,
+        )
+        # Slash, with a red outline so it cuts through the microphone
+        start = (round(6 * unit), round(5 * unit))
+        end = (round(18 * unit), round(19 * unit))
+        cv2.line(color, start, end, (40, 40, 210), thickness * 3)
+        cv2.line(color, start, end, white, thickness)
+
+        color = cv2.resize(color, (diameter, diameter), interpolation=cv2.INTER_AREA)
+        alpha = cv2.resize(alpha, (diameter, diameter), interpolation=cv2.INTER_AREA)
+        return color, alpha
+
+    def apply(self, frame):
+        """
+        Blends the badge into frame in place.
+        Returns:
+            numpy.ndarray: frame.
+        """
+        region = frame[self._rows, self._cols]
+        scratch = self._scratch
+        np.multiply(region, self._inverse_alpha, out=scratch)
+        scratch += self._premultiplied
+        # Rounded x / 255 for x <= 255 * 255, without a division
+        scratch += 128
+        scratch += scratch >> 8
+        scratch >>= 8
+        np.copyto(region, scratch, casting="unsafe")
+        return frame
+
+    def apply_static(self, frame):
+        """
+        Returns a badged copy of a frame that is sent repeatedly and must not be
+        modified (the black and slate frames). Only the latest frame's copy is
+        kept, so rebuilt frame buffers are not held on to.
+        """
+        if self._static_frame is not frame:
+            self._static_badged = self.apply(frame.copy())
+            self._static_frame = frame
+        return self._static_badged
@@ -0,0 +1,98 @@
+import logging
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+FROZEN = "frozen"
+BLANK = "blank"
+
+
+class FrameHealthMonitor:
+    """
+    Detects capture devices that keep returning ret=True with a stuck or blank
+    picture, which the ret=False failure count never notices.
+
+    Each frame is checked on a strided subsample (one byte of roughly every
+    stride-th pixel in both directions, about 3.6k bytes for 1280x720 at stride
+    16) copied into a reused buffer. A frame is frozen if the subsample is
+    bit-identical to the previous one; real sensors always add some noise. It is
+    blank if the subsample is nearly uniform (all black, or a solid color from a
+    corrupt buffer).
+
+    After a fault is reported the window for the next report doubles (up to
+    16x) until a healthy frame arrives, so a camera that is genuinely showing a
+    flat image (lens cap, privacy shutter) is not reopened in a tight loop.
+    """
+
+    MAX_BACKOFF = 16
+
+    def __init__(
+        self, stride=16, frozen_frames=60, blank_frames=90, blank_range=4
+    ):
+        self.stride = max(1, int(stride))
+        self.frozen_frames = int(frozen_frames)
+        self.blank_frames = int(blank_frames)
+        self.blank_range = int(blank_range)
+        self.faults_reported = 0
+        self._backoff = 1
+        self._sample = None
+        self._previous = None
+        self._frozen_count = 0
+        self._blank_count = 0
+
+    def reset(self):
+        """Forgets the previous frame, e.g. after the device was reopened."""
+        self._previous = None
+        self._frozen_count = 0
+        self._blank_count = 0
+
+    def check(self, frame):
+        """
+        Updates the monitor with a newly read frame.
+        Returns:
+            str or None: FROZEN or BLANK once the condition has lasted for its
+            window, otherwise None.
+        """
+        # Sample raw bytes: a 2D strided copy is ~10x faster than striding over
+        # (row, pixel, channel). The +1 rotates through the color channels.
+        rows = frame.reshape(frame.shape[0], -1)
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        sample = rows[:: self.stride, :: self.stride * channels + 1]
+        if self._sample is None or self._sample.shape != sample.shape:
+            self._sample = np.empty(sample.shape, dtype=sample.dtype)
+            self._previous = None
+        np.copyto(self._sample, sample)
+
+        if self._previous is not None and np.array_equal(
+            self._sample, self._previous
+        ):
+            self._frozen_count += 1
+        else:
+            self._frozen_count = 0
+        if int(self._sample.max()) - int(self._sample.min()) <= self.blank_range:
+            self._blank_count += 1
+        else:
+            self._blank_count = 0
+
+        if self._previous is None:
+            self._previous = np.empty_like(self._sample)
+        # Swap buffers instead of copying the sample again
+        self._previous, self._sample = self._sample, self._previous
+
+        if not (self._frozen_count or self._blank_count):
+            self._backoff = 1
+            return None
+
+        fault = None
+        if 0 < self.frozen_frames * self._backoff <= self._frozen_count:
+            fault = FROZEN
+        elif 0 < self.blank_frames * self._backoff <= self._blank_count:
+            fault = BLANK
+        if fault:
+            self.faults_reported += 1
+            self._backoff = min(self._backoff * 2, self.MAX_BACKOFF)
+            self._frozen_count = 0
+            self._blank_count = 0
+        return fault
@@ -0,0 +1,153 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from array import array
+
+
+logger = logging.getLogger(__name__)
+
+# Per-frame timestamps, in the order the camera loop records them
+STAGES = (
+    "frame_start",
+    "capture_start",
+    "capture_end",
+    "transform_end",
+    "send_end",
+    "sleep_end",
+)
+(
+    FRAME_START,
+    CAPTURE_START,
+    CAPTURE_END,
+    TRANSFORM_END,
+    SEND_END,
+    SLEEP_END,
+) = range(len(STAGES))
+
+# Spans exported to the trace viewer: (name, start stage, fallback start stage, end stage)
+_SPANS = (
+    ("capture", CAPTURE_START, None, CAPTURE_END),
+    ("transform", CAPTURE_END, FRAME_START, TRANSFORM_END),
+    ("send", TRANSFORM_END, None, SEND_END),
+    ("sleep", SEND_END, None, SLEEP_END),
+)
+
+
+class FrameTraceRecorder:
+    """
+    Always-on per-frame stage timestamps in a fixed-size ring buffer.
+    Timestamps are perf_counter() floats written into a flat array.array, so
+    recording a stage is a single float store with no allocation. Only the
+    camera thread writes; dumps copy the buffer first, so the newest frame in a
+    dump may be partially recorded.
+    """
+
+    def __init__(self, name, capacity=2048):
+        self.name = name
+        self.capacity = max(1, int(capacity))
+        self._stage_count = len(STAGES)
+        self._timestamps = array("d", [math.nan]) * (self.capacity * self._stage_count)
+        self._empty_row = array("d", [math.nan]) * self._stage_count
+        self._frame_count = 0
+        self._base = 0
+        # Maps perf_counter() readings to wall-clock time in exported traces
+        self._epoch_offset = time.time() - time.perf_counter()
+
+    def begin_frame(self):
+        """Starts a new frame row, overwriting the oldest one when the buffer is full."""
+        self._base = (self._frame_count % self.capacity) * self._stage_count
+        self._frame_count += 1
+        self._timestamps[self._base : self._base + self._stage_count] = self._empty_row
+        self._timestamps[self._base] = time.perf_counter()
+
+    def mark(self, stage):
+        self._timestamps[self._base + stage] = time.perf_counter()
+
+    def snapshot(self):
+        """
+        Returns the recorded frames, oldest first.
+        Returns:
+            list[tuple]: One tuple of stage timestamps per frame (NaN for skipped stages).
+        """
+        timestamps = array("d", self._timestamps)
+        frame_count = self._frame_count
+        stored = min(frame_count, self.capacity)
+        first = frame_count - stored
+        rows = []
+        for frame_number in range(first, frame_count):
+            base = (frame_number % self.capacity) * self._stage_count
+            rows.append(tuple(timestamps[base : base + self._stage_count]))
+        return rows
+
+    def chrome_trace_events(self, pid, tid):
+        """Converts the buffered frames to Chrome trace 'complete' events."""
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": f"CameraFeedThread-{self.name}"},
+            }
+        ]
+        for row in self.snapshot():
+            frame_start = row[FRAME_START]
+            frame_end = row[SLEEP_END] if not math.isnan(row[SLEEP_END]) else row[SEND_END]
+            if math.isnan(frame_start):
+                continue
+            if not math.isnan(frame_end):
+                events.append(self._span("frame", frame_start, frame_end, pid, tid))
+            for span_name, start_stage, fallback_stage, end_stage in _SPANS:
+                start = row[start_stage]
+                if math.isnan(start) and fallback_stage is not None:
+                    start = row[fallback_stage]
+                end = row[end_stage]
+                if math.isnan(start) or math.isnan(end):
+                    continue
+                events.append(self._span(span_name, start, end, pid, tid))
+        return events
+
+    def _span(self, name, start, end, pid, tid):
+        return {
+            "name": name,
+            "cat": "camera",
+            "ph": "X",
+            "ts": (start + self._epoch_offset) * 1e6,
+            "dur": max(0.0, end - start) * 1e6,
+            "pid": pid,
+            "tid": tid,
+        }
+
+
+_dump_lock = threading.Lock()
+
+
+def write_chrome_trace(recorders, path):
+    """
+    Writes the frames buffered by several recorders to a Chrome trace / Perfetto JSON file.
+    Args:
+        recorders (list[FrameTraceRecorder]): Recorders to export, one track each.
+        path (str): Output file path.
+    Returns:
+        bool: True if the file was written, False otherwise.
+    """
+    pid = os.getpid()
+    events = []
+    for tid, recorder in enumerate(recorders, start=1):
+        events.extend(recorder.chrome_trace_events(pid, tid))
+    try:
+        with _dump_lock, open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    except Exception as e:
+        logger.error(f"Failed to write frame trace to '{path}': {e}", exc_info=True)
+        return False
+    logger.info(f"Frame trace with {len(events)} events written to '{path}'.")
+    return True
+
+
+def trace_file_path(directory, reason="manual"):
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(directory, f"vcm_trace_{timestamp}_{reason}.json")
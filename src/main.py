@@ -1,9 +1,13 @@
+import argparse
 import logging
 from logging.handlers import RotatingFileHandler
 
+import multiprocessing
 import os
+import signal
 import sys
 import threading
+import time
 
 if hasattr(sys, "_MEIPASS"):
     # Running in a PyInstaller bundle, place logs next to the executable
@@ -20,76 +24,20 @@ backup_log_count = (
     3  # Number of backup files to keep (e.g., vcm_app.log, vcm_app.log.1, ... .3)
 )
 
-# Get the root logger instance
-# All loggers created with logging.getLogger(__name__) will inherit this configuration
-root_logger = logging.getLogger()
-root_logger.setLevel(
-    logging.INFO
-)  # Set the desired logging level (e.g., INFO or DEBUG)
-
-# Clear any existing handlers from the root logger to avoid duplicate logs
-# or conflicts if basicConfig was called by a library (though unlikely for root).
-if root_logger.hasHandlers():
-    root_logger.handlers.clear()
-
-# Create a rotating file handler
-# This handler writes to `log_file_path`. When the file reaches `maxBytes`,
-# it's renamed (e.g., to vcm_app.log.1), and a new `vcm_app.log` is started.
-# `backupCount` determines how many old log files are kept.
-try:
-    rotating_file_handler = RotatingFileHandler(
-        filename=log_file_path,
-        maxBytes=max_log_size_bytes,
-        backupCount=backup_log_count,
-        encoding="utf-8",  # Explicitly set encoding for cross-platform compatibility
-    )
-except PermissionError:
-    # Fallback in case of permission issues (e.g., running from a restricted directory)
-    # Try logging to a user's temp directory as a last resort for this session.
-    # This is a basic fallback; more robust error handling might be needed for production.
-    import tempfile
-
-    fallback_log_dir = tempfile.gettempdir()
-    log_file_path = os.path.join(fallback_log_dir, "vcm_app_fallback.log")
-    rotating_file_handler = RotatingFileHandler(
-        filename=log_file_path,
-        maxBytes=max_log_size_bytes,
-        backupCount=backup_log_count,
-        encoding="utf-8",
-    )
-    logging.warning(
-        f"Original log path had permission issues. Logging to fallback: {log_file_path}"
-    )
-
-
-# Define the log message format
-log_formatter = logging.Formatter(
-    "%(asctime)s - %(threadName)s - [%(name)s:%(lineno)d] - %(levelname)s - %(message)s"
-)
-rotating_file_handler.setFormatter(log_formatter)
-
-# Add the configured rotating file handler to the root logger
-root_logger.addHandler(rotating_file_handler)
-
-# Optional: If you ALSO want console output during development (in addition to the file)
-# uncomment the following lines:
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.DEBUG)  # Set level for console output if different
-console_handler.setFormatter(log_formatter)  # Use the same or a different formatter
-root_logger.addHandler(console_handler)
-
-from pynput import keyboard
-from PIL import Image, ImageDraw  # Still needed for pystray
-import pystray
-from pystray import MenuItem as item
-
+# GUI libraries (tkinter for the OSD, pystray, pynput) are imported where they are
+# used, so headless runs and benchmarks never load them.
 from config import ConfigReader
 from microphone import (
+    PushToTalkController,
     set_mic_mute as system_set_mic_mute,
     get_mic_status as get_system_mic_status,
 )
-from camera import CameraManager
-from osd import OSDDisplay  # Import the new OSD class
+from camera import CameraPipelineGroup
+from camera_process import CameraProcessSupervisor
+from control_server import ControlServer, load_or_create_token
+from profiler import SamplingProfiler
+from state import is_camera_live
+from telemetry import StatsWindow, TelemetryRecorder, default_db_path
 
 from utils.resources import resource_path
 
@@ -97,12 +45,83 @@ from utils.resources import resource_path
 logger = logging.getLogger(__name__)  # Get a logger for main.py scope
 
 
+def configure_logging():
+    """Sends all log records to the rotating log file and the console."""
+    global log_file_path
+
+    # Get the root logger instance
+    # All loggers created with logging.getLogger(__name__) will inherit this configuration
+    root_logger = logging.getLogger()
+    root_logger.setLevel(
+        logging.INFO
+    )  # Set the desired logging level (e.g., INFO or DEBUG)
+
+    # Clear any existing handlers from the root logger to avoid duplicate logs
+    # or conflicts if basicConfig was called by a library (though unlikely for root).
+    if root_logger.hasHandlers():
+        root_logger.handlers.clear()
+
+    # Create a rotating file handler
+    # This handler writes to `log_file_path`. When the file reaches `maxBytes`,
+    # it's renamed (e.g., to vcm_app.log.1), and a new `vcm_app.log` is started.
+    # `backupCount` determines how many old log files are kept.
+    try:
+        rotating_file_handler = RotatingFileHandler(
+            filename=log_file_path,
+            maxBytes=max_log_size_bytes,
+            backupCount=backup_log_count,
+            encoding="utf-8",  # Explicitly set encoding for cross-platform compatibility
+        )
+    except PermissionError:
+        # Fallback in case of permission issues (e.g., running from a restricted directory)
+        # Try logging to a user's temp directory as a last resort for this session.
+        # This is a basic fallback; more robust error handling might be needed for production.
+        import tempfile
+
+        fallback_log_dir = tempfile.gettempdir()
+        log_file_path = os.path.join(fallback_log_dir, "vcm_app_fallback.log")
+        rotating_file_handler = RotatingFileHandler(
+            filename=log_file_path,
+            maxBytes=max_log_size_bytes,
+            backupCount=backup_log_count,
+            encoding="utf-8",
+        )
+        logging.warning(
+            f"Original log path had permission issues. Logging to fallback: {log_file_path}"
+        )
+
+    # Define the log message format
+    log_formatter = logging.Formatter(
+        "%(asctime)s - %(threadName)s - [%(name)s:%(lineno)d] - %(levelname)s - %(message)s"
+    )
+    rotating_file_handler.setFormatter(log_formatter)
+
+    # Add the configured rotating file handler to the root logger
+    root_logger.addHandler(rotating_file_handler)
+
+    # Optional: If you ALSO want console output during development (in addition to the file)
+    # uncomment the following lines:
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.DEBUG)  # Set level for console output if different
+    console_handler.setFormatter(log_formatter)  # Use the same or a different formatter
+    root_logger.addHandler(console_handler)
+
+
 # --- Global Variables ---
 config = None
 hotkey_listener = None
+ptt_listener = None
+ptt_controller = None
+mic_group = None
+control_server = None
 tray_icon_instance = None
 osd_manager = None
 camera_manager = None
+telemetry = None
+profiler = None
+mic_stats = StatsWindow()
+# Serializes mic toggles: the OS call cannot run under the state store lock
+mic_toggle_lock = threading.RLock()
 exit_event = threading.Event()  # For gracefully exiting the main thread
 
 
@@ -120,6 +139,42 @@ def load_configuration():
     )
 
 
+def set_os_mic_mute(mute):
+    """Mutes the default microphone, or every microphone with mic_mute_mode: all."""
+    if mic_group:
+        return mic_group.set_mute(mute)
+    return system_set_mic_mute(mute)
+
+
+def get_os_mic_status():
+    if mic_group:
+        return mic_group.get_status()
+    return get_system_mic_status()
+
+
+def setup_microphones():
+    global mic_group
+    if config.get("mic_mute_mode", "default") != "all":
+        return
+    try:
+        from mic_endpoints import MicrophoneGroup, PycawEndpointBackend
+
+        backend = PycawEndpointBackend()
+    except Exception as e:
+        logger.error(
+            f"Muting all microphones is unavailable: {e}. Using the default microphone.",
+            exc_info=True,
+        )
+        return
+    mic_group = MicrophoneGroup(backend, timeout=config.get("mic_mute_timeout", 1.0))
+    mic_group.start()
+    config.mic_active = mic_group.get_status()
+    logger.info(
+        f"Muting all {len(mic_group.endpoints)} microphones together. "
+        f"Initial state: {'Active' if config.mic_active else 'Muted'}."
+    )
+
+
 # --- Hotkey Processing Functions ---
 def on_camera_hotkey_press():
     """Placeholder for camera hotkey - Toggles config.camera_active."""
@@ -129,12 +184,74 @@ def on_camera_hotkey_press():
             osd_manager.update()  # Still update OSD to show error potentially
         return
 
-    config.camera_active = not config.camera_active
-    status_message = "Camera ON" if config.camera_active else "Camera OFF"
+    # The OSD and camera pipelines pick up changes through config.state
+    _, state = config.state.modify(
+        lambda state: camera_toggle_changes(state, not state["camera_active"])
+    )
+    status_message = "Camera ON" if state["camera_active"] else "Camera OFF"
     logger.info(f"Camera hotkey pressed. New placeholder state: {status_message}")
 
-    if osd_manager:
-        osd_manager.update()  # Trigger OSD update
+
+def camera_toggle_changes(state, active, disabled_mode=None):
+    """
+    State changes that turn the camera feed on or off, for StateStore.modify.
+    Turning off keeps the current camera_disabled_mode (which may have been set
+    at runtime, e.g. with the control API) unless disabled_mode is given.
+    """
+    if state["camera_active"] == active:
+        return None
+    if active:
+        return {"camera_active": True}
+    if disabled_mode is None:
+        return {"camera_active": False}
+    return {"camera_active": False, "camera_disabled_mode": disabled_mode}
+
+
+def on_camera_blur_hotkey_press():
+    """
+    Toggles the camera between live video and the blurred privacy feed.
+    From black or slate it only switches to blur: the key goes live only from
+    blur, so it never turns an off camera straight into an unblurred feed.
+    """
+    if config is None:
+        logger.error("Config not loaded, cannot toggle camera blur.")
+        return
+
+    def toggle_blur(state):
+        if state["camera_active"]:
+            return camera_toggle_changes(state, False, disabled_mode="blur")
+        if state["camera_disabled_mode"] != "blur":
+            return {"camera_disabled_mode": "blur"}
+        return {"camera_active": True}
+
+    _, state = config.state.modify(toggle_blur)
+    logger.info(
+        f"Camera blur hotkey pressed. New state: {'Camera ON' if state['camera_active'] else 'Camera BLURRED'}"
+    )
+
+
+def make_camera_entry_hotkey_handler(camera_name):
+    """Builds a hotkey handler that toggles a single camera pipeline."""
+
+    def on_camera_entry_hotkey_press():
+        if config is None:
+            logger.error("Config not loaded, cannot toggle camera.")
+            return
+
+        _, state = config.state.modify(
+            lambda state: {
+                "camera_states": {
+                    **state["camera_states"],
+                    camera_name: not state["camera_states"].get(camera_name, True),
+                }
+            }
+        )
+        new_state = state["camera_states"][camera_name]
+        logger.info(
+            f"Camera '{camera_name}' hotkey pressed. New state: {'ON' if new_state else 'OFF'}"
+        )
+
+    return on_camera_entry_hotkey_press
 
 
 def on_mic_hotkey_press():  # (Updated version from previous step, ensure it's this one)
@@ -144,31 +261,64 @@ def on_mic_hotkey_press():  # (Updated version from previous step, ensure it's t
             osd_manager.update()
         return
 
-    logger.info(
-        f"Mic hotkey ({config.mic_hotkey}) pressed. "
-        f"Current config.mic_active: {'Active' if config.mic_active else 'Inactive'}"
-    )
-    should_os_mic_be_muted = config.mic_active
-    success = system_set_mic_mute(should_os_mic_be_muted)
-
-    if success:
-        config.mic_active = not config.mic_active
-        new_status_message = "Microphone ON" if config.mic_active else "Microphone OFF"
+    # Held across the OS call, so a second toggle acts on this one's result
+    with mic_toggle_lock:
+        mic_active = config.mic_active
         logger.info(
-            f"OS mic state changed. New config.mic_active: {new_status_message}"
+            f"Mic hotkey ({config.mic_hotkey}) pressed. "
+            f"Current config.mic_active: {'Active' if mic_active else 'Inactive'}"
         )
-    else:
-        logger.error("Failed to change OS mic state.")
-        # Re-sync config with actual system state on failure
-        actual_system_status_active = get_system_mic_status()
-        if config.mic_active != actual_system_status_active:
-            logger.warning(
-                f"Config mic state out of sync. Correcting. System: {'Active' if actual_system_status_active else 'Inactive'}"
+        started_at = time.perf_counter()
+        success = set_os_mic_mute(mic_active)
+        mic_stats.count("toggles")
+        mic_stats.observe("toggle", time.perf_counter() - started_at)
+
+        if success:
+            config.mic_active = not mic_active
+            new_status_message = "Microphone OFF" if mic_active else "Microphone ON"
+            logger.info(
+                f"OS mic state changed. New config.mic_active: {new_status_message}"
             )
-            config.mic_active = actual_system_status_active
+        else:
+            logger.error("Failed to change OS mic state.")
+            # Re-sync config with actual system state on failure
+            actual_system_status_active = get_os_mic_status()
+            if mic_active != actual_system_status_active:
+                logger.warning(
+                    f"Config mic state out of sync. Correcting. System: {'Active' if actual_system_status_active else 'Inactive'}"
+                )
+                config.mic_active = actual_system_status_active
 
-    if osd_manager:
-        osd_manager.update()  # Trigger OSD update
+
+def set_camera_active(active):
+    """Control API setter: turns the camera feed on or off like the hotkey would."""
+    config.state.modify(lambda state: camera_toggle_changes(state, active))
+
+
+def set_mic_active(active):
+    """Control API setter: mutes or unmutes the microphone like the hotkey would."""
+    with mic_toggle_lock:
+        if config.mic_active != active:
+            on_mic_hotkey_press()
+
+
+def setup_control_server():
+    global control_server
+    if not config.get("control_server_enabled", False):
+        return
+    token = load_or_create_token(config.config_dir)
+    if token is None:
+        logger.error("Control server disabled: no control token is available.")
+        return
+    control_server = ControlServer(
+        config,
+        setters={"camera": set_camera_active, "mic": set_mic_active},
+        token=token,
+        toggles={"camera": on_camera_hotkey_press, "mic": on_mic_hotkey_press},
+        port=config.get("control_server_port", 48777),
+        unix_path=config.get("control_server_unix_socket"),
+    )
+    control_server.start()
 
 
 def format_hotkey_for_pynput(hotkey_str):  # (same as before)
@@ -192,6 +342,8 @@ def format_hotkey_for_pynput(hotkey_str):  # (same as before)
 
 def setup_hotkeys():  # (Modified to include camera hotkey)
     global hotkey_listener
+    from pynput import keyboard
+
     if not config:
         logger.error("Config not loaded. Cannot set up hotkeys.")
         return
@@ -210,7 +362,34 @@ def setup_hotkeys():  # (Modified to include camera hotkey)
             f"Camera hotkey '{config.camera_hotkey}' invalid or not defined."
         )
 
-    if mic_hotkey_str:
+    camera_blur_hotkey_str = format_hotkey_for_pynput(config.camera_blur_hotkey)
+    if camera_blur_hotkey_str:
+        hotkey_actions[camera_blur_hotkey_str] = on_camera_blur_hotkey_press
+        logger.info(
+            f"Registered Camera Blur Hotkey: {config.camera_blur_hotkey} -> {camera_blur_hotkey_str}"
+        )
+
+    for entry in config.cameras:
+        entry_hotkey_str = format_hotkey_for_pynput(entry.get("hotkey"))
+        if not entry_hotkey_str:
+            continue
+        if entry_hotkey_str in hotkey_actions:
+            logger.warning(
+                f"Camera '{entry['name']}' hotkey {entry['hotkey']} is already in use. Skipping."
+            )
+            continue
+        hotkey_actions[entry_hotkey_str] = make_camera_entry_hotkey_handler(
+            entry["name"]
+        )
+        logger.info(
+            f"Registered Camera '{entry['name']}' Hotkey: {entry['hotkey']} -> {entry_hotkey_str}"
+        )
+
+    if mic_hotkey_str in hotkey_actions:
+        logger.warning(
+            f"Mic hotkey {config.mic_hotkey} is already in use by a camera hotkey. Skipping."
+        )
+    elif mic_hotkey_str:
         hotkey_actions[mic_hotkey_str] = on_mic_hotkey_press
         logger.info(f"Registered Mic Hotkey: {config.mic_hotkey} -> {mic_hotkey_str}")
     else:
@@ -222,14 +401,80 @@ def setup_hotkeys():  # (Modified to include camera hotkey)
 
     try:
         hotkey_listener = keyboard.GlobalHotKeys(hotkey_actions)
+        hotkey_listener.name = "HotkeyListenerThread"
         hotkey_listener.start()  # Runs in its own thread
         logger.info("Hotkey listener started.")
     except Exception as e:
         logger.error(f"Failed to start hotkey listener: {e}", exc_info=True)
 
 
+def on_ptt_state_change(mic_active, latency):
+    """Called by the push-to-talk worker after the mic was (un)muted."""
+    if mic_active is None:
+        logger.error("Push-to-talk failed to change OS mic state.")
+        mic_active = get_os_mic_status()
+    elif mic_active:
+        logger.info(f"Push-to-talk: microphone live {latency * 1000:.2f} ms after key down.")
+        mic_stats.count("toggles")
+        mic_stats.observe("toggle", latency)
+    else:
+        logger.info("Push-to-talk: microphone muted.")
+
+    with mic_toggle_lock:
+        config.mic_active = mic_active
+
+
+def setup_push_to_talk():
+    global ptt_listener, ptt_controller
+    from pynput import keyboard
+
+    if not config or not config.mic_ptt_hotkey:
+        return
+
+    ptt_hotkey_str = format_hotkey_for_pynput(config.mic_ptt_hotkey)
+    try:
+        ptt_keys = set(keyboard.HotKey.parse(ptt_hotkey_str))
+    except ValueError as e:
+        logger.warning(f"Push-to-talk hotkey '{config.mic_ptt_hotkey}' invalid: {e}")
+        return
+
+    ptt_controller = PushToTalkController(
+        should_engage=lambda: not config.mic_active,
+        on_state_change=on_ptt_state_change,
+        set_mute=mic_group.set_mute if mic_group else None,
+    )
+    ptt_controller.start()
+    pressed_keys = set()
+
+    # Raw key down/up events: GlobalHotKeys only reports activations, not releases
+    def on_press(key):
+        key = ptt_listener.canonical(key)
+        if key in ptt_keys:
+            pressed_keys.add(key)
+            if pressed_keys == ptt_keys:
+                ptt_controller.press()
+
+    def on_release(key):
+        key = ptt_listener.canonical(key)
+        if key in pressed_keys:
+            pressed_keys.discard(key)
+            ptt_controller.release()
+
+    try:
+        ptt_listener = keyboard.Listener(on_press=on_press, on_release=on_release)
+        ptt_listener.name = "PushToTalkListenerThread"
+        ptt_listener.start()
+        logger.info(
+            f"Registered Push-to-talk Hotkey: {config.mic_ptt_hotkey} -> {ptt_hotkey_str}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to start push-to-talk listener: {e}", exc_info=True)
+
+
 # --- System Tray Icon Functions ---
 def get_tray_icon_image():
+    from PIL import Image, ImageDraw
+
     icon_path = resource_path("resources/logo.png")
     try:
         image = Image.open(icon_path)
@@ -246,7 +491,16 @@ def get_tray_icon_image():
 def on_quit_vcm(icon, item_or_event=None):
     logger.info("Exit selected. Shutting down VCM...")
 
-    # Stop Camera Manager first
+    if profiler and profiler.running:
+        logger.info("Stopping profiler...")
+        profiler.stop()
+
+    # Telemetry first, so it can still collect the final minute from the cameras
+    if telemetry:
+        logger.info("Stopping telemetry...")
+        telemetry.stop()
+
+    # Then the Camera Manager
     if camera_manager:
         logger.info("Stopping camera manager...")
         camera_manager.stop()  # This will signal its thread and join
@@ -258,6 +512,21 @@ def on_quit_vcm(icon, item_or_event=None):
         except Exception as e:
             logger.error(f"Error stopping hotkey listener: {e}", exc_info=True)
 
+    if control_server:
+        logger.info("Stopping control server...")
+        control_server.stop()
+
+    if ptt_listener:
+        logger.info("Stopping push-to-talk listener...")
+        try:
+            ptt_listener.stop()
+        except Exception as e:
+            logger.error(f"Error stopping push-to-talk listener: {e}", exc_info=True)
+    if ptt_controller:
+        ptt_controller.stop()
+    if mic_group:
+        mic_group.stop()
+
     if osd_manager:
         logger.info("Closing OSD manager...")
         osd_manager.close()
@@ -273,11 +542,88 @@ def on_quit_vcm(icon, item_or_event=None):
     exit_event.set()
 
 
+def on_save_frame_trace(icon=None, item_or_event=None):
+    if camera_manager:
+        path = camera_manager.dump_trace(reason="manual")
+        if path:
+            logger.info(f"Frame trace saved to {path}")
+
+
+def on_start_profiler(icon=None, item_or_event=None):
+    """Profiles every VCM thread for profiler_duration seconds, next to the log."""
+    global profiler
+    if profiler and profiler.running:
+        logger.info("Profiler already running.")
+        return
+    duration = config.get("profiler_duration", 30)
+    interval = config.get("profiler_interval_ms", 10) / 1000
+    fmt = config.get("profiler_format", "speedscope")
+    profiler = SamplingProfiler(log_dir, duration=duration, interval=interval, fmt=fmt)
+    profiler.start()
+    if isinstance(camera_manager, CameraProcessSupervisor):
+        camera_manager.start_profiler(duration, interval, fmt)
+
+
+def on_unhandled_thread_exception(args):
+    logger.critical(
+        f"Unhandled exception in thread {args.thread.name if args.thread else '?'}: {args.exc_value}",
+        exc_info=(args.exc_type, args.exc_value, args.exc_traceback),
+    )
+    if camera_manager:
+        camera_manager.dump_trace(reason="crash")
+
+
+def tray_tooltip(state):
+    camera_status = "Camera ON" if is_camera_live(state) else "Camera OFF"
+    mic_status = "Mic ON" if state["mic_active"] else "Mic OFF"
+    return f"VCM - {camera_status}, {mic_status}"
+
+
+def on_tray_state_change(version, state):
+    if tray_icon_instance:
+        tray_icon_instance.title = tray_tooltip(state)
+
+
+def setup_telemetry():
+    global telemetry
+    if not config.get("telemetry_enabled", True):
+        return
+    telemetry = TelemetryRecorder(
+        default_db_path(log_dir),
+        sources=[camera_manager.collect_stats, lambda: {"mic": mic_stats.drain()}],
+        settings={
+            key: config.get(key)
+            for key in (
+                "camera_width",
+                "camera_height",
+                "camera_fps",
+                "camera_process_mode",
+                "camera_outputs",
+            )
+        },
+        retention_days=config.get("telemetry_retention_days", 30),
+        flush_interval=config.get("telemetry_flush_interval", 300),
+    )
+    telemetry.start()
+
+
 def setup_tray_icon():
     global tray_icon_instance
+    import pystray
+    from pystray import MenuItem as item
+
     image = get_tray_icon_image()
-    menu = (item("Exit VCM", on_quit_vcm),)
-    tray_icon_instance = pystray.Icon("VCM", image, "VCM - Video Conference Mute", menu)
+    menu = (
+        item("Save Frame Trace", on_save_frame_trace),
+        item(
+            f"Profile CPU ({config.get('profiler_duration', 30)}s)", on_start_profiler
+        ),
+        item("Exit VCM", on_quit_vcm),
+    )
+    tray_icon_instance = pystray.Icon(
+        "VCM", image, tray_tooltip(config.state.snapshot()[1]), menu
+    )
+    config.state.subscribe(on_tray_state_change)
 
     def run_tray():
         logger.info("Tray icon thread started.")
@@ -294,25 +640,94 @@ def setup_tray_icon():
     tray_thread.start()
 
 
+def setup_signal_handlers():
+    """
+    Shuts down on SIGTERM/SIGINT (SIGBREAK on Windows) and, where available,
+    toggles the camera on SIGUSR1 and the microphone on SIGUSR2.
+    Handlers run on the main thread, which only waits for the exit event.
+    """
+
+    def quit_on_signal(signum, frame):
+        logger.info(f"Received {signal.Signals(signum).name}. Shutting down VCM...")
+        if not exit_event.is_set():
+            on_quit_vcm(None)
+
+    def toggle_on_signal(handler):
+        def on_signal(signum, frame):
+            logger.info(f"Received {signal.Signals(signum).name}.")
+            handler()
+
+        return on_signal
+
+    handlers = {
+        "SIGTERM": quit_on_signal,
+        "SIGINT": quit_on_signal,
+        "SIGBREAK": quit_on_signal,
+        "SIGUSR1": toggle_on_signal(on_camera_hotkey_press),
+        "SIGUSR2": toggle_on_signal(on_mic_hotkey_press),
+    }
+    for name, handler in handlers.items():
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            signal.signal(signum, handler)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="VCM - Video Conference Mute")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run only the camera pipelines, without the OSD, tray icon or hotkeys",
+    )
+    return parser.parse_args(argv)
+
+
 # --- Main Application Logic ---
-def main():
+def main(argv=None):
     global osd_manager, camera_manager
 
+    args = parse_args(argv)
+    configure_logging()
     load_configuration()
+    threading.excepthook = on_unhandled_thread_exception
+    headless = args.headless or config.get("headless", False)
+    setup_microphones()
+
+    if headless:
+        logger.info(
+            "Running headless: no OSD, tray icon or hotkeys. Control VCM with the "
+            "control server or signals."
+        )
+    else:
+        from osd import OSDDisplay
 
-    osd_manager = OSDDisplay(config)
-    osd_manager.start()
+        osd_manager = OSDDisplay(config)
+        osd_manager.start()
 
-    # Initialize and start the Camera Manager
-    camera_manager = CameraManager(config)
+    # Initialize and start one camera pipeline per configured camera
+    if config.get("camera_process_mode", "thread") == "process":
+        logger.info("Running camera pipelines in a separate process.")
+        camera_manager = CameraProcessSupervisor(config, trace_dir=log_dir)
+    else:
+        camera_manager = CameraPipelineGroup(config, trace_dir=log_dir)
     camera_manager.start()
-
-    setup_hotkeys()
-    setup_tray_icon()
+    setup_telemetry()
+
+    if not headless:
+        setup_hotkeys()
+        setup_push_to_talk()
+    setup_control_server()
+    if not headless:
+        setup_tray_icon()
+    setup_signal_handlers()
+    if config.get("profiler_on_start", False):
+        on_start_profiler()
 
     logger.info("VCM application is running. Main thread waiting for exit signal.")
     try:
-        exit_event.wait()
+        # Wake up periodically so signal handlers also run on Windows
+        while not exit_event.wait(1.0):
+            pass
     except KeyboardInterrupt:
         logger.info("KeyboardInterrupt received in main thread. Shutting down...")
         on_quit_vcm(None)
@@ -321,4 +736,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Required for the camera process in frozen builds
     main()
@@ -0,0 +1,102 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+
+
+logger = logging.getLogger(__name__)
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def current_rss():
+    """
+    Returns the resident set size (the working set on Windows) of this process.
+    Returns:
+        int or None: Bytes, or None where it cannot be read.
+    """
+    try:
+        if sys.platform == "win32":
+            counters = _ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            kernel32 = ctypes.windll.kernel32
+            if kernel32.K32GetProcessMemoryInfo(
+                kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+            ):
+                return counters.WorkingSetSize
+            return None
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, AttributeError, ValueError):
+        return None
+
+
+def current_private_bytes():
+    """
+    Returns the memory this process holds for itself: private committed bytes
+    on Windows, anonymous resident memory (RssAnon) on Linux. Unlike the
+    working set, it does not drop when the OS merely pages memory out, so it
+    shows what freeing buffers actually returned.
+    Returns:
+        int or None: Bytes, or None where it cannot be read.
+    """
+    try:
+        if sys.platform == "win32":
+            counters = _ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            kernel32 = ctypes.windll.kernel32
+            if kernel32.K32GetProcessMemoryInfo(
+                kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+            ):
+                return counters.PagefileUsage
+            return None
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024
+        return None
+    except (OSError, AttributeError, ValueError):
+        return None
+
+
+# glibc mallopt parameter; large blocks at or above it are mapped individually
+_M_MMAP_THRESHOLD = -3
+_MMAP_THRESHOLD = 1024 * 1024
+
+
+def release_free_memory():
+    """
+    Hands memory the process has freed back to the OS: trims the C heap on glibc
+    and compacts the process heap on Windows, which decommits its free blocks.
+    Memory still in use is left alone. On glibc it also pins the mmap threshold
+    at 1 MiB. glibc otherwise raises it after a large block is freed, so frame
+    buffers allocated later would come from the heap, be zeroed eagerly and stay
+    behind when freed again.
+    """
+    try:
+        if sys.platform == "win32":
+            kernel32 = ctypes.windll.kernel32
+            kernel32.HeapCompact(kernel32.GetProcessHeap(), 0)
+        elif sys.platform.startswith("linux"):
+            libc_name = ctypes.util.find_library("c")
+            if libc_name:
+                libc = ctypes.CDLL(libc_name)
+                if hasattr(libc, "malloc_trim"):  # glibc only
+                    libc.mallopt(_M_MMAP_THRESHOLD, _MMAP_THRESHOLD)
+                    libc.malloc_trim(0)
+    except (OSError, AttributeError) as e:
+        logger.debug(f"Could not release free memory to the OS: {e}")
@@ -0,0 +1,366 @@
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+
+
+logger = logging.getLogger(__name__)
+
+CaptureEndpoint = namedtuple("CaptureEndpoint", "id name")
+# value is the mute call's result (True, or for "get" whether the endpoint is live);
+# error is the exception if the call failed or timed out
+EndpointResult = namedtuple("EndpointResult", "endpoint value error elapsed")
+
+
+class PycawEndpointBackend:
+    """
+    Windows Core Audio access for MicrophoneGroup, through pycaw and comtypes.
+    Every method that touches COM runs on the thread that calls it; COM must be
+    initialized there with thread_init().
+    """
+
+    def __init__(self):
+        # Imported here so the module stays importable where pycaw is missing
+        from ctypes import POINTER, cast
+
+        import comtypes
+        from pycaw.constants import DEVICE_STATE, EDataFlow
+        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+
+        self._comtypes = comtypes
+        self._CLSCTX_ALL = comtypes.CLSCTX_ALL
+        self._cast = cast
+        self._POINTER = POINTER
+        self._AudioUtilities = AudioUtilities
+        self._IAudioEndpointVolume = IAudioEndpointVolume
+        self._capture = EDataFlow.eCapture.value
+        self._active = DEVICE_STATE.ACTIVE.value
+
+    def thread_init(self, multithreaded=False):
+        """Initializes COM on this thread. Returns True if thread_exit() must be called."""
+        try:
+            if multithreaded:
+                self._comtypes.CoInitializeEx(self._comtypes.COINIT_MULTITHREADED)
+            else:
+                self._comtypes.CoInitialize()
+            return True
+        except OSError:  # Already initialized in this thread with a different mode
+            return False
+
+    def thread_exit(self):
+        self._comtypes.CoUninitialize()
+
+    def enumerate(self):
+        initialized = self.thread_init()
+        try:
+            enumerator = self._AudioUtilities.GetDeviceEnumerator()
+            collection = enumerator.EnumAudioEndpoints(self._capture, self._active)
+            endpoints = []
+            for index in range(collection.GetCount()):
+                device = collection.Item(index)
+                endpoint_id = device.GetId()
+                name = self._AudioUtilities.CreateDevice(device).FriendlyName
+                endpoints.append(CaptureEndpoint(endpoint_id, name or endpoint_id))
+            return endpoints
+        finally:
+            if initialized:
+                self.thread_exit()
+
+    def open(self, endpoint_id):
+        """Returns the endpoint's IAudioEndpointVolume, usable on this thread only."""
+        device = self._AudioUtilities.GetDeviceEnumerator().GetDevice(endpoint_id)
+        interface = device.Activate(
+            self._IAudioEndpointVolume._iid_, self._CLSCTX_ALL, None
+        )
+        return self._cast(interface, self._POINTER(self._IAudioEndpointVolume))
+
+    def watch(self, callback):
+        """
+        Calls callback() from a Core Audio thread whenever an audio endpoint is
+        added, removed or changes state. Returns a function that stops watching.
+        """
+        from pycaw.callbacks import MMNotificationClient
+
+        class EndpointChangeClient(MMNotificationClient):
+            def on_device_added(self, *args):
+                callback()
+
+            def on_device_removed(self, *args):
+                callback()
+
+            def on_device_state_changed(self, *args):
+                callback()
+
+        client = EndpointChangeClient()
+        enumerator = self._AudioUtilities.GetDeviceEnumerator()
+        enumerator.RegisterEndpointNotificationCallback(client)
+
+        def unwatch():
+            enumerator.UnregisterEndpointNotificationCallback(client)
+
+        return unwatch
+
+
+class EndpointWorker:
+    """
+    Owns one capture endpoint's volume interface on its own COM thread, so
+    mute calls to several endpoints run at the same time and no interface is
+    used outside the thread that activated it.
+    """
+
+    def __init__(self, backend, endpoint):
+        self.endpoint = endpoint
+        self._backend = backend
+        self._commands = queue.SimpleQueue()
+        self.thread = threading.Thread(
+            target=self._run, name=f"MicEndpoint-{endpoint.name}", daemon=True
+        )
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, command, replies):
+        """Queues "mute", "unmute" or "get"; the EndpointResult goes to replies."""
+        self._commands.put((command, replies))
+
+    def stop(self):
+        self._commands.put(None)
+
+    def _run(self):
+        initialized = self._backend.thread_init()
+        volume = None
+        try:
+            try:
+                volume = self._backend.open(self.endpoint.id)
+            except Exception as e:
+                logger.warning(
+                    f"Could not open microphone '{self.endpoint.name}' ahead of time: {e}"
+                )
+            while True:
+                item = self._commands.get()
+                if item is None:
+                    break
+                command, replies = item
+                started_at = time.perf_counter()
+                value = error = None
+                try:
+                    if volume is None:
+                        volume = self._backend.open(self.endpoint.id)
+                    if command == "get":
+                        value = not bool(volume.GetMute())
+                    else:
+                        volume.SetMute(1 if command == "mute" else 0, None)
+                        value = True
+                except Exception as e:
+                    volume = None  # Re-activated on the next command
+                    error = e
+                replies.put(
+                    EndpointResult(
+                        self.endpoint, value, error, time.perf_counter() - started_at
+                    )
+                )
+        finally:
+            volume = None
+            if initialized:
+                self._backend.thread_exit()
+
+
+class _NewEndpointReplies:
+    """Reply sink for the mute state applied to a new endpoint; only failures matter."""
+
+    def __init__(self, group):
+        self._group = group
+
+    def put(self, result):
+        if result.error is not None:
+            logger.error(
+                f"Could not apply the mute state to new microphone "
+                f"'{result.endpoint.name}': {result.error}"
+            )
+            self._group.mark_stale()
+
+
+class MicrophoneGroup:
+    """
+    Mutes and unmutes every active capture endpoint at once.
+
+    The endpoint list and one EndpointWorker per endpoint are kept between
+    toggles. The list is re-enumerated when a device change notification
+    arrives, or before the next toggle after a mute call failed (a device may
+    have gone away without one), so a toggle costs one round of concurrent
+    SetMute calls, bounded by timeout. Endpoints that appear get the last
+    requested mute state right away.
+    """
+
+    def __init__(self, backend, timeout=1.0):
+        self.backend = backend
+        self.timeout = timeout
+        self.enumerations = 0
+        self.last_results = []
+        self.last_latency = None
+        self._workers = {}
+        self._lock = threading.Lock()
+        self._stale = True
+        # Last state requested with set_mute(), None until the first call
+        self._desired_mute = None
+        self._changed = threading.Event()
+        self._stop_event = threading.Event()
+        self._watch_thread = None
+
+    @property
+    def endpoints(self):
+        return [worker.endpoint for worker in self._workers.values()]
+
+    def mark_stale(self):
+        """Device change callback: the watcher thread re-enumerates, else the next toggle."""
+        self._stale = True
+        self._changed.set()
+
+    def refresh(self):
+        """
+        Re-enumerates the capture endpoints and starts or stops their workers.
+        New endpoints are muted or unmuted to match the last set_mute() call.
+        Must be called with the group lock held.
+        """
+        # Cleared first, so a change reported during enumeration is not lost
+        self._stale = False
+        try:
+            endpoints = self.backend.enumerate()
+        except Exception as e:
+            logger.error(f"Could not enumerate microphones: {e}", exc_info=True)
+            self._stale = True
+            return
+        self.enumerations += 1
+        current = {endpoint.id: endpoint for endpoint in endpoints}
+        for endpoint_id in list(self._workers):
+            if endpoint_id not in current:
+                worker = self._workers.pop(endpoint_id)
+                logger.info(f"Microphone removed: {worker.endpoint.name}")
+                worker.stop()
+        for endpoint_id, endpoint in current.items():
+            if endpoint_id not in self._workers:
+                worker = EndpointWorker(self.backend, endpoint)
+                worker.start()
+                self._workers[endpoint_id] = worker
+                logger.info(f"Microphone added: {endpoint.name}")
+                if self._desired_mute is not None:
+                    worker.submit(
+                        "mute" if self._desired_mute else "unmute",
+                        _NewEndpointReplies(self),
+                    )
+
+    def _run_all(self, command):
+        with self._lock:
+            if command != "get":
+                self._desired_mute = command == "mute"
+            if self._stale:
+                self.refresh()
+            workers = list(self._workers.values())
+            replies = queue.SimpleQueue()
+            started_at = time.perf_counter()
+            for worker in workers:
+                worker.submit(command, replies)
+            results = {}
+            deadline = started_at + self.timeout
+            while len(results) < len(workers):
+                try:
+                    result = replies.get(
+                        timeout=max(0.0, deadline - time.perf_counter())
+                    )
+                except queue.Empty:
+                    break
+                results[result.endpoint.id] = result
+            latency = time.perf_counter() - started_at
+            ordered = [
+                results.get(worker.endpoint.id)
+                or EndpointResult(worker.endpoint, None, TimeoutError("no reply"), latency)
+                for worker in workers
+            ]
+            if any(result.error for result in ordered):
+                self._stale = True
+            return ordered, latency
+
+    def set_mute(self, mute):
+        """
+        Mutes or unmutes all capture endpoints concurrently.
+        Returns:
+            bool: True if there is at least one endpoint and every call succeeded.
+        """
+        results, latency = self._run_all("mute" if mute else "unmute")
+        self.last_results = results
+        self.last_latency = latency
+        succeeded = sum(1 for result in results if result.error is None)
+        details = ", ".join(
+            f"{result.endpoint.name} ({result.elapsed * 1000:.1f} ms)"
+            if result.error is None
+            else f"{result.endpoint.name} (FAILED: {result.error})"
+            for result in results
+        )
+        message = (
+            f"{'Muted' if mute else 'Unmuted'} {succeeded}/{len(results)} microphones "
+            f"in {latency * 1000:.1f} ms: {details or 'none found'}"
+        )
+        if results and succeeded == len(results):
+            logger.info(message)
+            return True
+        logger.error(message)
+        return False
+
+    def get_status(self):
+        """
+        Returns:
+            bool: True if any capture endpoint is unmuted (the user is audible).
+        """
+        results, _ = self._run_all("get")
+        active = any(result.value for result in results if result.error is None)
+        with self._lock:
+            if self._desired_mute is None and results:
+                # Until the first toggle, new endpoints follow the state found at startup
+                self._desired_mute = not active
+        return active
+
+    def _watch_loop(self):
+        initialized = self.backend.thread_init(multithreaded=True)
+        unwatch = None
+        try:
+            unwatch = self.backend.watch(self.mark_stale)
+        except Exception as e:
+            logger.warning(
+                f"Microphone change notifications unavailable: {e}. "
+                "Re-enumerating only after a failed toggle."
+            )
+        while True:
+            self._changed.wait()
+            self._changed.clear()
+            if self._stop_event.is_set():
+                break
+            with self._lock:
+                if self._stale:
+                    self.refresh()
+        try:
+            if unwatch:
+                unwatch()
+        finally:
+            if initialized:
+                self.backend.thread_exit()
+
+    def start(self):
+        with self._lock:
+            self.refresh()
+        self._stop_event.clear()
+        self._changed.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, name="MicEndpointWatcher", daemon=True
+        )
+        self._watch_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._changed.set()
+        if self._watch_thread and self._watch_thread.is_alive():
+            self._watch_thread.join(timeout=2.0)
+        with self._lock:
+            for worker in self._workers.values():
+                worker.stop()
+            self._workers.clear()
@@ -1,4 +1,8 @@
 import logging
+import queue
+import threading
+import time
+from collections import deque
 from ctypes import cast, POINTER
 from comtypes import CLSCTX_ALL, CoInitialize, CoUninitialize, COMError
 
@@ -22,6 +26,22 @@ def com_uninitialize():
 logger = logging.getLogger(__name__)
 
 
+def _activate_volume_interface():
+    """
+    Activates the IAudioEndpointVolume interface for the default microphone.
+    COM must already be initialized in the calling thread.
+    """
+    devices = (
+        AudioUtilities.GetMicrophone()
+    )  # Gets the default communications microphone
+    if not devices:
+        logger.error("No default microphone found by AudioUtilities.")
+        return None
+
+    interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+    return cast(interface, POINTER(IAudioEndpointVolume))
+
+
 def _get_volume_interface():
     """
     Retrieves the IAudioEndpointVolume interface for the default microphone.
@@ -34,17 +54,7 @@ def _get_volume_interface():
     try:
         com_initialize()
         com_initialized_successfully = True
-
-        devices = (
-            AudioUtilities.GetMicrophone()
-        )  # Gets the default communications microphone
-        if not devices:
-            logger.error("No default microphone found by AudioUtilities.")
-            return None
-
-        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        volume_interface = cast(interface, POINTER(IAudioEndpointVolume))
-        return volume_interface
+        return _activate_volume_interface()
     except COMError as e:
         # Common COM errors include device not found or access issues.
         logger.error(
@@ -114,3 +124,139 @@ def set_mic_mute(mute: bool):
             exc_info=True,
         )
         return False
+
+
+class PushToTalkController:
+    """
+    Unmutes the default microphone while a key is held down.
+    set_mute(mute) replaces the default microphone with another target (e.g.
+    MicrophoneGroup.set_mute for all microphones); it must return True on success.
+    A dedicated worker thread keeps COM initialized and the volume interface
+    acquired ahead of time, so a key press costs one queue hand-off plus one
+    SetMute call. The keyboard hook only queues commands, which keeps it fast
+    enough for Windows' low-level hook timeout. Key auto-repeat is ignored and
+    the key-to-unmute latency of every press is recorded.
+    """
+
+    def __init__(
+        self, should_engage=None, on_state_change=None, history_size=256, set_mute=None
+    ):
+        # should_engage() is checked on key down; PTT only acts while the mic is muted
+        self._should_engage = should_engage or (lambda: True)
+        self._on_state_change = on_state_change
+        self._set_mute_override = set_mute
+        self._commands = queue.SimpleQueue()
+        self._engaged = False
+        self._volume = None
+        self.thread = None
+        self.latencies = deque(maxlen=history_size)
+
+    def press(self):
+        """Key down handler. Repeats while held are ignored."""
+        pressed_at = time.perf_counter()
+        if self._engaged or not self._should_engage():
+            return
+        self._engaged = True
+        self._commands.put((False, pressed_at))
+
+    def release(self):
+        """Key up handler."""
+        released_at = time.perf_counter()
+        if not self._engaged:
+            return
+        self._engaged = False
+        self._commands.put((True, released_at))
+
+    def _set_mute(self, mute):
+        if self._set_mute_override:
+            return self._set_mute_override(mute)
+        for attempt in range(2):
+            try:
+                if self._volume is None:
+                    self._volume = _activate_volume_interface()
+                if self._volume is None:
+                    return False
+                self._volume.SetMute(1 if mute else 0, None)
+                return True
+            except Exception as e:
+                # The device may have been unplugged or replaced; re-acquire once
+                logger.warning(
+                    f"Push-to-talk could not {'mute' if mute else 'unmute'} microphone "
+                    f"(attempt {attempt + 1}): {e}"
+                )
+                self._volume = None
+        return False
+
+    def _worker_loop(self):
+        com_initialize()
+        try:
+            try:
+                if not self._set_mute_override:
+                    self._volume = _activate_volume_interface()
+                    logger.info("Push-to-talk microphone interface ready.")
+            except Exception as e:
+                logger.error(
+                    f"Push-to-talk could not pre-acquire microphone interface: {e}",
+                    exc_info=True,
+                )
+
+            while True:
+                command = self._commands.get()
+                if command is None:
+                    break
+                mute, event_time = command
+                success = self._set_mute(mute)
+                latency = time.perf_counter() - event_time
+                if not mute and success:
+                    self.latencies.append(latency)
+                logger.debug(
+                    f"Push-to-talk {'mute' if mute else 'unmute'} "
+                    f"{'done' if success else 'FAILED'} in {latency * 1000:.2f} ms."
+                )
+                if self._on_state_change:
+                    try:
+                        self._on_state_change(not mute if success else None, latency)
+                    except Exception as e:
+                        logger.error(
+                            f"Error in push-to-talk state callback: {e}", exc_info=True
+                        )
+        finally:
+            self._volume = None
+            com_uninitialize()
+
+    def latency_summary(self):
+        """
+        Returns key-to-unmute latency statistics in milliseconds, or None if no presses were recorded.
+        """
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return {
+            "presses": len(ordered),
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            logger.warning("Push-to-talk worker already running.")
+            return
+        self.thread = threading.Thread(
+            target=self._worker_loop, name="MicPushToTalkThread", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        if self._engaged:
+            self.release()  # Never leave the mic open behind a stopped listener
+        self._commands.put(None)
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        summary = self.latency_summary()
+        if summary:
+            logger.info(
+                f"Push-to-talk latency over {summary['presses']} presses: "
+                f"p50 {summary['p50_ms']:.2f} ms, p95 {summary['p95_ms']:.2f} ms, "
+                f"max {summary['max_ms']:.2f} ms."
+            )
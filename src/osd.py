@@ -4,6 +4,7 @@ import threading
 from queue import Queue
 import logging
 
+from state import is_camera_live
 from utils.resources import resource_path
 
 
@@ -188,9 +189,10 @@ class OSDDisplay:
         ):  # Ensure window and config are available
             return
 
-        # Get current states from ConfigReader
-        cam_active = self.config_reader.camera_active
-        mic_active = self.config_reader.mic_active
+        # Read both toggles from one consistent state snapshot
+        _, state = self.config_reader.state.snapshot()
+        cam_active = is_camera_live(state)
+        mic_active = state["mic_active"]
 
         # NEW DISPLAY LOGIC: Show if EITHER camera OR mic is DEACTIVATED
         should_display = not cam_active or not mic_active
@@ -231,11 +233,16 @@ class OSDDisplay:
             return
         self.update_queue.put(self._perform_update_tasks)
 
+    def _on_state_change(self, version, state):
+        self.update()
+
     def start(self):
         """Start the OSD in its own thread if not already running."""
         if self.thread and self.thread.is_alive():
             logger.warning("OSD thread already running.")
             return
+        # Redraw only when the shared state changes
+        self.config_reader.state.subscribe(self._on_state_change)
         self.thread = threading.Thread(
             target=self._run_osd_loop, daemon=True, name="OSDThread"
         )
@@ -246,6 +253,7 @@ class OSDDisplay:
         """Signals the OSD to shut down."""
         logger.info("OSD close method called.")
         self.running = False  # Stop _check_for_updates from re-scheduling
+        self.config_reader.state.unsubscribe(self._on_state_change)
 
         if self.window:
             # Queue the final close actions to be performed on the Tkinter thread
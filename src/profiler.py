@@ -0,0 +1,235 @@
+"""
+On-demand sampling profiler for every VCM thread.
+
+A sampler thread reads the current Python stack of each thread at a fixed
+interval for a set duration and writes the result next to the log, as a
+speedscope file (open it at https://www.speedscope.app) or as collapsed stacks
+for flamegraph.pl. Samples are wall-clock: threads that are waiting show up in
+their wait, sleep or read call.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from version import __version__
+
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("speedscope", "collapsed")
+# Keeps a forgotten profile from growing without bound
+MAX_DURATION = 600.0
+
+
+def profile_file_path(directory, fmt="speedscope", label=None):
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = f"_{label}" if label else ""
+    extension = ".speedscope.json" if fmt == "speedscope" else ".collapsed.txt"
+    return os.path.join(directory, f"vcm_profile_{timestamp}{suffix}{extension}")
+
+
+class SamplingProfiler:
+    """
+    Samples all threads with sys._current_frames(), without installing any
+    tracing hook, so the profiled threads run at full speed between samples and
+    the cost stays on the sampler thread. Each distinct frame and each
+    distinct stack is stored once; a sample is one stack id per thread. Frames
+    are told apart by the line being run, not just the function.
+    on_finished(path) is called from the sampler thread once the file is
+    written (path is None if writing failed).
+    """
+
+    def __init__(
+        self,
+        directory,
+        duration=30.0,
+        interval=0.01,
+        fmt="speedscope",
+        label=None,
+        on_finished=None,
+    ):
+        if fmt not in FORMATS:
+            logger.warning(f"Unknown profiler format '{fmt}'. Using 'speedscope'.")
+            fmt = "speedscope"
+        self.directory = directory
+        self.duration = min(max(0.1, float(duration)), MAX_DURATION)
+        self.interval = max(0.001, float(interval))
+        self.fmt = fmt
+        self.label = label
+        self.on_finished = on_finished
+        self.path = None
+        self.sample_count = 0
+        self.sample_time = 0.0  # Seconds spent taking samples
+        self._frame_ids = {}  # (function, file, line being run) -> frame index
+        self._stack_ids = {}  # tuple of frame indexes, root first -> stack id
+        self._threads = {}  # thread id -> [name, stack ids, weights]
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Starts sampling. Returns False if this profiler already ran."""
+        if self._thread is not None:
+            return False
+        self._thread = threading.Thread(
+            target=self._run, name="ProfilerThread", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Profiling all threads for {self.duration:g}s every "
+            f"{self.interval * 1000:g} ms."
+        )
+        return True
+
+    def stop(self, timeout=5.0):
+        """Ends sampling early; the samples taken so far are still written."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self):
+        sampler_id = threading.get_ident()
+        started_at = time.perf_counter()
+        deadline = started_at + self.duration
+        previous_sample_at = started_at
+        next_sample_at = started_at
+        while not self._stop_event.is_set():
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            self._sample(sampler_id, (now - previous_sample_at) * 1000)
+            previous_sample_at = now
+            self.sample_time += time.perf_counter() - now
+            self.sample_count += 1
+            next_sample_at += self.interval
+            delay = next_sample_at - time.perf_counter()
+            if delay < 0:  # Fell behind; skip the missed samples
+                next_sample_at = time.perf_counter()
+                delay = 0
+            self._stop_event.wait(delay)
+
+        self.path = self.write(profile_file_path(self.directory, self.fmt, self.label))
+        if self.on_finished:
+            try:
+                self.on_finished(self.path)
+            except Exception as e:
+                logger.error(f"Profiler completion callback failed: {e}", exc_info=True)
+
+    def _sample(self, sampler_id, weight_ms):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frame_ids = self._frame_ids
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                # The current line, so a loop shows where it waits or spends time
+                key = (code.co_name, code.co_filename, frame.f_lineno)
+                frame_id = frame_ids.get(key)
+                if frame_id is None:
+                    frame_id = frame_ids[key] = len(frame_ids)
+                stack.append(frame_id)
+                frame = frame.f_back
+            stack.reverse()
+            stack = tuple(stack)
+            stack_id = self._stack_ids.get(stack)
+            if stack_id is None:
+                stack_id = self._stack_ids[stack] = len(self._stack_ids)
+            thread = self._threads.get(thread_id)
+            if thread is None:
+                thread = self._threads[thread_id] = [None, [], []]
+            # Threads can be renamed while profiling; the latest name wins
+            thread[0] = names.get(thread_id, f"Thread-{thread_id}")
+            thread[1].append(stack_id)
+            thread[2].append(weight_ms)
+
+    def write(self, path):
+        """
+        Writes the samples taken so far.
+        Returns:
+            str or None: The file path, or None if writing failed.
+        """
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                if self.fmt == "speedscope":
+                    json.dump(self.speedscope(), f)
+                else:
+                    f.writelines(f"{line}\n" for line in self.collapsed())
+        except Exception as e:
+            logger.error(f"Failed to write profile to '{path}': {e}", exc_info=True)
+            return None
+        logger.info(
+            f"Profile with {self.sample_count} samples of {len(self._threads)} threads "
+            f"written to '{path}' (sampling took {self.sample_time * 1000:.0f} ms)."
+        )
+        return path
+
+    def _stacks(self):
+        stacks = [None] * len(self._stack_ids)
+        for stack, stack_id in self._stack_ids.items():
+            stacks[stack_id] = stack
+        return stacks
+
+    def _threads_by_name(self):
+        return sorted(self._threads.values(), key=lambda thread: thread[0])
+
+    def speedscope(self):
+        """Returns the samples as a speedscope file, one profile per thread."""
+        frames = [None] * len(self._frame_ids)
+        for (function, filename, line), frame_id in self._frame_ids.items():
+            frames[frame_id] = {"name": function, "file": filename, "line": line}
+        stacks = self._stacks()
+        profiles = []
+        for name, stack_ids, weights in self._threads_by_name():
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": [stacks[stack_id] for stack_id in stack_ids],
+                    "weights": weights,
+                }
+            )
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"VCM {__version__} ({self.label or 'main'})",
+            "exporter": f"VCM {__version__}",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def collapsed(self):
+        """
+        Returns the samples as collapsed stack lines ("thread;outer;...;inner count"),
+        heaviest first.
+        """
+        labels = [None] * len(self._frame_ids)
+        for (function, filename, line), frame_id in self._frame_ids.items():
+            labels[frame_id] = f"{function} ({os.path.basename(filename)}:{line})".replace(
+                ";", ":"
+            )
+        stacks = self._stacks()
+        counts = {}
+        for name, stack_ids, _ in self._threads_by_name():
+            for stack_id in stack_ids:
+                key = (name.replace(";", ":"), stack_id)
+                counts[key] = counts.get(key, 0) + 1
+        return [
+            ";".join([name] + [labels[frame_id] for frame_id in stacks[stack_id]])
+            + f" {count}"
+            for (name, stack_id), count in sorted(
+                counts.items(), key=lambda item: item[1], reverse=True
+            )
+        ]
@@ -0,0 +1,422 @@
+import logging
+import mmap
+import os
+import struct
+import time
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Recording file layout (all little-endian):
+#   header  (64 bytes): magic, version, reported width, height, fps, data end
+#   records (64-byte aligned), each:
+#       record header (64 bytes): read start, read end (seconds since the
+#                                 recording started), flags, height, width, channels
+#       frame bytes (height * width * max(channels, 1), absent for failed reads)
+# Records are appended in place into a memory-mapped file that grows in
+# _GROW_BYTES steps, so a recording cut short by a crash can still be replayed up
+# to the last record.
+_MAGIC = b"VCMR"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIIdQ")
+_HEADER_SIZE = 64
+_RECORD = struct.Struct("<ddBxxxIII")
+_RECORD_SIZE = 64
+_ALIGNMENT = 64
+_GROW_BYTES = 64 * 1024 * 1024
+
+_FLAG_PRESENT = 0x80
+_FLAG_RET = 0x01
+_FLAG_EXCEPTION = 0x02
+
+
+def _align(value):
+    return (value + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class FrameRecorder:
+    """
+    Appends raw frames and read results from a physical camera to a
+    memory-mapped recording file. Each record is one memcpy into the mapping;
+    nothing is encoded. The file grows in _GROW_BYTES steps up to max_bytes and
+    is truncated to the recorded size on close. Recording stops with a warning
+    once it is full.
+    """
+
+    def __init__(self, path, max_bytes=4 * 1024**3):
+        self.path = path
+        self.max_bytes = max(_HEADER_SIZE + _RECORD_SIZE, int(max_bytes))
+        self.frames_recorded = 0
+        self.full = False
+        self.properties = {"width": 0, "height": 0, "fps": 0.0}
+        self._offset = _HEADER_SIZE
+        self._origin = time.perf_counter()
+        self._mmap = None
+
+        self._file = open(path, "w+b")
+        try:
+            self._map(min(self.max_bytes, _GROW_BYTES))
+        except Exception:
+            self._file.close()
+            raise
+        self._write_header()
+        logger.info(
+            f"Recording camera session to {path} (up to {self.max_bytes // (1024 * 1024)} MB)."
+        )
+
+    def _map(self, size):
+        # The mapping is closed before resizing: Windows cannot truncate a mapped file
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        self._size = size
+
+    def _write_header(self):
+        _HEADER.pack_into(
+            self._mmap,
+            0,
+            _MAGIC,
+            _VERSION,
+            int(self.properties["width"]),
+            int(self.properties["height"]),
+            float(self.properties["fps"]),
+            self._offset,
+        )
+
+    def record(self, read_start, read_end, ret, frame, exception=False):
+        """
+        Appends one read result.
+        Args:
+            read_start (float): time.perf_counter() when read() was called.
+            read_end (float): time.perf_counter() when read() returned.
+            ret (bool): The ret value read() returned.
+            frame (numpy.ndarray or None): The uint8 frame read() returned.
+            exception (bool): True if read() raised instead of returning.
+        Returns:
+            bool: True if the record was written, False if the recording is full or closed.
+        """
+        if self.full or self._mmap is None:
+            return False
+
+        flags = _FLAG_PRESENT
+        if ret:
+            flags |= _FLAG_RET
+        if exception:
+            flags |= _FLAG_EXCEPTION
+        height = width = channels = 0
+        frame_size = 0
+        if frame is not None and frame.dtype == np.uint8 and frame.ndim in (2, 3):
+            height, width = frame.shape[:2]
+            channels = frame.shape[2] if frame.ndim == 3 else 0
+            frame_size = frame.nbytes
+
+        end = _align(self._offset + _RECORD_SIZE + frame_size)
+        if end > self.max_bytes:
+            self.full = True
+            logger.warning(
+                f"Recording {self.path} is full after {self.frames_recorded} reads. "
+                "Recording stopped; raise camera_record_max_mb to record longer sessions."
+            )
+            return False
+        if end > self._size:
+            try:
+                self._map(min(self.max_bytes, max(end, self._size + _GROW_BYTES)))
+            except Exception as e:
+                self.full = True
+                logger.error(
+                    f"Could not grow recording {self.path} after "
+                    f"{self.frames_recorded} reads: {e}. Recording stopped."
+                )
+                return False
+
+        data_offset = self._offset + _RECORD_SIZE
+        if frame_size:
+            target = np.ndarray(
+                frame.shape, dtype=np.uint8, buffer=self._mmap, offset=data_offset
+            )
+            np.copyto(target, frame)
+        # Written after the frame bytes so a torn record is never marked present
+        _RECORD.pack_into(
+            self._mmap,
+            self._offset,
+            read_start - self._origin,
+            read_end - self._origin,
+            flags,
+            height,
+            width,
+            channels,
+        )
+        self._offset = end
+        self.frames_recorded += 1
+        return True
+
+    def close(self):
+        if self._mmap is None:
+            return
+        try:
+            self._write_header()
+            self._mmap.flush()
+            self._mmap.close()
+            self._file.truncate(self._offset)
+        except Exception as e:
+            logger.error(f"Error finalizing recording {self.path}: {e}", exc_info=True)
+        finally:
+            self._mmap = None
+            self._file.close()
+        logger.info(
+            f"Recording {self.path} closed: {self.frames_recorded} reads, "
+            f"{self._offset / (1024 * 1024):.1f} MB."
+        )
+
+
+class RecordingCapture:
+    """
+    Wraps a cv2.VideoCapture-like object and records every read() result,
+    including failed reads, exceptions and the time each read blocked.
+    """
+
+    def __init__(self, capture, recorder):
+        self._capture = capture
+        self._recorder = recorder
+
+    def read(self):
+        read_start = time.perf_counter()
+        try:
+            ret, frame = self._capture.read()
+        except Exception:
+            self._recorder.record(read_start, time.perf_counter(), False, None, True)
+            raise
+        self._recorder.record(read_start, time.perf_counter(), ret, frame)
+        return ret, frame
+
+    def get(self, property_id):
+        value = self._capture.get(property_id)
+        # Replays report the properties the physical camera reported
+        key = {
+            cv2.CAP_PROP_FRAME_WIDTH: "width",
+            cv2.CAP_PROP_FRAME_HEIGHT: "height",
+            cv2.CAP_PROP_FPS: "fps",
+        }.get(property_id)
+        if key and value:
+            self._recorder.properties[key] = value
+        return value
+
+    def __getattr__(self, name):
+        return getattr(self._capture, name)
+
+
+class RecordingCaptureFactory:
+    """capture_factory for CameraManager that records from the captures another factory opens."""
+
+    def __init__(self, capture_factory, recorder):
+        self.capture_factory = capture_factory
+        self.recorder = recorder
+
+    def __call__(self, *capture_args):
+        return RecordingCapture(self.capture_factory(*capture_args), self.recorder)
+
+
+class FrameRecording:
+    """
+    Read-only view of a recording file. Frames are numpy arrays backed directly
+    by the memory mapping, so reading one costs neither a decode nor a copy.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, width, height, fps, data_end = _HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a VCM recording.")
+        if version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported VCM recording version {version} in {path}.")
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+        self._records = []
+        offset = _HEADER_SIZE
+        # data_end stays at the header size if the recorder never closed; scan
+        # until the first record that was not marked present
+        limit = len(self._mmap)
+        while offset + _RECORD_SIZE <= limit:
+            read_start, read_end, flags, h, w, c = _RECORD.unpack_from(
+                self._mmap, offset
+            )
+            if not flags & _FLAG_PRESENT:
+                break
+            shape = (h, w, c) if c else (h, w)
+            frame_size = h * w * max(c, 1)
+            if offset + _RECORD_SIZE + frame_size > limit:
+                break
+            self._records.append(
+                (
+                    read_start,
+                    read_end,
+                    flags,
+                    shape if frame_size else None,
+                    offset + _RECORD_SIZE,
+                )
+            )
+            offset = _align(offset + _RECORD_SIZE + frame_size)
+        if data_end > _HEADER_SIZE and offset != data_end:
+            logger.warning(
+                f"Recording {path} ends at byte {offset}, header says {data_end}."
+            )
+        if not (self.width and self.height):
+            # Recorder did not close cleanly: report the first frame's size
+            for _, _, _, shape, _ in self._records:
+                if shape:
+                    self.height, self.width = shape[:2]
+                    break
+
+    def __len__(self):
+        return len(self._records)
+
+    def read_times(self, index):
+        """Returns (read start, read end) in seconds since the recording started."""
+        read_start, read_end, _, _, _ = self._records[index]
+        return read_start, read_end
+
+    def read(self, index):
+        """
+        Returns the recorded read() result at index.
+        Returns:
+            tuple: (ret, frame), where frame is a read-only view into the file or None.
+        Raises:
+            RuntimeError: If the recorded read() raised an exception.
+        """
+        _, _, flags, shape, data_offset = self._records[index]
+        if flags & _FLAG_EXCEPTION:
+            raise RuntimeError(f"Recorded camera read exception (record {index}).")
+        frame = None
+        if shape:
+            frame = np.ndarray(
+                shape, dtype=np.uint8, buffer=self._mmap, offset=data_offset
+            )
+        return bool(flags & _FLAG_RET), frame
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Frames handed out are still referenced; the mapping closes with them
+            logger.debug(f"Recording {self.path} still has frames in use.")
+
+
+class ReplayCaptureFactory:
+    """
+    capture_factory for CameraManager that replays a recording instead of opening
+    a device. Reads continue across release/reopen cycles, like a real camera.
+
+    With realtime=True every read returns when the original read did, relative to
+    the previous one, reproducing stalls and frame pacing. With realtime=False
+    reads return immediately. When loop is False the replay capture reports itself
+    closed once the recording is exhausted.
+    """
+
+    # Larger gaps mean the pipeline stopped reading (muted, disconnected); resume
+    # from the next record instead of rushing through the backlog
+    RESYNC_THRESHOLD = 0.5
+
+    def __init__(self, path, realtime=True, loop=False):
+        self.recording = FrameRecording(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.position = 0
+        self._anchor = None
+        logger.info(
+            f"Replaying camera session from {path}: {len(self.recording)} reads, "
+            f"{self.recording.width}x{self.recording.height}"
+            f"{' in real time' if realtime else ' as fast as possible'}."
+        )
+
+    def __call__(self, *capture_args):
+        return ReplayCapture(self)
+
+    @property
+    def exhausted(self):
+        return not self.loop and self.position >= len(self.recording)
+
+    def next_read(self):
+        if self.position >= len(self.recording):
+            if not self.loop or not len(self.recording):
+                return False, None
+            self.position = 0
+            self._anchor = None
+        index = self.position
+        self.position += 1
+
+        if self.realtime:
+            read_start, read_end = self.recording.read_times(index)
+            now = time.perf_counter()
+            if (
+                self._anchor is None
+                or now - (self._anchor + read_end) > self.RESYNC_THRESHOLD
+            ):
+                self._anchor = now - read_start
+            delay = self._anchor + read_end - now
+            if delay > 0:
+                time.sleep(delay)
+        return self.recording.read(index)
+
+    def close(self):
+        self.recording.close()
+
+
+class ReplayCapture:
+    """cv2.VideoCapture stand-in handed out by ReplayCaptureFactory."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._released = False
+
+    def isOpened(self):
+        return not self._released and not self._factory.exhausted
+
+    def set(self, property_id, value):
+        return False
+
+    def get(self, property_id):
+        recording = self._factory.recording
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: recording.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: recording.height,
+            cv2.CAP_PROP_FPS: recording.fps,
+        }.get(property_id, 0)
+
+    def read(self):
+        if self._released:
+            return False, None
+        return self._factory.next_read()
+
+    def release(self):
+        self._released = True
+
+
+def session_file_path(path, camera_name):
+    """Expands the {name} placeholder in camera_record_path / camera_replay_path."""
+    return os.path.expanduser(str(path).replace("{name}", camera_name))
+
+
+def per_camera_path(path):
+    """
+    Adds a {name} placeholder before the extension of a path that has none, so
+    several cameras recording to it each get their own file.
+    """
+    path = str(path)
+    if "{name}" in path:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{{name}}{ext}"
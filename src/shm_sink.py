@@ -0,0 +1,335 @@
+import logging
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Shared memory layout (all little-endian):
+#   header  (64 bytes): magic, version, width, height, channels, slots, fps,
+#                       latest sequence, reader heartbeat, creator PID
+#   slots   (16 bytes each): sequence, timestamp
+#   frames  (width * height * channels bytes each, 64-byte aligned)
+_MAGIC = b"VCMF"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIIIIdQd")
+_HEADER_SIZE = 64
+_LATEST_SEQ_OFFSET = struct.calcsize("<4sIIIIId")
+_HEARTBEAT_OFFSET = _LATEST_SEQ_OFFSET + 8
+# In the header's spare bytes, so readers that do not know it are unaffected
+_CREATOR_PID_OFFSET = _HEADER.size
+_SLOT = struct.Struct("<Qd")
+_ALIGNMENT = 64
+
+
+def _align(value):
+    return (value + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _frames_offset(slots):
+    return _align(_HEADER_SIZE + slots * _SLOT.size)
+
+
+def default_shm_name(camera_name):
+    return f"vcm_{camera_name}"
+
+
+def _process_alive(pid):
+    """Checks whether a process with this PID is running."""
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION; os.kill would terminate the process
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return kernel32.GetLastError() == 5  # ERROR_ACCESS_DENIED: it exists
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _shares_tracker_with(pid):
+    """
+    Checks whether pid is this process or a multiprocessing parent or child,
+    which all use the same resource tracker.
+    """
+    if pid == os.getpid():
+        return True
+    parent = multiprocessing.parent_process()
+    if parent is not None and parent.pid == pid:
+        return True
+    return any(child.pid == pid for child in multiprocessing.active_children())
+
+
+def _attach(name):
+    """
+    Attaches to an existing segment. Returns the segment and whether attaching
+    registered it with this process's resource tracker, which unlinks it on exit.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False), False
+    return shared_memory.SharedMemory(name=name), os.name == "posix"
+
+
+def _untrack(shm):
+    from multiprocessing import resource_tracker
+
+    resource_tracker.unregister(shm._name, "shared_memory")
+
+
+class SharedMemoryFrameSink:
+    """
+    Publishes processed frames into a shared memory ring for local consumers.
+    Implements the same interface as softcam.camera (is_connected,
+    wait_for_connection, send_frame, close), so it can replace or sit alongside
+    the virtual camera. Each frame is one memcpy into the next slot; there is
+    no per-frame serialization or IPC call.
+
+    A slot's sequence number is zeroed while it is being written and set once
+    the copy completes, so readers can detect torn or overwritten frames. The
+    sink counts as connected while a reader has sent a heartbeat recently.
+    """
+
+    def __init__(self, name, width, height, fps, slots=4, heartbeat_timeout=2.0):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.slots = max(2, int(slots))
+        self.heartbeat_timeout = heartbeat_timeout
+        self._frame_size = width * height * 3
+        self._frames_offset = _frames_offset(self.slots)
+        self._slot_stride = _align(self._frame_size)
+        size = self._frames_offset + self.slots * self._slot_stride
+
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._remove_stale_segment(name)
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self._buf = self._shm.buf
+        _HEADER.pack_into(
+            self._buf, 0, _MAGIC, _VERSION, width, height, 3, self.slots, fps, 0, 0.0
+        )
+        struct.pack_into("<I", self._buf, _CREATOR_PID_OFFSET, os.getpid())
+        for slot in range(self.slots):
+            _SLOT.pack_into(self._buf, _HEADER_SIZE + slot * _SLOT.size, 0, 0.0)
+        self._frames = [
+            np.ndarray(
+                (height, width, 3),
+                dtype=np.uint8,
+                buffer=self._buf,
+                offset=self._frames_offset + slot * self._slot_stride,
+            )
+            for slot in range(self.slots)
+        ]
+        self._sequence = 0
+        logger.info(
+            f"Shared memory frame sink '{name}' created: {width}x{height}, "
+            f"{self.slots} slots, {size} bytes."
+        )
+
+    @staticmethod
+    def _remove_stale_segment(name):
+        """
+        Unlinks a segment with this name that a previous run left behind when it
+        did not shut down cleanly.
+        Raises:
+            FileExistsError: If the segment is not a VCM frame ring, or the process
+                that created it is still running.
+        """
+        stale, tracked = _attach(name)
+        creator = None
+        if stale.size >= _HEADER_SIZE and bytes(stale.buf[:4]) == _MAGIC:
+            # 0 for rings from versions that did not record the creator
+            creator = struct.unpack_from("<I", stale.buf, _CREATOR_PID_OFFSET)[0]
+        if creator is None or (creator and _process_alive(creator)):
+            if tracked and not (creator and _shares_tracker_with(creator)):
+                _untrack(stale)
+            stale.close()
+            if creator is None:
+                raise FileExistsError(
+                    f"Shared memory '{name}' exists and is not a VCM frame ring. "
+                    "Set a different camera_shm_name."
+                )
+            raise FileExistsError(
+                f"Shared memory '{name}' is in use by process {creator}. "
+                "Stop the other VCM instance or set a different camera_shm_name."
+            )
+        logger.warning(
+            f"Shared memory '{name}' was left behind by process {creator or 'unknown'}, "
+            "which is no longer running. Recreating it."
+        )
+        stale.close()
+        stale.unlink()
+
+    def is_connected(self):
+        heartbeat = struct.unpack_from("<d", self._buf, _HEARTBEAT_OFFSET)[0]
+        return heartbeat > 0 and time.monotonic() - heartbeat < self.heartbeat_timeout
+
+    def wait_for_connection(self, timeout=None):
+        # timeout is in milliseconds, matching softcam
+        deadline = time.monotonic() + (timeout or 0) / 1000.0
+        while not self.is_connected():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def send_frame(self, frame):
+        self._sequence += 1
+        slot = self._sequence % self.slots
+        slot_offset = _HEADER_SIZE + slot * _SLOT.size
+        _SLOT.pack_into(self._buf, slot_offset, 0, 0.0)  # Mark as being written
+        np.copyto(self._frames[slot], frame)
+        _SLOT.pack_into(self._buf, slot_offset, self._sequence, time.monotonic())
+        struct.pack_into("<Q", self._buf, _LATEST_SEQ_OFFSET, self._sequence)
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._frames = []
+        self._buf = None
+        try:
+            self._shm.close()
+            self._shm.unlink()
+        except Exception as e:
+            logger.warning(f"Error closing shared memory '{self.name}': {e}")
+        self._shm = None
+        logger.info(f"Shared memory frame sink '{self.name}' closed.")
+
+
+class SharedMemoryFrameReader:
+    """
+    Reads frames published by SharedMemoryFrameSink from another process.
+    Frames are returned as NumPy views into shared memory, with no copy. A view
+    stays valid until the sink wraps around the ring; call is_current(sequence)
+    after using a view (or copy it) to make sure it was not overwritten.
+
+    Example:
+        reader = SharedMemoryFrameReader("vcm_default")
+        sequence = 0
+        while True:
+            result = reader.wait_for_frame(sequence, timeout=1.0)
+            if result is None:
+                continue
+            sequence, timestamp, frame = result
+            process(frame)
+            if not reader.is_current(sequence):
+                ...  # Frame was overwritten while processing
+    """
+
+    def __init__(self, name):
+        self.name = name
+        # Attaching on POSIX registers the segment with this process's resource
+        # tracker, which would unlink it on exit and break the producer
+        self._shm, tracked = _attach(name)
+        self._buf = self._shm.buf
+        if tracked and not self._shares_creator_tracker():
+            _untrack(self._shm)
+
+        magic, version, width, height, channels, slots, fps, _, _ = _HEADER.unpack_from(
+            self._buf, 0
+        )
+        if magic != _MAGIC or version != _VERSION:
+            self._shm.close()
+            raise ValueError(f"Shared memory '{name}' is not a VCM frame ring.")
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.slots = slots
+        frames_offset = _frames_offset(slots)
+        slot_stride = _align(width * height * channels)
+        self._frames = [
+            np.ndarray(
+                (height, width, channels),
+                dtype=np.uint8,
+                buffer=self._buf,
+                offset=frames_offset + slot * slot_stride,
+            )
+            for slot in range(slots)
+        ]
+        self.heartbeat()
+
+    def _shares_creator_tracker(self):
+        """
+        Checks whether the sink was created by this process or by a multiprocessing
+        parent or child, which all use the same resource tracker. There the
+        registration from attaching is a duplicate of the creator's, and removing
+        it would make the creator's own unlink fail in the tracker.
+        """
+        creator = struct.unpack_from("<I", self._buf, _CREATOR_PID_OFFSET)[0]
+        return _shares_tracker_with(creator)
+
+    def heartbeat(self):
+        """Tells the sink a consumer is attached. Called automatically by reads."""
+        struct.pack_into("<d", self._buf, _HEARTBEAT_OFFSET, time.monotonic())
+
+    def latest_sequence(self):
+        return struct.unpack_from("<Q", self._buf, _LATEST_SEQ_OFFSET)[0]
+
+    def _slot_sequence(self, sequence):
+        slot_offset = _HEADER_SIZE + (sequence % self.slots) * _SLOT.size
+        return _SLOT.unpack_from(self._buf, slot_offset)
+
+    def is_current(self, sequence):
+        """Returns True if the frame with this sequence has not been overwritten."""
+        return self._slot_sequence(sequence)[0] == sequence
+
+    def read_latest(self):
+        """
+        Returns the newest complete frame.
+        Returns:
+            tuple or None: (sequence, timestamp, frame view), or None if no frame is available.
+        """
+        self.heartbeat()
+        sequence = self.latest_sequence()
+        if sequence == 0:
+            return None
+        slot_sequence, timestamp = self._slot_sequence(sequence)
+        if slot_sequence != sequence:
+            return None  # Overwritten between the two reads
+        return sequence, timestamp, self._frames[sequence % self.slots]
+
+    def wait_for_frame(self, last_sequence=0, timeout=1.0, poll_interval=0.002):
+        """
+        Waits for a frame newer than last_sequence.
+        Returns:
+            tuple or None: (sequence, timestamp, frame view), or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.latest_sequence() > last_sequence:
+                result = self.read_latest()
+                if result is not None:
+                    return result
+            if time.monotonic() >= deadline:
+                self.heartbeat()
+                return None
+            time.sleep(poll_interval)
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._frames = []
+        self._buf = None
+        self._shm.close()
+        self._shm = None
@@ -0,0 +1,155 @@
+import logging
+import threading
+from types import MappingProxyType
+
+
+logger = logging.getLogger(__name__)
+
+# Runtime toggle state shared between hotkeys, camera pipelines, the OSD and the tray
+STATE_KEYS = ("camera_active", "camera_states", "camera_disabled_mode", "mic_active")
+
+
+class StateStore:
+    """
+    Versioned store for runtime toggle state.
+    Every change replaces the whole state with a new read-only mapping and bumps
+    a monotonically increasing version, so a reader grabs a consistent
+    (version, state) pair with one attribute read and no lock. Subscribers are
+    called only when something actually changed, in version order, from the
+    thread that made the change; they should return quickly. Threads that prefer
+    to block can use wait_for_change().
+
+    Values must be treated as immutable: replace nested dicts (camera_states)
+    instead of mutating them.
+    """
+
+    def __init__(self, **initial_state):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._current = (0, MappingProxyType(dict(initial_state)))
+        self._subscribers = []
+        self._delivery_lock = threading.Lock()
+        self._delivered_version = 0
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: (version, read-only mapping of the state at that version).
+        """
+        return self._current
+
+    def get(self, key, default=None):
+        return self._current[1].get(key, default)
+
+    def update(self, **changes):
+        """
+        Applies changes atomically. Does nothing (and notifies no one) if every value is unchanged.
+        Returns:
+            int: The current version after the update.
+        """
+        with self._lock:
+            changed = self._apply_locked(changes)
+        if changed:
+            self._deliver()
+        return self._current[0]
+
+    def modify(self, fn):
+        """
+        Read-modify-write under the store lock, for toggles that depend on the
+        current state. fn(state) gets the current read-only mapping and returns
+        a dict of changes (or None for none); it must be quick and must not
+        touch the store itself. Two concurrent toggles thus never both act on
+        the same old state.
+        Returns:
+            tuple: The (version, state) after the change.
+        """
+        with self._lock:
+            changed = self._apply_locked(fn(self._current[1]) or {})
+        if changed:
+            self._deliver()
+        return self._current
+
+    def _apply_locked(self, changes):
+        version, state = self._current
+        if all(key in state and state[key] == value for key, value in changes.items()):
+            return False
+        new_state = dict(state)
+        new_state.update(changes)
+        self._current = (version + 1, MappingProxyType(new_state))
+        self._changed.notify_all()
+        return True
+
+    def _deliver(self):
+        # Serialized so subscribers see versions in order; concurrent changes coalesce
+        with self._delivery_lock:
+            version, state = self._current
+            if version <= self._delivered_version:
+                return
+            self._delivered_version = version
+            for callback in list(self._subscribers):
+                try:
+                    callback(version, state)
+                except Exception as e:
+                    logger.error(f"Error in state subscriber {callback!r}: {e}", exc_info=True)
+
+    def subscribe(self, callback):
+        """Registers callback(version, state) to be called after every change."""
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def wait_for_change(self, since_version, timeout=None):
+        """
+        Blocks until the version differs from since_version or the timeout expires.
+        Returns:
+            tuple: The current (version, state).
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._current[0] != since_version, timeout)
+            return self._current
+
+
+def state_property(key):
+    """Exposes a StateStore key (on self.state) as a plain read/write attribute."""
+
+    def getter(self):
+        return self.state.get(key)
+
+    def setter(self, value):
+        self.state.update(**{key: value})
+
+    return property(getter, setter)
+
+
+def is_camera_live(state, name=None):
+    """
+    Checks whether a camera feed should be live in a state mapping.
+    Args:
+        state (Mapping): A StateStore snapshot.
+        name (str, optional): Camera entry name. When omitted, checks that every camera is live.
+    Returns:
+        bool: True if the global camera toggle and the per-camera toggle are both on.
+    """
+    if not state["camera_active"]:
+        return False
+    camera_states = state["camera_states"]
+    if name is None:
+        return all(camera_states.values())
+    return camera_states.get(name, True)
+
+
+def toggle_state(state):
+    """Returns the STATE_KEYS values of a state mapping as a plain, picklable dict."""
+    return {
+        key: dict(state[key]) if key == "camera_states" else state[key]
+        for key in STATE_KEYS
+    }
@@ -0,0 +1,424 @@
+"""
+Persistent performance telemetry.
+
+Pipelines and the microphone handlers update in-memory StatsWindow counters.
+A TelemetryRecorder thread drains them once a minute and writes the rows to a
+small SQLite database in batches, pruning rows past the retention period.
+
+Run this file to summarize the database:
+    python telemetry.py sessions
+    python telemetry.py trend --by day --days 14
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from version import __version__
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_NAME = "vcm_telemetry.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    version TEXT,
+    settings TEXT
+);
+CREATE TABLE IF NOT EXISTS minute_stats (
+    session_id INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    minute INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    frames INTEGER NOT NULL,
+    overruns INTEGER NOT NULL,
+    frame_ms_mean REAL,
+    frame_ms_max REAL,
+    read_failures INTEGER NOT NULL,
+    opens INTEGER NOT NULL,
+    open_failures INTEGER NOT NULL,
+    open_ms_mean REAL,
+    open_ms_max REAL,
+    toggles INTEGER NOT NULL,
+    toggle_ms_mean REAL,
+    toggle_ms_max REAL,
+    enhance_ms_mean REAL,
+    enhance_ms_max REAL,
+    PRIMARY KEY (session_id, source, minute)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS minute_stats_minute ON minute_stats (minute);
+"""
+
+_COLUMNS = (
+    "session_id",
+    "source",
+    "minute",
+    "seconds",
+    "frames",
+    "overruns",
+    "frame_ms_mean",
+    "frame_ms_max",
+    "read_failures",
+    "opens",
+    "open_failures",
+    "open_ms_mean",
+    "open_ms_max",
+    "toggles",
+    "toggle_ms_mean",
+    "toggle_ms_max",
+    "enhance_ms_mean",
+    "enhance_ms_max",
+)
+# Columns added after the first release, created in older databases on open
+_ADDED_COLUMNS = (("enhance_ms_mean", "REAL"), ("enhance_ms_max", "REAL"))
+
+
+class StatsWindow:
+    """
+    Counters and timings accumulated since the last drain(). Updates take a
+    short lock, so they are safe from the camera, hotkey and telemetry threads.
+    """
+
+    COUNTERS = (
+        "frames",
+        "overruns",
+        "read_failures",
+        "opens",
+        "open_failures",
+        "toggles",
+    )
+    TIMINGS = ("frame", "open", "toggle", "enhance")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._started_at = time.monotonic()
+        self._counters = dict.fromkeys(self.COUNTERS, 0)
+        # name -> [samples, total seconds, max seconds]
+        self._timings = {name: [0, 0.0, 0.0] for name in self.TIMINGS}
+
+    def _observe(self, name, seconds):
+        timing = self._timings[name]
+        timing[0] += 1
+        timing[1] += seconds
+        if seconds > timing[2]:
+            timing[2] = seconds
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self._observe(name, seconds)
+
+    def record_frame(self, processing_time, budget):
+        """Records one camera loop iteration; over budget counts as an overrun."""
+        with self._lock:
+            self._counters["frames"] += 1
+            if processing_time > budget:
+                self._counters["overruns"] += 1
+            self._observe("frame", processing_time)
+
+    def drain(self):
+        """
+        Returns the accumulated values as minute_stats columns and starts a new window.
+        Returns:
+            dict: Counters, <timing>_ms_mean / <timing>_ms_max and the window length in seconds.
+        """
+        with self._lock:
+            counters, timings = self._counters, self._timings
+            seconds = time.monotonic() - self._started_at
+            self._reset()
+        row = dict(counters, seconds=seconds)
+        for name, (samples, total, maximum) in timings.items():
+            row[f"{name}_ms_mean"] = total / samples * 1000 if samples else None
+            row[f"{name}_ms_max"] = maximum * 1000 if samples else None
+        return row
+
+
+def default_db_path(log_dir):
+    return os.path.join(log_dir, DEFAULT_DB_NAME)
+
+
+def open_database(path):
+    connection = sqlite3.connect(path, timeout=5.0)
+    connection.executescript(_SCHEMA)
+    existing = {row[1] for row in connection.execute("PRAGMA table_info(minute_stats)")}
+    with connection:
+        for column, column_type in _ADDED_COLUMNS:
+            if column not in existing:
+                connection.execute(
+                    f"ALTER TABLE minute_stats ADD COLUMN {column} {column_type}"
+                )
+    return connection
+
+
+class TelemetryRecorder:
+    """
+    Collects StatsWindow rows from its sources at every minute boundary and
+    writes them to SQLite every flush_interval seconds, in one transaction.
+    Each source is a callable returning {source name: StatsWindow.drain() row}.
+    Rows with no activity are not stored. The SQLite connection lives on the
+    TelemetryThread only.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        sources,
+        settings=None,
+        retention_days=30,
+        flush_interval=300.0,
+        interval=60.0,
+    ):
+        self.db_path = db_path
+        self.sources = list(sources)
+        self.settings = settings or {}
+        self.retention_days = retention_days
+        self.flush_interval = flush_interval
+        self.interval = interval
+        self.session_id = None
+        self.rows_written = 0
+        self._pending = []
+        self._window_started_at = time.time()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _collect(self):
+        # Rows are keyed by the minute their window started; the slack absorbs
+        # wakeups a little before the boundary
+        minute = int((self._window_started_at + 1) // 60)
+        self._window_started_at = time.time()
+        for source in self.sources:
+            try:
+                stats = source() or {}
+            except Exception as e:
+                logger.warning(f"Telemetry source {source} failed: {e}", exc_info=True)
+                continue
+            for name, row in stats.items():
+                if not any(row[counter] for counter in StatsWindow.COUNTERS):
+                    continue
+                row = dict(row, session_id=self.session_id, source=name, minute=minute)
+                self._pending.append(tuple(row[column] for column in _COLUMNS))
+
+    def _flush(self, connection):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        try:
+            with connection:
+                # Replace rather than fail if a minute repeats (e.g. the clock moved)
+                connection.executemany(
+                    f"INSERT OR REPLACE INTO minute_stats ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    rows,
+                )
+            self.rows_written += len(rows)
+            logger.debug(f"Telemetry: wrote {len(rows)} rows.")
+        except sqlite3.Error as e:
+            logger.error(f"Could not write telemetry to {self.db_path}: {e}")
+
+    def _prune(self, connection):
+        cutoff = time.time() - self.retention_days * 86400
+        try:
+            with connection:
+                connection.execute(
+                    "DELETE FROM minute_stats WHERE minute < ?", (int(cutoff // 60),)
+                )
+                connection.execute(
+                    "DELETE FROM sessions WHERE started_at < ? AND id NOT IN "
+                    "(SELECT DISTINCT session_id FROM minute_stats)",
+                    (cutoff,),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Could not prune telemetry in {self.db_path}: {e}")
+
+    def _run(self):
+        try:
+            connection = open_database(self.db_path)
+            with connection:
+                self.session_id = connection.execute(
+                    "INSERT INTO sessions (started_at, version, settings) "
+                    "VALUES (?, ?, ?)",
+                    (time.time(), __version__, json.dumps(self.settings, default=str)),
+                ).lastrowid
+        except sqlite3.Error as e:
+            logger.error(f"Telemetry disabled: could not open {self.db_path}: {e}")
+            return
+        self._prune(connection)
+        logger.info(
+            f"Telemetry session {self.session_id} recording to {self.db_path}."
+        )
+
+        last_flush = last_prune = time.monotonic()
+        while not self._stop_event.is_set():
+            # Wake at minute boundaries so rows line up across sources and sessions
+            self._stop_event.wait(self.interval - time.time() % self.interval)
+            self._collect()
+            now = time.monotonic()
+            if now - last_flush >= self.flush_interval or self._stop_event.is_set():
+                self._flush(connection)
+                last_flush = now
+            if now - last_prune >= 86400:
+                self._prune(connection)
+                last_prune = now
+
+        try:
+            with connection:
+                connection.execute(
+                    "UPDATE sessions SET ended_at = ? WHERE id = ?",
+                    (time.time(), self.session_id),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Could not close telemetry session: {e}")
+        connection.close()
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="TelemetryThread", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Collects the partial minute, writes everything pending and ends the session."""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5.0)
+            if self._thread.is_alive():
+                logger.error("Telemetry thread did not finish in time.")
+        logger.info(f"Telemetry stopped after writing {self.rows_written} rows.")
+
+
+# --- Command line summary ---
+
+_SUMMARY_SELECT = """
+    NULLIF(SUM(frames), 0) / SUM(seconds) AS fps,
+    SUM(frames) AS frames,
+    SUM(overruns) AS overruns,
+    MAX(frame_ms_max) AS frame_ms_max,
+    SUM(read_failures) AS read_failures,
+    SUM(opens) AS opens,
+    SUM(open_failures) AS open_failures,
+    SUM(open_ms_mean * opens) / NULLIF(SUM(opens), 0) AS open_ms_mean,
+    SUM(toggles) AS toggles,
+    SUM(toggle_ms_mean * toggles) / NULLIF(SUM(toggles), 0) AS toggle_ms_mean,
+    MAX(toggle_ms_max) AS toggle_ms_max,
+    SUM(enhance_ms_mean * frames) / NULLIF(SUM(CASE WHEN enhance_ms_mean IS NOT NULL
+        THEN frames END), 0) AS enhance_ms_mean
+"""
+
+_SUMMARY_HEADERS = (
+    "fps",
+    "frames",
+    "overruns",
+    "frame max ms",
+    "read fails",
+    "opens",
+    "open fails",
+    "open ms",
+    "mic toggles",
+    "toggle ms",
+    "toggle max ms",
+    "enhance ms",
+)
+
+
+def _format_value(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)
+
+
+def _print_table(headers, rows):
+    cells = [[_format_value(value) for value in row] for row in rows]
+    widths = [
+        max([len(header)] + [len(row[index]) for row in cells])
+        for index, header in enumerate(headers)
+    ]
+    print("  ".join(header.rjust(width) for header, width in zip(headers, widths)))
+    for row in cells:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+def summarize_sessions(connection, limit=20):
+    rows = connection.execute(
+        f"""
+        SELECT s.id, datetime(s.started_at, 'unixepoch', 'localtime'),
+               SUM(m.seconds) / 60.0, m.source, {_SUMMARY_SELECT}
+        FROM sessions s JOIN minute_stats m ON m.session_id = s.id
+        GROUP BY s.id, m.source
+        ORDER BY s.id DESC, m.source
+        LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+    _print_table(("session", "started", "minutes", "source") + _SUMMARY_HEADERS, rows)
+
+
+def summarize_trend(connection, days=7, by="day", source=None):
+    bucket = {
+        "day": "strftime('%Y-%m-%d', minute * 60, 'unixepoch', 'localtime')",
+        "hour": "strftime('%Y-%m-%d %H:00', minute * 60, 'unixepoch', 'localtime')",
+    }[by]
+    cutoff = int((time.time() - days * 86400) // 60)
+    rows = connection.execute(
+        f"""
+        SELECT {bucket} AS bucket, source, {_SUMMARY_SELECT}
+        FROM minute_stats
+        WHERE minute >= ? AND (? IS NULL OR source = ?)
+        GROUP BY bucket, source
+        ORDER BY bucket, source
+        """,
+        (cutoff, source, source),
+    ).fetchall()
+    _print_table((by, "source") + _SUMMARY_HEADERS, rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Summarize VCM performance telemetry."
+    )
+    parser.add_argument(
+        "--db",
+        default=default_db_path(os.path.abspath(os.path.dirname(__file__))),
+        help=f"telemetry database (default: {DEFAULT_DB_NAME} next to vcm_app.log)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    sessions_parser = commands.add_parser("sessions", help="per-session totals")
+    sessions_parser.add_argument("--limit", type=int, default=20)
+    trend_parser = commands.add_parser("trend", help="totals per day or hour")
+    trend_parser.add_argument("--days", type=int, default=7)
+    trend_parser.add_argument("--by", choices=("day", "hour"), default="day")
+    trend_parser.add_argument("--source", help='e.g. "camera:default" or "mic"')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No telemetry database at {args.db}")
+        return 1
+    connection = open_database(args.db)
+    try:
+        if args.command == "sessions":
+            summarize_sessions(connection, args.limit)
+        else:
+            summarize_trend(connection, args.days, args.by, args.source)
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())